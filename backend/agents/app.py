@@ -1,6 +1,8 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import chat_router
+from .routers import batch_router, chat_router, metrics_router
+from .services.clients import close_http_client
+from .tools.search_fetcher import close_search_client
 
 app = FastAPI()
 
@@ -15,6 +17,14 @@ app.add_middleware(
 
 # 라우터 포함
 app.include_router(chat_router.router)
+app.include_router(metrics_router.router)
+app.include_router(batch_router.router)
+
+# 종료 시 공유 업스트림 커넥션 풀 정리
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_http_client()
+    await close_search_client()
 
 # 요청 로깅 미들웨어
 @app.middleware("http")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional, Iterator
 
 # OpenAI API 형식 모델 정의
@@ -9,12 +9,16 @@ class Message(BaseModel):
 class ChatCompletionRequest(BaseModel):
     model: str
     messages: List[Message]
-    stream: Optional[bool] = False
+    stream: Optional[bool] = Field(None, description="false 면 단일 JSON 응답, 생략(null)하거나 true 면 SSE 스트리밍 응답")
     temperature: Optional[float] = 1.0
     max_tokens: Optional[int] = None
     conversationId: Optional[str] = None
     parentMessageId: Optional[str] = None
 
+class AbortRequest(BaseModel):
+    completionId: Optional[str] = None
+    conversationId: Optional[str] = None
+
 class Delta(BaseModel):
     content: Optional[str] = None
 
@@ -28,6 +32,11 @@ class Usage(BaseModel):
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
+    prompt_tokens_details: Optional[Dict[str, int]] = None
+    # 측정값 (OpenAI 형식 외 확장 필드)
+    time_to_first_token_ms: Optional[float] = None
+    tokens_per_second: Optional[float] = None
+    latency_ms: Optional[float] = None
 
 class ChatCompletionChunk(BaseModel):
     id: str
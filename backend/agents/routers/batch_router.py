@@ -0,0 +1,114 @@
+import json
+import time
+import uuid
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from ..models.schemas import ChatCompletionRequest
+from ..services.batch import BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY, BATCH_MAX_ITEMS, BatchItem, batch_registry, batch_upstream_limits, run_batch
+from .chat_router import complete_non_streaming
+
+router = APIRouter(prefix="/api", tags=["batch"])
+
+_JSONL_TYPES = ("application/x-ndjson", "application/jsonl", "application/x-jsonlines", "text/plain")
+
+_INT = TypeAdapter(int)
+
+def parse_concurrency(value) -> Optional[int]:
+    """본문의 concurrency 를 쿼리 파라미터(Optional[int])와 같은 규칙으로 검증 (잘못된 값은 400)"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise HTTPException(status_code=400, detail="concurrency 는 정수여야 합니다.")
+    try:
+        return _INT.validate_python(value)
+    except ValidationError:
+        raise HTTPException(status_code=400, detail="concurrency 는 정수여야 합니다.")
+
+def parse_item(index: int, raw) -> BatchItem:
+    """ChatCompletionRequest 또는 {"custom_id": ..., "body": ChatCompletionRequest} 한 항목 검증"""
+    custom_id = None
+    if isinstance(raw, dict) and "body" in raw:
+        custom_id = raw.get("custom_id")
+        raw = raw["body"]
+    try:
+        request = ChatCompletionRequest.model_validate(raw)
+    except ValidationError as e:
+        return BatchItem(index, custom_id, error=f"요청 형식 오류: {e.errors()[0].get('msg', str(e))}")
+    # 배치 결과는 항목당 JSON 한 줄이므로 업스트림도 비스트리밍으로 호출
+    request.stream = False
+    return BatchItem(index, custom_id, request=request)
+
+def parse_jsonl(body: bytes) -> List[BatchItem]:
+    items = []
+    for line in body.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        try:
+            items.append(parse_item(len(items), json.loads(line)))
+        except json.JSONDecodeError as e:
+            items.append(BatchItem(len(items), error=f"JSON 파싱 오류: {e.msg}"))
+    return items
+
+async def handle_item(item: BatchItem):
+    completion_id = f"chatcmpl-{str(uuid.uuid4())}"
+    response = await complete_non_streaming(item.request, None, item.request.messages[-1].content if item.request.messages else "", completion_id, int(time.time()))
+    return {"status_code": 200, "response": response.model_dump(exclude_none=True)}
+
+@router.post("/v1/batch/completions")
+async def batch_completions(http_request: Request, concurrency: Optional[int] = None):
+    """여러 요청을 같은 라우팅/검색/채팅 파이프라인으로 동시에 처리하고 완료 순서대로 JSONL 결과 스트리밍
+
+    본문: ChatCompletionRequest 목록(JSON 배열 또는 {"requests": [...]}) 또는 한 줄에 요청 하나인 JSONL.
+    진행 상황: 응답 헤더 X-Batch-Id 로 GET /api/v1/batch/{id} 조회.
+    """
+    body = await http_request.body()
+    content_type = http_request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in _JSONL_TYPES:
+        try:
+            items = parse_jsonl(body)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="본문은 UTF-8 이어야 합니다.")
+    else:
+        try:
+            payload = json.loads(body or b"[]")
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"JSON 파싱 오류: {e.msg}")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail="본문은 UTF-8 이어야 합니다.")
+        if isinstance(payload, dict):
+            concurrency = concurrency or parse_concurrency(payload.get("concurrency"))
+            payload = payload.get("requests", [])
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="requests 는 목록이어야 합니다.")
+        items = [parse_item(index, raw) for index, raw in enumerate(payload)]
+
+    if not items:
+        raise HTTPException(status_code=400, detail="배치 요청이 비어 있습니다.")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"배치 항목은 최대 {BATCH_MAX_ITEMS}개입니다.")
+
+    # 1 ~ BATCH_MAX_CONCURRENCY 로 제한
+    concurrency = max(1, min(concurrency or BATCH_DEFAULT_CONCURRENCY, BATCH_MAX_CONCURRENCY))
+    job = batch_registry.create(len(items), concurrency)
+    print(f"📦 배치 시작: {job.id} ({len(items)}개, 동시 {concurrency})")
+
+    async def result_lines():
+        async for result in run_batch(job, items, handle_item, batch_upstream_limits()):
+            yield json.dumps(result, ensure_ascii=False) + "\n"
+        print(f"📦 배치 완료: {job.snapshot()}")
+
+    return StreamingResponse(
+        result_lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Batch-Id": job.id, "Cache-Control": "no-cache"},
+    )
+
+@router.get("/v1/batch/{batch_id}")
+async def batch_status(batch_id: str):
+    """배치 진행 상황 (완료/실패/실행 중 개수, 처리량)"""
+    job = batch_registry.get(batch_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="배치를 찾을 수 없습니다.")
+    return job.snapshot()
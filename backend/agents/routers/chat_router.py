@@ -1,22 +1,152 @@
-import json
+import asyncio
+import math
 import time
 import uuid
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-from ..models.schemas import ChatCompletionRequest, ChatCompletionResponse, ChatCompletionChunk, Choice, Delta, Message, Usage
-from ..services.agent_factory import create_route_agent, create_chat_agent, create_tool_agent
-from ..services.streaming import process_and_stream_response, stream_agent_response
-from ..tools.search_tools import enhanced_search
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from ..models.schemas import ChatCompletionRequest, ChatCompletionResponse, Choice, Message, AbortRequest
+from ..services.agent_factory import create_route_agent, create_chat_agent, create_fallback_chat_agent
+from ..services.streaming import complete_chat, process_and_stream_response, stream_chat_deltas
+from ..services.session_store import SessionStore
+from ..services.sse import ChunkEncoder, DONE
+from ..services.routing import local_route, llm_decide_route, resolve_search_query
+from ..services.metrics import StageTimer, metrics
+from ..services.prompts import assemble_messages
+from ..services.usage import RequestUsage
+from ..services.hedging import HEDGED_STREAMING, stream_hedged
+from ..services.admission import AdmissionRejected, AdmissionTicket, admission_controller
+from ..services.completion_cache import completion_cache, completion_key
+from ..services.speculation import SPECULATIVE_ROUTING, SpeculativeChatStream
+from ..services.cancellation import cancellation_registry, watch_disconnect, StreamCancelled
+from ..tools.search_tools import cached_search
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
 # 에이전트 초기화
 route_agent = create_route_agent()
 chat_agent = create_chat_agent()
-tool_agent = create_tool_agent()
+fallback_agent = create_fallback_chat_agent()
+
+# 대화별 히스토리 저장소 (에이전트는 공유 시스템 프롬프트만 보유, 요청마다 상태를 변경하지 않음)
+session_store = SessionStore()
+
+async def prepare_completion(user_message: str, session, scope, usage, timer, speculate: bool = False):
+    """라우팅 + (tool 경로면) 검색 후 채팅 에이전트에 보낼 메시지 구성 -> (route, messages, 추측 실행 스트림)
+
+    스트리밍/비스트리밍 응답이 같은 라우팅/검색 파이프라인을 사용한다.
+    """
+    speculative = None
+    llm_query = None
+    
+    # 라우팅 (캐시/로컬 분류기 우선, 확신이 낮을 때만 LLM 라우터 호출)
+    print("라우팅 결정 중...")
+    route = local_route(user_message)
+    try:
+        if route is None:
+            # 추측 실행: LLM 라우팅과 동시에 채팅 스트림 시작 (토큰은 라우팅 결과까지 버퍼링)
+            if speculate and SPECULATIVE_ROUTING:
+                speculative = SpeculativeChatStream(chat_agent, assemble_messages(chat_agent, session), scope, usage)
+            # LLM 라우터는 검색어까지 함께 생성 (검색 전 LLM 호출은 최대 1회)
+            route, llm_query = await scope.guard(llm_decide_route(route_agent, user_message, usage))
+        timer.mark("route", route=route)
+        usage.route = route
+        
+        print(f"📍 라우팅 결과: {route}")
+        
+        if route == "chat":
+            # 채팅 에이전트 직접 호출 (공유 시스템 프롬프트 + 토큰 예산에 맞춘 세션 히스토리 + 끝에 현재 시간)
+            messages = assemble_messages(chat_agent, session)
+            print(f"대화 히스토리 길이: {len(messages)}")
+            return route, messages, speculative
+        
+        # 추측 실행한 채팅 스트림은 버리고 업스트림 연결 종료
+        if speculative is not None:
+            await speculative.cancel()
+            speculative = None
+        
+        # 검색어: 라우팅 호출의 query 인자, 없으면 규칙 기반 생성 (별도 LLM 호출 없음)
+        search_query = resolve_search_query(user_message, llm_query)
+        print(f"🔍 검색 쿼리: {search_query}")
+        
+        # 검색 실행 (캐시 적중 시 즉시 반환, 동일 쿼리 동시 요청은 fetch 공유, 취소 시 대기 중단)
+        search_result = await scope.guard(cached_search(search_query))
+        timer.mark("search")
+        print(f"📊 검색 완료: {len(search_result)} 글자")
+        
+        # 검색 결과를 바탕으로 최종 답변 생성
+        # 이전 대화와 사용자 질문은 세션 그대로 두고 검색 결과는 맨 끝에만 덧붙임 (업스트림 프롬프트 캐시 유지)
+        messages = assemble_messages(chat_agent, session, search_result)
+        print(f"검색 모드 히스토리 길이: {len(messages)}")
+        return route, messages, None
+    except BaseException:
+        if speculative is not None:
+            await speculative.cancel()
+        raise
+
+async def admit_chat() -> AdmissionTicket:
+    """채팅 모델 업스트림 수용 제어 (대기 기한을 넘길 요청은 시작하지 않고 429 + Retry-After)"""
+    try:
+        return await admission_controller.admit(chat_agent.model, chat_agent.async_client.api_key)
+    except AdmissionRejected as e:
+        print(f"🚦 수용 거절 ({e.reason}): {math.ceil(e.retry_after)}초 후 재시도 권장")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+
+def load_session(request: ChatCompletionRequest, user_message: str):
+    """대화별 세션에 클라이언트가 보낸 대화 내역 반영"""
+    session = session_store.get(request.conversationId)
+    if request.messages:
+        session.replace([{"role": msg.role, "content": msg.content} for msg in request.messages])
+    else:
+        session.append({"role": "user", "content": user_message})
+    return session
+
+def finished_normally(scope, usage: RequestUsage) -> bool:
+    """취소되지 않았고 업스트림이 정상 finish_reason(stop)으로 끝낸 답변인지"""
+    return not scope.cancelled and usage.finish_reason == "stop"
+
+def replay_cached(request: ChatCompletionRequest, user_message: str, cached, completion_id: str, created_time: int):
+    """캐시된 답변을 일반 응답과 같은 형식(SSE 청크 또는 ChatCompletionResponse)으로 반환"""
+    start = time.perf_counter()
+    print(f"⚡ 응답 캐시 적중 (라우팅: {cached.route})")
+    metrics.incr("route.decisions", source="completion_cache", route=cached.route)
+    session = load_session(request, user_message)
+    session.append({"role": "assistant", "content": cached.content})
+    
+    if request.stream is False:
+        return JSONResponse(ChatCompletionResponse(
+            id=completion_id,
+            created=created_time,
+            model=request.model,
+            choices=[Choice(index=0, message=Message(role="assistant", content=cached.content), finish_reason="stop")],
+            usage=cached.usage((time.perf_counter() - start) * 1000)
+        ).model_dump(exclude_none=True))
+    
+    encoder = ChunkEncoder(completion_id, created_time, request.model)
+    
+    async def replay_generator():
+        for piece in cached.pieces():
+            yield encoder.content(piece)
+        latency_ms = (time.perf_counter() - start) * 1000
+        metrics.observe("completion_cache.replay_ms", latency_ms)
+        yield encoder.finish(usage=cached.usage(latency_ms))
+        yield DONE
+    
+    return StreamingResponse(
+        replay_generator(),
+        media_type="text/plain",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Content-Type": "text/plain",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "*"
+        }
+    )
 
 @router.post("/v1/chat/completions")
-async def chat_completions(request: ChatCompletionRequest):
+async def chat_completions(request: ChatCompletionRequest, http_request: Request):
     try:
         user_message = request.messages[-1].content if request.messages else ""
         completion_id = f"chatcmpl-{str(uuid.uuid4())}"
@@ -24,218 +154,97 @@ async def chat_completions(request: ChatCompletionRequest):
         
         print(f"사용자: {user_message}")
         
+        # 완전 일치 응답 캐시 (저온 요청만, 적중 시 라우팅/생성 없이 같은 형식으로 재생)
+        cache_key = None
+        if completion_cache.cacheable(request.temperature):
+            cache_key = completion_key(f"{request.model}|{chat_agent.model}", [msg.model_dump() for msg in request.messages], request.temperature)
+            cached = completion_cache.get(cache_key)
+            if cached is not None:
+                return replay_cached(request, user_message, cached, completion_id, created_time)
+        
+        # 업스트림 슬롯 확보 (응답이 끝날 때 반납)
+        ticket = await admit_chat()
+        
+        # stream=false 를 명시한 경우에만 단일 JSON 응답 (생략 시 기존 클라이언트처럼 스트리밍)
+        if request.stream is False:
+            try:
+                response = await complete_non_streaming(request, http_request, user_message, completion_id, created_time, cache_key)
+            finally:
+                ticket.release()
+            return JSONResponse(response.model_dump(exclude_none=True))
+        
+        # 완료 단위로 고정 바이트를 미리 계산한 SSE 인코더
+        encoder = ChunkEncoder(completion_id, created_time, request.model)
+        
         async def ai_stream_generator():
+            speculative = None
+            completed = False
+            errored = False
+            # 취소 스코프: abort 요청 또는 클라이언트 연결 끊김 시 업스트림/검색 중단
+            scope = cancellation_registry.open(completion_id, request.conversationId)
+            watcher = asyncio.create_task(watch_disconnect(http_request, scope))
+            # 요청 단위 사용량/지연 (최종 청크의 usage, 모델/경로별 히스토그램)
+            usage = RequestUsage(chat_agent.model)
             try:
                 print("AI 에이전트 시작")
+                session = load_session(request, user_message)
+                timer = StageTimer()
+                route, messages, speculative = await prepare_completion(user_message, session, scope, usage, timer, speculate=True)
                 
-                # LLM 기반 라우팅
-                print("라우팅 결정 중...")
-                route_agent.history = route_agent.base_history.copy()
-                route_agent.history.append({"role": "user", "content": user_message})
-                
-                route_response = route_agent.client.chat.completions.create(
-                    model=route_agent.model,
-                    messages=route_agent.history,
-                    tools=route_agent.tools,
-                    tool_choice="auto",
-                    stream=False
-                )
-                
-                route = "chat"  # 기본값
-                
-                # 도구 호출 결과 확인
-                if route_response.choices[0].message.tool_calls:
-                    tool_call = route_response.choices[0].message.tool_calls[0]
-                    if tool_call.function.name == "routing":
-                        try:
-                            args = json.loads(tool_call.function.arguments)
-                            route = args.get("agent", "chat")
-                        except:
-                            route = "chat"
+                if speculative is not None:
+                    deltas = speculative.commit()
+                    speculative = None
+                elif HEDGED_STREAMING:
+                    # 첫 토큰이 늦거나 실패하면 대체 모델로도 요청하고 먼저 답하는 쪽 사용
+                    deltas = stream_hedged(chat_agent, fallback_agent, messages, scope, route=route, usage=usage)
                 else:
-                    # 텍스트 응답에서 추출
-                    content = route_response.choices[0].message.content.lower()
-                    if "tool" in content:
-                        route = "tool"
+                    deltas = stream_chat_deltas(chat_agent, messages, scope, route=route, usage=usage)
                 
-                print(f"📍 라우팅 결과: {route}")
+                accumulated_response = ""
+                async for content in deltas:
+                    if not accumulated_response:
+                        timer.mark("first_token", route=route)
+                    accumulated_response += content
+                    usage.on_token(content)
+                    yield encoder.content(content)
                 
-                if route == "chat":
-                    # 채팅 에이전트 직접 호출
-                    # 요청의 messages 사용 (대화 히스토리 유지)
-                    if request.messages:
-                        # 시스템 프롬프트 유지를 위해 base_history의 첫 번째 메시지 사용
-                        chat_agent.history = [chat_agent.base_history[0]]
-                        # 사용자가 보낸 전체 대화 내역 추가
-                        for msg in request.messages:
-                            chat_agent.history.append({"role": msg.role, "content": msg.content})
-                    else:
-                        # 메시지가 없으면 새 대화 시작
-                        chat_agent.history = chat_agent.base_history.copy()
-                        chat_agent.history.append({"role": "user", "content": user_message})
-                    
-                    print(f"대화 히스토리 길이: {len(chat_agent.history)}")
-                    
-                    response = chat_agent.client.chat.completions.create(
-                        model=chat_agent.model,
-                        messages=chat_agent.history,
-                        stream=True
-                    )
-                    
-                    accumulated_response = ""
-                    for chunk in response:
-                        if chunk.choices and len(chunk.choices) > 0:
-                            delta = chunk.choices[0].delta
-                            if delta.content:
-                                accumulated_response += delta.content
-                                
-                                chunk_data = {
-                                    "id": completion_id,
-                                    "object": "chat.completion.chunk",
-                                    "created": created_time,
-                                    "model": request.model,
-                                    "choices": [
-                                        {
-                                            "index": 0,
-                                            "delta": {
-                                                "content": delta.content
-                                            },
-                                            "finish_reason": None
-                                        }
-                                    ]
-                                }
-                                yield f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n"
-                            
-                            if chunk.choices[0].finish_reason == "stop":
-                                break
-                    
-                    # 히스토리에 응답 추가
-                    if accumulated_response:
-                        chat_agent.history.append({"role": "assistant", "content": accumulated_response})
-                
-                else:
-                    # 검색 쿼리 생성
-                    print("🔧 검색 쿼리 생성 중...")
-                    tool_agent.history = tool_agent.base_history.copy()
-                    tool_agent.history.append({"role": "user", "content": f"다음 질문에 대한 최적의 검색어를 생성해주세요: {user_message}"})
-                    
-                    search_query_response = tool_agent.client.chat.completions.create(
-                        model=tool_agent.model,
-                        messages=tool_agent.history,
-                        stream=False
-                    )
-                    
-                    # 검색어 추출
-                    search_query = search_query_response.choices[0].message.content
-                    search_query = search_query.strip().strip('"').strip("'")
-                    if "검색어:" in search_query:
-                        search_query = search_query.split("검색어:")[-1].strip()
-                    
-                    print(f"🔍 생성된 검색 쿼리: {search_query}")
-                    
-                    # 검색 실행
-                    search_result = enhanced_search(search_query)
-                    print(f"📊 검색 완료: {len(search_result)} 글자")
-                    
-                    # 검색 결과를 바탕으로 최종 답변 생성
-                    final_prompt = f"""검색 결과를 바탕으로 사용자의 질문에 답변해주세요:
-
-검색 결과: {search_result}
-
-사용자 질문: {user_message}"""
-                    
-                    # 히스토리 관리 개선
-                    if request.messages:
-                        # 시스템 프롬프트 유지
-                        chat_agent.history = [chat_agent.base_history[0]]
-                        # 이전 대화 내역 유지 (마지막 사용자 메시지는 검색 결과와 함께 대체)
-                        for i, msg in enumerate(request.messages):
-                            if i < len(request.messages) - 1:
-                                chat_agent.history.append({"role": msg.role, "content": msg.content})
-                        # 검색 결과가 포함된 프롬프트 추가
-                        chat_agent.history.append({"role": "user", "content": final_prompt})
-                    else:
-                        chat_agent.history = chat_agent.base_history.copy()
-                        chat_agent.history.append({"role": "user", "content": final_prompt})
-                    
-                    print(f"검색 모드 히스토리 길이: {len(chat_agent.history)}")
-                    
-                    response = chat_agent.client.chat.completions.create(
-                        model=chat_agent.model,
-                        messages=chat_agent.history,
-                        stream=True
-                    )
-                    
-                    accumulated_response = ""
-                    for chunk in response:
-                        if chunk.choices and len(chunk.choices) > 0:
-                            delta = chunk.choices[0].delta
-                            if delta.content:
-                                accumulated_response += delta.content
-                                
-                                chunk_data = {
-                                    "id": completion_id,
-                                    "object": "chat.completion.chunk",
-                                    "created": created_time,
-                                    "model": request.model,
-                                    "choices": [
-                                        {
-                                            "index": 0,
-                                            "delta": {
-                                                "content": delta.content
-                                            },
-                                            "finish_reason": None
-                                        }
-                                    ]
-                                }
-                                yield f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n"
-                            
-                            if chunk.choices[0].finish_reason == "stop":
-                                break
-                    chat_agent.history.append({"role": "assistant", "content": accumulated_response})
+                # 정상 종료된 답변만 히스토리/응답 캐시에 반영 (중단되거나 잘린 답변은 저장하지 않음)
+                finished = finished_normally(scope, usage)
+                if accumulated_response and finished:
+                    session.append({"role": "assistant", "content": accumulated_response})
                 
-                # 종료 청크
-                final_chunk = {
-                    "id": completion_id,
-                    "object": "chat.completion.chunk",
-                    "created": created_time,
-                    "model": request.model,
-                    "choices": [
-                        {
-                            "index": 0,
-                            "delta": {},
-                            "finish_reason": "stop"
-                        }
-                    ]
-                }
-                yield f"data: {json.dumps(final_chunk, ensure_ascii=False)}\n\n"
-                yield "data: [DONE]\n\n"
+                # 종료 청크 (요청 단위 usage 포함)
+                final_usage = usage.finish()
+                yield encoder.finish(usage=final_usage)
+                yield DONE
+                completed = True
+                if cache_key is not None and finished:
+                    completion_cache.put(cache_key, accumulated_response, route, final_usage.prompt_tokens, final_usage.completion_tokens)
                 
-                print("✅ AI 스트림 완료")
+                timer.mark("generate", route=route)
+                print(f"✅ AI 스트림 완료 (단계별 ms: {timer.stages})")
                 
+            except StreamCancelled:
+                print("🛑 AI 스트림 취소됨")
+                yield encoder.finish(usage=usage.finish())
+                yield DONE
             except Exception as e:
+                errored = True
                 print(f"❌ AI 스트림 오류: {str(e)}")
-                error_chunk = {
-                    "id": completion_id,
-                    "object": "chat.completion.chunk",
-                    "created": created_time,
-                    "model": request.model,
-                    "choices": [
-                        {
-                            "index": 0,
-                            "delta": {
-                                "content": f"오류가 발생했습니다: {str(e)}"
-                            },
-                            "finish_reason": "stop"
-                        }
-                    ]
-                }
-                yield f"data: {json.dumps(error_chunk, ensure_ascii=False)}\n\n"
-                yield "data: [DONE]\n\n"
+                yield encoder.content(f"오류가 발생했습니다: {str(e)}", finish_reason="stop")
+                yield DONE
+            finally:
+                ticket.release()
+                watcher.cancel()
+                cancellation_registry.close(scope, completed=completed, errored=errored)
+                if speculative is not None:
+                    await speculative.cancel()
         
         return StreamingResponse(
             ai_stream_generator(), 
             media_type="text/plain",
+            # 제너레이터가 시작되기 전에 연결이 끊긴 경우에도 슬롯 반납
+            background=BackgroundTask(ticket.release),
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
@@ -244,34 +253,85 @@ async def chat_completions(request: ChatCompletionRequest):
                 "Access-Control-Allow-Headers": "*"
             }
         )
-            
+    
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ 전체 오류: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def complete_non_streaming(request: ChatCompletionRequest, http_request: Optional[Request], user_message: str, completion_id: str, created_time: int, cache_key: Optional[str] = None) -> ChatCompletionResponse:
+    """stream=false: 같은 라우팅/검색 파이프라인 + 비스트리밍 업스트림 호출로 ChatCompletionResponse 반환
+
+    http_request 가 없으면(배치 항목) 연결 끊김 감시 없이 abort 로만 취소된다.
+    """
+    completed = False
+    errored = False
+    scope = cancellation_registry.open(completion_id, request.conversationId)
+    watcher = asyncio.create_task(watch_disconnect(http_request, scope)) if http_request is not None else None
+    usage = RequestUsage(chat_agent.model)
+    try:
+        session = load_session(request, user_message)
+        timer = StageTimer()
+        route, messages, _ = await prepare_completion(user_message, session, scope, usage, timer)
+        
+        content = await scope.guard(complete_chat(chat_agent, messages, route=route, usage=usage))
+        timer.mark("generate", route=route)
+        finished = finished_normally(scope, usage)
+        if content and finished:
+            session.append({"role": "assistant", "content": content})
+        completed = True
+        print(f"✅ AI 응답 완료 (단계별 ms: {timer.stages})")
+        
+        final_usage = usage.finish()
+        if cache_key is not None and finished:
+            completion_cache.put(cache_key, content, route, final_usage.prompt_tokens, final_usage.completion_tokens)
+        return ChatCompletionResponse(
+            id=completion_id,
+            created=created_time,
+            model=request.model,
+            choices=[Choice(index=0, message=Message(role="assistant", content=content), finish_reason="stop")],
+            usage=final_usage
+        )
+    except StreamCancelled:
+        print("🛑 AI 응답 취소됨")
+        raise HTTPException(status_code=499, detail="요청이 취소되었습니다.")
+    except Exception as e:
+        errored = True
+        print(f"❌ AI 응답 오류: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        cancellation_registry.close(scope, completed=completed, errored=errored)
+
 @router.post("/ask/custom")
-async def ask_custom(request: ChatCompletionRequest):
+async def ask_custom(request: ChatCompletionRequest, http_request: Request):
     """jh-chat 커스텀 엔드포인트 - OpenAI 호환 형식"""
     try:
         user_message = request.messages[-1].content if request.messages else ""
         completion_id = f"chatcmpl-{str(uuid.uuid4())}"
         created_time = int(time.time())
+        encoder = ChunkEncoder(completion_id, created_time, request.model, compact=True)
+        ticket = await admit_chat()
         
         async def stream_generator():
+            completed = False
+            errored = False
+            scope = cancellation_registry.open(completion_id, request.conversationId)
+            watcher = asyncio.create_task(watch_disconnect(http_request, scope))
+            usage = RequestUsage(chat_agent.model, route="chat")
             try:
                 print("🚀 스트림 시작")
                 chunk_count = 0
                 
-                # 대화 히스토리 설정
+                # 대화 히스토리 설정 (마지막 사용자 메시지는 stream_agent_response 가 추가)
+                session = session_store.get(request.conversationId)
                 if request.messages:
-                    # 시스템 프롬프트 유지
-                    chat_agent.history = [chat_agent.base_history[0]]
-                    # 사용자가 보낸 모든 메시지 추가
-                    for msg in request.messages:
-                        chat_agent.history.append({"role": msg.role, "content": msg.content})
+                    session.replace([{"role": msg.role, "content": msg.content} for msg in request.messages[:-1]])
                 
                 # 실시간 스트리밍 응답
-                async for chunk_data in process_and_stream_response(user_message, completion_id, created_time, request.model, chat_agent):
+                async for chunk_data in process_and_stream_response(user_message, encoder, chat_agent, session, scope, usage):
                     if chunk_data and chunk_data.strip():
                         chunk_count += 1
                         print(f"📤 청크 {chunk_count}: {len(chunk_data)} bytes")
@@ -279,45 +339,26 @@ async def ask_custom(request: ChatCompletionRequest):
                 
                 print(f"✅ 스트림 완료 (총 {chunk_count}개 청크)")
                 
-                # 스트림 종료
-                final_chunk = ChatCompletionChunk(
-                    id=completion_id,
-                    object="chat.completion.chunk",
-                    created=created_time,
-                    model=request.model,
-                    choices=[
-                        Choice(
-                            index=0,
-                            delta=Delta(),
-                            finish_reason="stop"
-                        )
-                    ]
-                )
-                yield f"data: {final_chunk.model_dump_json()}\n\n"
-                yield "data: [DONE]\n\n"
+                # 스트림 종료 (요청 단위 usage 포함)
+                yield encoder.finish(usage=usage.finish())
+                yield DONE
+                completed = True
                 print("🏁 스트림 종료 신호 전송")
                 
             except Exception as e:
+                errored = True
                 print(f"❌ 스트림 제너레이터 오류: {str(e)}")
-                error_chunk = ChatCompletionChunk(
-                    id=completion_id,
-                    object="chat.completion.chunk",
-                    created=created_time,
-                    model=request.model,
-                    choices=[
-                        Choice(
-                            index=0,
-                            delta=Delta(content=f"오류가 발생했습니다: {str(e)}"),
-                            finish_reason="stop"
-                        )
-                    ]
-                )
-                yield f"data: {error_chunk.model_dump_json()}\n\n"
-                yield "data: [DONE]\n\n"
+                yield encoder.content(f"오류가 발생했습니다: {str(e)}", finish_reason="stop")
+                yield DONE
+            finally:
+                ticket.release()
+                watcher.cancel()
+                cancellation_registry.close(scope, completed=completed, errored=errored)
         
         return StreamingResponse(
             stream_generator(), 
             media_type="text/plain",
+            background=BackgroundTask(ticket.release),
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
@@ -327,13 +368,20 @@ async def ask_custom(request: ChatCompletionRequest):
             }
         )
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/ask/custom/abort")
-async def abort_custom_chat():
-    """jh-chat 커스텀 엔드포인트 중단 요청 처리"""
-    return {"message": "Chat aborted successfully"}
+async def abort_custom_chat(abort: Optional[AbortRequest] = None):
+    """jh-chat 커스텀 엔드포인트 중단 요청 처리 (completionId 또는 conversationId 로 진행 중인 스트림 취소)"""
+    cancelled = 0
+    if abort is not None:
+        for key in (abort.completionId, abort.conversationId):
+            if key:
+                cancelled += await cancellation_registry.cancel(key, reason="abort")
+    return {"message": "Chat aborted successfully", "cancelled": cancelled}
 
 @router.get("/v1/models")
 async def list_models():
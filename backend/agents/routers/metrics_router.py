@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from ..services.metrics import metrics
+
+router = APIRouter(prefix="/api", tags=["metrics"])
+
+@router.get("/metrics")
+async def get_metrics():
+    """프로세스 내 카운터/게이지/히스토그램 스냅샷"""
+    return metrics.snapshot()
@@ -0,0 +1,181 @@
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+from .metrics import metrics
+from .rate_limit import TokenBucket
+
+# 업스트림(모델/API 키)별 동시 요청 수용 제어 설정
+ADMISSION_RATE = float(os.getenv("ADMISSION_RATE", "10"))  # 초당 새 요청 수
+ADMISSION_BURST = float(os.getenv("ADMISSION_BURST", "20"))
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "32"))  # 동시에 열린 업스트림 스트림 수
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "64"))
+ADMISSION_MAX_WAIT_MS = float(os.getenv("ADMISSION_MAX_WAIT_MS", "5000"))  # 대기 기한 (넘을 것으로 예상되면 즉시 거절)
+ADMISSION_RATES = {}
+# "모델=초당요청,..." 형식으로 모델별 속도 덮어쓰기
+for _item in filter(None, os.getenv("ADMISSION_RATES", "").split(",")):
+    _model, _, _rate = _item.rpartition("=")
+    ADMISSION_RATES[_model.strip()] = float(_rate)
+
+# 요청 하나가 슬롯을 점유하는 시간 추정 (지수 이동 평균 가중치)
+_HOLD_EMA_ALPHA = 0.1
+
+class AdmissionRejected(Exception):
+    """대기 기한 안에 처리할 수 없어 거절됨 (retry_after: 다시 시도까지 권장 초)"""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"요청이 많아 처리할 수 없습니다. {math.ceil(retry_after)}초 후 다시 시도해주세요.")
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionTicket:
+    """수용된 요청의 슬롯 (응답이 끝나면 release, 여러 번 호출해도 한 번만 반납)"""
+
+    def __init__(self, lane: "_Lane"):
+        self._lane = lane
+        self._start = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._lane.release(time.monotonic() - self._start)
+
+class _Lane:
+    """키 하나의 토큰 버킷 + 동시 실행 슬롯 + 대기열"""
+
+    def __init__(self, key: str, rate: float, burst: float, max_concurrent: int, queue_size: int):
+        self.key = key
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.avg_hold = None  # 완료된 요청이 생기기 전에는 슬롯 대기를 추정하지 않음 (대기열 한도/기한으로만 제한)
+        self.waiters = deque()
+        self._wakeup = None
+
+    def estimate_wait(self, position: int) -> float:
+        """대기열 position 번째(0부터)로 들어갈 요청의 예상 대기 초"""
+        self.bucket._refill()
+        token_wait = max(0.0, (position + 1 - self.bucket.tokens) / self.bucket.rate)
+        excess = self.in_flight + position + 1 - self.max_concurrent
+        slot_wait = math.ceil(excess / self.max_concurrent) * self.avg_hold if excess > 0 and self.avg_hold is not None else 0.0
+        return max(token_wait, slot_wait)
+
+    def try_grant(self) -> bool:
+        while self.waiters and self.waiters[0].done():
+            self.waiters.popleft()
+        if self.waiters or self.in_flight >= self.max_concurrent or self.bucket.try_take() > 0:
+            return False
+        self.in_flight += 1
+        return True
+
+    def dispatch(self):
+        """대기열 앞에서부터 슬롯과 토큰이 허용하는 만큼 수용"""
+        self._wakeup = None
+        while self.waiters:
+            head = self.waiters[0]
+            if head.done():
+                self.waiters.popleft()
+                continue
+            if self.in_flight >= self.max_concurrent:
+                break
+            wait = self.bucket.try_take()
+            if wait > 0:
+                # 토큰이 찰 때 다시 확인
+                self._wakeup = asyncio.get_running_loop().call_later(wait, self.dispatch)
+                break
+            self.waiters.popleft()
+            self.in_flight += 1
+            head.set_result(None)
+        self.report()
+
+    def release(self, held: float):
+        self.in_flight -= 1
+        if self.avg_hold is None:
+            self.avg_hold = held
+        else:
+            self.avg_hold += _HOLD_EMA_ALPHA * (held - self.avg_hold)
+        if self._wakeup is None:
+            self.dispatch()
+        else:
+            self.report()
+
+    def report(self):
+        metrics.set_gauge("admission.queue_depth", sum(1 for waiter in self.waiters if not waiter.done()), key=self.key)
+        metrics.set_gauge("admission.in_flight", self.in_flight, key=self.key)
+
+class AdmissionController:
+    """업스트림 키별 수용 제어: 토큰 버킷 + 동시 실행 상한 + 기한이 있는 대기열
+
+    기한 안에 수용될 가망이 없는 요청은 대기열에 넣지 않고 즉시 AdmissionRejected(→ 429 Retry-After).
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, rate: float = ADMISSION_RATE, burst: float = ADMISSION_BURST, max_concurrent: int = ADMISSION_MAX_CONCURRENT, queue_size: int = ADMISSION_QUEUE_SIZE, max_wait_ms: float = ADMISSION_MAX_WAIT_MS):
+        self.rates = ADMISSION_RATES if rates is None else rates
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.max_wait = max_wait_ms / 1000
+        self._lanes: Dict[str, _Lane] = {}
+
+    def _lane(self, key: str, model: str) -> _Lane:
+        lane = self._lanes.get(key)
+        if lane is None:
+            rate = self.rates.get(model, self.rate)
+            lane = self._lanes[key] = _Lane(key, rate, max(self.burst, rate), self.max_concurrent, self.queue_size)
+        return lane
+
+    async def admit(self, model: str, api_key: Optional[str] = None, max_wait: Optional[float] = None) -> AdmissionTicket:
+        """슬롯을 얻을 때까지 대기 (기한 초과가 예상되거나 대기열이 가득 차면 즉시 거절)"""
+        key = admission_key(model, api_key)
+        lane = self._lane(key, model)
+        deadline = self.max_wait if max_wait is None else min(max_wait, self.max_wait)
+        start = time.monotonic()
+
+        if lane.try_grant():
+            return self._admitted(lane, start)
+
+        position = len(lane.waiters)
+        if position >= lane.queue_size:
+            self._reject(lane, "queue_full", lane.estimate_wait(position))
+        estimate = lane.estimate_wait(position)
+        if estimate > deadline:
+            self._reject(lane, "deadline", estimate)
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        lane.report()
+        try:
+            await asyncio.wait_for(waiter, deadline)
+        except asyncio.TimeoutError:
+            self._reject(lane, "timeout", lane.estimate_wait(len(lane.waiters)))
+        except BaseException:
+            # 수용 직후 취소된 경우 슬롯 반납
+            if waiter.done() and not waiter.cancelled():
+                lane.in_flight -= 1
+                lane.dispatch()
+            raise
+        finally:
+            lane.report()
+        return self._admitted(lane, start)
+
+    def _admitted(self, lane: _Lane, start: float) -> AdmissionTicket:
+        metrics.incr("admission.admitted", key=lane.key)
+        metrics.observe("admission.wait_ms", (time.monotonic() - start) * 1000, key=lane.key)
+        lane.report()
+        return AdmissionTicket(lane)
+
+    def _reject(self, lane: _Lane, reason: str, retry_after: float):
+        metrics.incr("admission.rejected", key=lane.key, reason=reason)
+        raise AdmissionRejected(reason, max(retry_after, 1.0))
+
+def admission_key(model: str, api_key: Optional[str] = None) -> str:
+    """모델 + API 키 끝 4자리 (키 원문은 메트릭에 남기지 않음)"""
+    return f"{model}#{api_key[-4:]}" if api_key else model
+
+# 전역 수용 제어기
+admission_controller = AdmissionController()
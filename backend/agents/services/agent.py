@@ -1,10 +1,11 @@
-import json
-import re
 import os
-import time
 from openai import OpenAI
 from dotenv import load_dotenv
 from ..tools.search_tools import TOOL_MAPPING
+from .clients import create_async_client
+from .tool_call_parser import ToolCallParser
+from .tool_executor import TOOL_MAX_ROUNDS, parse_tool_arguments, run_tools_sync, tool_messages
+from .context_window import context_budget, fit_messages, message_tokens
 
 class AIAgent:
     def __init__(self, model: str = None, tools=None, endpoint: str = "https://openrouter.ai/api/v1", system_prompt: str = None, is_chat_agent: bool = False):
@@ -14,8 +15,20 @@ class AIAgent:
         self.tools = tools
         self.is_chat_agent = is_chat_agent
         self.client = OpenAI(base_url=endpoint, api_key=os.getenv("OPENROUTER_API_KEY"))
+        # 서버 경로에서 사용하는 비동기 클라이언트 (공유 커넥션 풀)
+        self.async_client = create_async_client(endpoint, os.getenv("OPENROUTER_API_KEY"))
         self.base_history = [{"role": "system", "content": system_prompt}]
         self.history = self.base_history.copy()
+        # 시스템 프롬프트는 항상 포함되므로 모델 예산에서 미리 제외
+        self.history_budget = context_budget(model) - message_tokens(self.base_history[0])
+    
+    def build_messages(self, history):
+        """공유 시스템 프롬프트 + 대화별 히스토리로 요청 메시지 구성 (에이전트 상태 변경 없음)"""
+        return [self.base_history[0], *history]
+    
+    def build_window(self, session, reserve: int = 0, end=None):
+        """시스템 프롬프트 + 토큰 예산에 맞춘 세션 히스토리 (reserve: 뒤에 덧붙일 메시지 몫)"""
+        return self.build_messages(session.window(self.history_budget - reserve, end))
         
     def text_response(self, user_prompt, context_info=None):
         if context_info:
@@ -25,55 +38,59 @@ class AIAgent:
             
         self.history.append({"role": "user", "content": enhanced_prompt})
         
-        if len(self.history) > 10:
-            self.history = [self.history[0]] + self.history[-8:]
-        
-        params = {
-            "model": self.model,
-            "messages": self.history,
-            "stream": True,
-        }
-        
-        if self.tools:
-            params["tools"] = self.tools
-            params["tool_choice"] = "auto"
-        
-        response = self.client.chat.completions.create(**params)
+        # 토큰 예산을 넘는 오래된 메시지는 제거 (시스템 프롬프트 고정)
+        self.history = [self.history[0], *fit_messages(self.history[1:], self.history_budget)]
         
         final_response = ""
-        function_name = ""
-        function_args = ""
-        json_buffer = ""
-        
-        for chunk in response:
-            delta = chunk.choices[0].delta
+        for round_index in range(TOOL_MAX_ROUNDS + 1):
+            params = {
+                "model": self.model,
+                "messages": self.history,
+                "stream": True,
+            }
             
-            if delta.content:
-                print(delta.content, end="", flush=True)
-                final_response += delta.content
-                
-            elif delta.tool_calls:
-                tool_call = delta.tool_calls[0]
+            if self.tools and round_index < TOOL_MAX_ROUNDS:
+                params["tools"] = self.tools
+                params["tool_choice"] = "auto"
+            
+            response = self.client.chat.completions.create(**params)
+            
+            final_response = ""
+            parser = ToolCallParser()
+            completed_calls = []
+            
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
                 
-                if tool_call.function.name:
-                    function_name += tool_call.function.name
-                    print(f"\nAction: {tool_call.function.name}", end="", flush=True)
-                    
-                if tool_call.function.arguments:
-                    json_buffer += tool_call.function.arguments
-                    print(tool_call.function.arguments, end="", flush=True)
+                if delta.content:
+                    print(delta.content, end="", flush=True)
+                    final_response += delta.content
                     
-                    if json_buffer.count('{') == json_buffer.count('}') and json_buffer.count('{') > 0:
-                        function_args = json_buffer
-                        json_buffer = ""
+                elif delta.tool_calls:
+                    for tool_call in delta.tool_calls:
+                        if tool_call.function and tool_call.function.name:
+                            print(f"\nAction: {tool_call.function.name}", end="", flush=True)
+                        if tool_call.function and tool_call.function.arguments:
+                            print(tool_call.function.arguments, end="", flush=True)
+                    completed_calls.extend(parser.feed(delta.tool_calls))
+            completed_calls.extend(parser.finish())
+            
+            if not completed_calls:
+                break
+            
+            # 모든 도구 호출을 스레드 풀에서 동시에 실행하고 tool_calls 메시지 + tool 메시지를 붙여 다시 요청
+            results = run_tools_sync(completed_calls)
+            messages = tool_messages(results)
+            if final_response:
+                messages[0]["content"] = final_response
+            self.history.extend(messages)
+            print(f"\nObservation: 검색 결과를 받았습니다. ({sum(1 for result in results if result.ok)}/{len(results)}개 성공)")
         
         if final_response:
             self.history.append({"role": "assistant", "content": final_response})
-            return final_response
-        elif function_name:
-            return (function_name, function_args)
-        else:
-            return ""
+        return final_response
 
     def get_tool_response(self, *args):
         if len(args) != 2:
@@ -82,22 +99,8 @@ class AIAgent:
         tool_name = args[0]
         raw_args = args[1]
         
-        # JSON 유효성 검사 강화
-        try:
-            tool_args = json.loads(raw_args)
-        except json.JSONDecodeError:
-            last_brace = raw_args.rfind('}')
-            if last_brace != -1:
-                try:
-                    tool_args = json.loads(raw_args[:last_brace+1])
-                except:
-                    match = re.search(r'"query":\s*"([^"]*)"', raw_args)
-                    if match:
-                        tool_args = {"query": match.group(1)}
-                    else:
-                        tool_args = {"query": raw_args}
-            else:
-                tool_args = {"query": raw_args}
+        # JSON 유효성 검사 강화 (깨진 인자는 query 만 복구)
+        tool_args = parse_tool_arguments(raw_args)
         
         tool_result = TOOL_MAPPING[tool_name](**tool_args)
         
@@ -1,7 +1,11 @@
-import time
+import os
 from .agent import AIAgent
 from ..tools.search_tools import TOOLS, ROUTING
 
+# 대체 대화 모델 (기본 대화 모델의 첫 토큰이 늦거나 실패할 때 사용)
+CHAT_FALLBACK_MODEL = os.getenv("CHAT_FALLBACK_MODEL", "openai/gpt-4.1-mini")
+CHAT_FALLBACK_ENDPOINT = os.getenv("CHAT_FALLBACK_ENDPOINT", "https://openrouter.ai/api/v1")
+
 # 에이전트 팩토리: 다양한 타입의 에이전트를 생성
 def create_route_agent():
     """라우팅 에이전트 생성"""
@@ -13,16 +17,22 @@ def create_route_agent():
 - 현재 정보나 검색이 필요한 경우: tool
 - 일반적인 대화나 인사: chat
 
+tool 인 경우 query 에 최적의 검색어를 함께 넣으세요 (chat 이면 빈 문자열).
+검색어 생성 규칙:
+1. 사용자가 구체적인 검색어를 제공하면 그대로 사용
+2. 질문의 핵심 키워드만 남기고 "알려줘", "검색해줘" 같은 요청 표현은 제외
+
 반드시 routing 함수를 호출하여 응답하세요."""
     )
 
-def create_chat_agent():
+def create_chat_agent(model: str = "deepseek/deepseek-chat-v3-0324:free", endpoint: str = "https://openrouter.ai/api/v1"):
     """대화 에이전트 생성"""
     return AIAgent(
-        model="deepseek/deepseek-chat-v3-0324:free",
+        model=model,
+        endpoint=endpoint,
         tools=None,
         is_chat_agent=True,
-        system_prompt=f"""You are a helpful assistant.
+        system_prompt="""You are a helpful assistant.
         
         
         적극적으로 대화를 진행하세요.
@@ -34,20 +44,24 @@ def create_chat_agent():
         (참고로, 혹시라도 "날씨" 관련 질문이 있으면 바로 테이블로 깔끔하게 알려줄게! 아니면 자연스럽게 재밌는 주제로 대화 이어갈게요✨)
         => 이러한 언급 조차 X
 
-        Current time: {time.strftime('%Y-%m-%d %H:%M:%S')}"""
+        현재 시간은 마지막 사용자 메시지 끝에 함께 전달됩니다."""
         )
 
+def create_fallback_chat_agent():
+    """헤지/장애 시 사용하는 대체 대화 에이전트 (같은 시스템 프롬프트, 다른 모델/엔드포인트)"""
+    return create_chat_agent(model=CHAT_FALLBACK_MODEL, endpoint=CHAT_FALLBACK_ENDPOINT)
+
 def create_tool_agent():
     """도구 에이전트 생성"""
     return AIAgent(
         model="openai/gpt-4.1-mini",
         tools=TOOLS,
-        system_prompt=f"""당신은 사용자의 요청에 따라 웹 검색을 수행하는 AI 에이전트입니다.
+        system_prompt="""당신은 사용자의 요청에 따라 웹 검색을 수행하는 AI 에이전트입니다.
 
 검색어 생성 규칙:
 1. 사용자가 구체적인 검색어를 제공하면 그대로 사용
 2. "다시 알아봐줘", "재검색해줘" 등의 요청이면 이전 검색 주제를 참고하여 검색어 생성
 3. 애매한 요청이면 사용자에게 명확히 질문
 
-현재 시간: {time.strftime('%Y-%m-%d %H:%M:%S')}"""
+현재 시간은 마지막 사용자 메시지 끝에 함께 전달됩니다."""
     ) 
\ No newline at end of file
@@ -0,0 +1,141 @@
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from .metrics import metrics
+from .rate_limit import UpstreamLimits, upstream_limits
+
+# 배치 작업 설정
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+BATCH_DEFAULT_CONCURRENCY = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", "4"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+BATCH_HISTORY_SIZE = int(os.getenv("BATCH_HISTORY_SIZE", "50"))
+# 모델별 초당 업스트림 요청 수 (기본값 + "모델=초당요청,..." 형식 덮어쓰기)
+BATCH_UPSTREAM_RATE = float(os.getenv("BATCH_UPSTREAM_RATE", "5"))
+BATCH_UPSTREAM_RATES = {}
+for _item in filter(None, os.getenv("BATCH_UPSTREAM_RATES", "").split(",")):
+    _model, _, _rate = _item.rpartition("=")
+    BATCH_UPSTREAM_RATES[_model.strip()] = float(_rate)
+
+class BatchItem:
+    """배치 항목 하나 (요청 또는 파싱 오류)"""
+
+    def __init__(self, index: int, custom_id: Optional[str] = None, request=None, error: Optional[str] = None):
+        self.index = index
+        self.custom_id = custom_id
+        self.request = request
+        self.error = error
+
+class BatchJob:
+    """배치 진행 상황 (GET /api/v1/batch/{id} 와 메트릭으로 노출)"""
+
+    def __init__(self, total: int, concurrency: int):
+        self.id = f"batch-{uuid.uuid4()}"
+        self.total = total
+        self.concurrency = concurrency
+        self.completed = 0
+        self.failed = 0
+        self.running = 0
+        self.started = time.monotonic()
+        self.finished_at = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def snapshot(self) -> Dict:
+        elapsed = (self.finished_at or time.monotonic()) - self.started
+        finished = self.completed + self.failed
+        return {
+            "id": self.id,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": self.running,
+            "pending": self.total - finished - self.running,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(elapsed, 2),
+            "items_per_second": round(finished / elapsed, 2) if elapsed > 0 else 0.0,
+            "done": self.done,
+        }
+
+class BatchRegistry:
+    """최근 배치 작업 보관 (진행 중 작업 + 마지막 BATCH_HISTORY_SIZE 개)"""
+
+    def __init__(self, history_size: int = BATCH_HISTORY_SIZE):
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+
+    def create(self, total: int, concurrency: int) -> BatchJob:
+        job = BatchJob(total, concurrency)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.history_size:
+            oldest = next(iter(self._jobs.values()))
+            if not oldest.done:
+                break
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+batch_registry = BatchRegistry()
+
+def batch_upstream_limits() -> UpstreamLimits:
+    """배치 작업마다 새 모델별 속도 제한 (동시에 도는 배치끼리는 각자 제한)"""
+    return UpstreamLimits(BATCH_UPSTREAM_RATES, BATCH_UPSTREAM_RATE)
+
+async def run_batch(job: BatchJob, items: List[BatchItem], handler: Callable[[BatchItem], Awaitable[Dict]], limits: Optional[UpstreamLimits] = None) -> AsyncIterator[Dict]:
+    """항목을 최대 job.concurrency 개씩 동시에 처리하고 완료되는 순서대로 결과 반환
+
+    실행 중인 태스크 수만 concurrency 로 유지하므로 항목 수가 많아도 태스크를 한꺼번에 만들지 않는다.
+    결과를 다 읽기 전에 중단되면(클라이언트 연결 끊김) 남은 태스크를 취소한다.
+    """
+    async def run_item(item: BatchItem) -> Dict:
+        # 태스크마다 컨텍스트가 복사되므로 이 배치의 업스트림 제한은 이 항목에만 적용
+        upstream_limits.set(limits)
+        start = time.perf_counter()
+        try:
+            result = await handler(item)
+        except Exception as e:
+            result = {"status_code": getattr(e, "status_code", 500), "error": {"message": str(getattr(e, "detail", e))}}
+        metrics.observe("batch.item_latency_ms", (time.perf_counter() - start) * 1000)
+        return {"index": item.index, "custom_id": item.custom_id, **result}
+
+    pending = iter(items)
+    running = set()
+    try:
+        while True:
+            for item in pending:
+                if item.error is not None:
+                    # 파싱/검증 오류 항목은 실행하지 않고 바로 결과로 반환
+                    job.failed += 1
+                    metrics.incr("batch.items", status="error")
+                    yield {"index": item.index, "custom_id": item.custom_id, "status_code": 400, "error": {"message": item.error}}
+                    continue
+                running.add(asyncio.ensure_future(run_item(item)))
+                if len(running) >= job.concurrency:
+                    break
+            job.running = len(running)
+            metrics.set_gauge("batch.running", sum(j.running for j in batch_registry._jobs.values()))
+            if not running:
+                break
+
+            finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                result = task.result()
+                if result.get("error") is None:
+                    job.completed += 1
+                    metrics.incr("batch.items", status="ok")
+                else:
+                    job.failed += 1
+                    metrics.incr("batch.items", status="error")
+                yield result
+    finally:
+        for task in running:
+            task.cancel()
+        job.running = 0
+        job.finished_at = time.monotonic()
+        metrics.set_gauge("batch.running", sum(j.running for j in batch_registry._jobs.values()))
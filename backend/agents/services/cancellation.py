@@ -0,0 +1,150 @@
+import asyncio
+import time
+from typing import Dict, Optional, Set
+from .metrics import metrics
+
+# 완료/대화 id 기반 취소 레지스트리 (abort 엔드포인트와 클라이언트 연결 끊김 감지에서 사용)
+
+# 절약량 추정에 쓰는 정상 완료 스트림의 지수 이동 평균 가중치
+_EMA_ALPHA = 0.1
+
+class StreamCancelled(Exception):
+    """취소된 스트림에서 대기 중이던 작업이 중단됨"""
+
+class CancelScope:
+    """요청 하나의 취소 상태 (업스트림 스트림 종료 함수와 진행 중 작업을 보관)"""
+
+    def __init__(self, registry: "CancellationRegistry", keys):
+        self.registry = registry
+        self.keys = keys
+        self.started = time.monotonic()
+        self.tokens = 0
+        self.cancelled = False
+        self.finished = False
+        self.reason = None
+        self._closers = []
+        self._tasks: Set[asyncio.Task] = set()
+
+    def add_closer(self, closer):
+        """취소 시 호출할 비동기 종료 함수 등록 (예: 업스트림 AsyncStream.close)"""
+        self._closers.append(closer)
+
+    def remove_closer(self, closer):
+        if closer in self._closers:
+            self._closers.remove(closer)
+
+    def add_tokens(self, count: int = 1):
+        self.tokens += count
+
+    async def guard(self, awaitable):
+        """취소 가능한 작업으로 실행 (취소되면 StreamCancelled)"""
+        if self.cancelled:
+            raise StreamCancelled(self.reason)
+        task = asyncio.ensure_future(awaitable)
+        self._tasks.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if self.cancelled and task.cancelled():
+                raise StreamCancelled(self.reason)
+            raise
+        finally:
+            self._tasks.discard(task)
+
+    async def cancel(self, reason: str):
+        """업스트림 스트림을 즉시 닫고 진행 중인 작업(검색 등) 취소"""
+        if self.cancelled or self.finished:
+            return
+        self.cancelled = True
+        self.reason = reason
+
+        for task in list(self._tasks):
+            task.cancel()
+        for closer in list(self._closers):
+            try:
+                await closer()
+            except Exception as e:
+                print(f"⚠️ 업스트림 종료 오류: {str(e)}")
+        self.registry._record_cancel(self)
+
+class CancellationRegistry:
+    def __init__(self):
+        self._scopes: Dict[str, Set[CancelScope]] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self.avg_tokens = 0.0
+        self.avg_seconds = 0.0
+
+    def open(self, *keys: Optional[str]) -> CancelScope:
+        """completion id / conversationId 로 스코프 등록"""
+        keys = tuple(key for key in keys if key)
+        scope = CancelScope(self, keys)
+        for key in keys:
+            self._scopes.setdefault(key, set()).add(scope)
+        return scope
+
+    def close(self, scope: CancelScope, completed: bool = True, errored: bool = False):
+        """스트림 종료 시 호출. 정상 완료가 아니면 연결 끊김으로 보고 백그라운드에서 취소
+
+        errored=True 는 업스트림/내부 오류로 끝난 경우로, 취소(절약량) 통계에 넣지 않고 오류로만 센다.
+        """
+        for key in scope.keys:
+            scopes = self._scopes.get(key)
+            if scopes is not None:
+                scopes.discard(scope)
+                if not scopes:
+                    del self._scopes[key]
+
+        if scope.cancelled:
+            return
+        if errored:
+            scope.finished = True
+            metrics.incr("stream.errors")
+        elif completed:
+            scope.finished = True
+            self._record_completion(scope)
+        else:
+            # 제너레이터가 취소된 상태에서는 await 할 수 없으므로 별도 태스크로 정리
+            task = asyncio.ensure_future(scope.cancel("disconnect"))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def cancel(self, key: str, reason: str = "abort") -> int:
+        """key 에 연결된 모든 스코프 취소 후 취소된 개수 반환"""
+        scopes = list(self._scopes.get(key, ()))
+        for scope in scopes:
+            await scope.cancel(reason)
+        return len(scopes)
+
+    def active_count(self) -> int:
+        return len({scope for scopes in self._scopes.values() for scope in scopes})
+
+    def _record_completion(self, scope: CancelScope):
+        elapsed = time.monotonic() - scope.started
+        if self.avg_tokens == 0.0:
+            self.avg_tokens, self.avg_seconds = float(scope.tokens), elapsed
+        else:
+            self.avg_tokens += _EMA_ALPHA * (scope.tokens - self.avg_tokens)
+            self.avg_seconds += _EMA_ALPHA * (elapsed - self.avg_seconds)
+
+    def _record_cancel(self, scope: CancelScope):
+        """취소로 절약한 토큰/시간 추정 (정상 완료 스트림 평균 대비 남은 양)"""
+        elapsed = time.monotonic() - scope.started
+        saved_tokens = max(self.avg_tokens - scope.tokens, 0.0)
+        saved_seconds = max(self.avg_seconds - elapsed, 0.0)
+
+        metrics.incr("cancel.count", reason=scope.reason)
+        metrics.incr("cancel.saved_tokens", saved_tokens)
+        metrics.incr("cancel.saved_seconds", saved_seconds)
+        metrics.observe("cancel.saved_tokens_per_request", saved_tokens)
+        print(f"🛑 스트림 취소 ({scope.reason}): {scope.tokens} 토큰 생성 후 중단, 약 {saved_tokens:.0f} 토큰 / {saved_seconds:.1f}초 절약")
+
+async def watch_disconnect(http_request, scope: CancelScope, interval: float = 0.5):
+    """클라이언트 연결 끊김을 주기적으로 확인해 스코프 취소"""
+    while not scope.cancelled and not scope.finished:
+        if await http_request.is_disconnected():
+            await scope.cancel("disconnect")
+            return
+        await asyncio.sleep(interval)
+
+# 전역 레지스트리
+cancellation_registry = CancellationRegistry()
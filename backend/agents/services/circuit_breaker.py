@@ -0,0 +1,88 @@
+import os
+import time
+from collections import deque
+from typing import Dict
+from .metrics import metrics
+
+# 업스트림별 서킷 브레이커 설정
+BREAKER_WINDOW = int(os.getenv("BREAKER_WINDOW", "20"))  # 최근 결과 개수
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+class CircuitBreaker:
+    """최근 BREAKER_WINDOW 개 결과의 오류율이 높으면 열림 (쿨다운 후 시험 요청 1개만 허용)
+
+    - closed: 모두 허용, 오류율이 임계값 이상이면 open
+    - open: 거부, 쿨다운이 지나면 half_open
+    - half_open: 시험 요청 하나만 허용, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self, name: str, window: int = BREAKER_WINDOW, min_calls: int = BREAKER_MIN_CALLS, error_rate: float = BREAKER_ERROR_RATE, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._results = deque(maxlen=window)
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """이번 요청을 보내도 되는지 (half_open 시험 요청을 차지함)"""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                metrics.incr("breaker.rejected", upstream=self.name)
+                return False
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                metrics.incr("breaker.rejected", upstream=self.name)
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self._results.append(True)
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+            self._results.clear()
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        self._results.append(False)
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+            self._open()
+            return
+        failures = self._results.count(False)
+        if len(self._results) >= self.min_calls and failures / len(self._results) >= self.error_rate:
+            self._open()
+
+    def release(self):
+        """결과 없이 끝난 요청 (헤징에서 진 쪽 등) - half_open 시험 자리만 반납"""
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self._set_state(OPEN)
+        metrics.incr("breaker.opened", upstream=self.name)
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"⚡ 서킷 브레이커 {self.name}: {self.state} -> {state}")
+        self.state = state
+        metrics.set_gauge("breaker.state", _STATE_VALUE[state], upstream=self.name)
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """업스트림(모델) 이름별 브레이커 (프로세스 전체 공유)"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
@@ -0,0 +1,44 @@
+import os
+import httpx
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 업스트림 커넥션 풀 설정 (모든 에이전트가 하나의 풀을 공유)
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "20"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30"))
+UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", "10"))
+UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", "120"))
+
+_http_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """공유 비동기 HTTP 클라이언트 반환 (최초 호출 시 생성)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(UPSTREAM_READ_TIMEOUT, connect=UPSTREAM_CONNECT_TIMEOUT),
+        )
+    return _http_client
+
+def create_async_client(endpoint: str, api_key: str = None) -> AsyncOpenAI:
+    """공유 커넥션 풀을 사용하는 OpenAI 호환 비동기 클라이언트 생성"""
+    return AsyncOpenAI(
+        base_url=endpoint,
+        api_key=api_key or os.getenv("OPENROUTER_API_KEY"),
+        http_client=get_http_client(),
+    )
+
+async def close_http_client():
+    """공유 HTTP 클라이언트 종료 (서버 종료 시 호출)"""
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
+from ..models.schemas import Usage
+from .metrics import metrics
+
+# 완전 일치 응답 캐시 설정 (기본 비활성, 결정적/저온 요청에만 적용)
+COMPLETION_CACHE_ENABLED = os.getenv("COMPLETION_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+COMPLETION_CACHE_MAX_TEMPERATURE = float(os.getenv("COMPLETION_CACHE_MAX_TEMPERATURE", "0.3"))
+COMPLETION_CACHE_MAX_ENTRIES = int(os.getenv("COMPLETION_CACHE_MAX_ENTRIES", "1024"))
+COMPLETION_CACHE_MAX_BYTES = int(os.getenv("COMPLETION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+COMPLETION_CACHE_TTL_SECONDS = float(os.getenv("COMPLETION_CACHE_TTL_SECONDS", "600"))
+# 검색 결과 기반 답변은 금방 낡으므로 더 짧게 유지
+COMPLETION_CACHE_TOOL_TTL_SECONDS = float(os.getenv("COMPLETION_CACHE_TOOL_TTL_SECONDS", "120"))
+# 재생 시 청크 하나에 담는 글자 수 (일반 스트림과 비슷한 프레임 구성)
+COMPLETION_CACHE_REPLAY_CHARS = int(os.getenv("COMPLETION_CACHE_REPLAY_CHARS", "16"))
+
+_ENTRY_OVERHEAD_BYTES = 300
+
+def _normalize(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+def completion_key(model: str, messages: List[Dict], temperature: Optional[float]) -> str:
+    """(모델, 정규화된 메시지 목록, temperature) 해시"""
+    payload = json.dumps(
+        [model, [[message.get("role"), _normalize(message.get("content"))] for message in messages], round(temperature or 0.0, 3)],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class CachedCompletion:
+    def __init__(self, content: str, route: str, prompt_tokens: int, completion_tokens: int, ttl: float):
+        self.content = content
+        self.route = route
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.expires_at = time.monotonic() + ttl
+        self.size = len(content) * 4 + _ENTRY_OVERHEAD_BYTES
+
+    def pieces(self) -> Iterator[str]:
+        """재생용 텍스트 조각"""
+        for offset in range(0, len(self.content), COMPLETION_CACHE_REPLAY_CHARS):
+            yield self.content[offset:offset + COMPLETION_CACHE_REPLAY_CHARS]
+
+    def usage(self, latency_ms: float) -> Usage:
+        """캐시 재생 usage (프롬프트 전체가 캐시 적중, 업스트림 호출 없음)"""
+        return Usage(
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            total_tokens=self.prompt_tokens + self.completion_tokens,
+            prompt_tokens_details={"cached_tokens": self.prompt_tokens},
+            time_to_first_token_ms=round(latency_ms, 1),
+            latency_ms=round(latency_ms, 1),
+        )
+
+class CompletionCache:
+    """완전 일치 응답 캐시 (항목별 TTL + 개수/메모리 상한 LRU)"""
+
+    def __init__(self, max_entries: int = COMPLETION_CACHE_MAX_ENTRIES, max_bytes: int = COMPLETION_CACHE_MAX_BYTES, enabled: bool = COMPLETION_CACHE_ENABLED, max_temperature: float = COMPLETION_CACHE_MAX_TEMPERATURE):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.max_temperature = max_temperature
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, CachedCompletion]" = OrderedDict()
+
+    def cacheable(self, temperature: Optional[float]) -> bool:
+        """결정적이거나 temperature 가 낮은 요청만 캐시"""
+        return self.enabled and temperature is not None and temperature <= self.max_temperature
+
+    def get(self, key: str) -> Optional[CachedCompletion]:
+        entry = self._entries.get(key)
+        if entry is None:
+            metrics.incr("completion_cache.miss")
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._drop(key)
+            metrics.incr("completion_cache.expired")
+            return None
+        self._entries.move_to_end(key)
+        metrics.incr("completion_cache.hit", route=entry.route)
+        return entry
+
+    def put(self, key: str, content: str, route: str, prompt_tokens: int = 0, completion_tokens: int = 0):
+        if not content:
+            return
+        ttl = COMPLETION_CACHE_TOOL_TTL_SECONDS if route == "tool" else COMPLETION_CACHE_TTL_SECONDS
+        entry = CachedCompletion(content, route, prompt_tokens, completion_tokens, ttl)
+        if entry.size > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = entry
+        self.total_bytes += entry.size
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            metrics.incr("completion_cache.evicted")
+        metrics.set_gauge("completion_cache.entries", len(self._entries))
+        metrics.set_gauge("completion_cache.bytes", self.total_bytes)
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+
+    def __len__(self):
+        return len(self._entries)
+
+# 전역 캐시
+completion_cache = CompletionCache()
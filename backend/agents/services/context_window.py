@@ -0,0 +1,52 @@
+import math
+import os
+from typing import Dict, List
+
+# 토큰 예산 기반 대화 창 설정 (응답용 여유분을 뺀 프롬프트 예산)
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "4000"))
+CONTEXT_TOKEN_BUDGETS = {
+    "openai/gpt-4.1-mini": 16000,
+    "deepseek/deepseek-chat-v3-0324:free": 8000,
+}
+# "모델=토큰,모델=토큰" 형식으로 모델별 예산 덮어쓰기
+for _item in filter(None, os.getenv("CONTEXT_TOKEN_BUDGETS", "").split(",")):
+    _model, _, _tokens = _item.rpartition("=")
+    CONTEXT_TOKEN_BUDGETS[_model.strip()] = int(_tokens)
+
+# 예산을 넘으면 이 비율까지 한 번에 잘라 창 시작점을 여러 턴 동안 고정 (업스트림 프롬프트 캐시 유지)
+CONTEXT_TRIM_RATIO = float(os.getenv("CONTEXT_TRIM_RATIO", "0.75"))
+
+# 메시지 하나당 역할/구분자 토큰 근사치
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 토큰 수 추정 (ASCII 약 4자당 1토큰, 한글 등 비 ASCII 는 1자당 1토큰)"""
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+def message_tokens(message: Dict) -> int:
+    tokens = _MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or ():
+        function = tool_call.get("function") or {}
+        tokens += estimate_tokens(function.get("name") or "") + estimate_tokens(function.get("arguments") or "")
+    return tokens
+
+def context_budget(model: str) -> int:
+    """모델별 프롬프트 토큰 예산 (미등록 모델은 CONTEXT_TOKEN_BUDGET)"""
+    return CONTEXT_TOKEN_BUDGETS.get(model, CONTEXT_TOKEN_BUDGET)
+
+def fit_messages(messages: List[Dict], budget: int) -> List[Dict]:
+    """최신 메시지부터 예산을 채우는 만큼만 반환 (마지막 메시지는 항상 포함, 짝 없는 tool 메시지로 시작하지 않음)"""
+    used = 0
+    start = len(messages)
+    while start > 0:
+        tokens = message_tokens(messages[start - 1])
+        if used + tokens > budget and start < len(messages):
+            break
+        used += tokens
+        start -= 1
+    while start < len(messages) - 1 and messages[start].get("role") == "tool":
+        start += 1
+    return messages[start:]
@@ -0,0 +1,184 @@
+import asyncio
+import os
+import time
+from .cancellation import StreamCancelled
+from .circuit_breaker import get_breaker
+from .metrics import metrics
+from .streaming import stream_chat_deltas
+from .usage import RequestUsage
+
+# 헤지 스트리밍 설정: 첫 토큰이 늦으면 대체 모델로 같은 요청을 보내고 먼저 답하는 쪽을 사용
+# 헤지가 발동하면 CHAT_FALLBACK_MODEL 로 유료 업스트림 호출이 한 번 더 나가고, 이 호출은 수용 제어(admit_chat)를 거치지 않으므로 기본값은 꺼짐
+HEDGED_STREAMING = os.getenv("HEDGED_STREAMING", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))  # 기본 모델 첫 토큰 시간의 이 분위수를 넘으면 헤지
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))  # 표본이 적을 때는 HEDGE_DEFAULT_DELAY_MS 사용
+HEDGE_DEFAULT_DELAY_MS = float(os.getenv("HEDGE_DEFAULT_DELAY_MS", "3000"))
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "300"))
+HEDGE_MAX_DELAY_MS = float(os.getenv("HEDGE_MAX_DELAY_MS", "10000"))
+
+_END = object()
+
+class UpstreamUnavailable(Exception):
+    """모든 업스트림의 서킷 브레이커가 열려 있음"""
+
+def hedge_delay(model: str) -> float:
+    """헤지 요청을 보내기까지 기다릴 초 (모델별 업스트림 첫 토큰 시간 분위수)"""
+    histogram = metrics.histogram("upstream.ttft_ms", model=model)
+    if histogram is None or histogram.count < HEDGE_MIN_SAMPLES:
+        delay_ms = HEDGE_DEFAULT_DELAY_MS
+    else:
+        delay_ms = min(max(histogram.percentile(HEDGE_PERCENTILE), HEDGE_MIN_DELAY_MS), HEDGE_MAX_DELAY_MS)
+    return delay_ms / 1000
+
+class _Attempt:
+    """업스트림 하나로 보낸 스트림 (첫 항목은 future, 이후 토큰은 큐)"""
+
+    def __init__(self, agent, messages, scope, route):
+        self.agent = agent
+        # 시도별 사용량 (이긴 쪽만 요청 usage 에 합산)
+        self.usage = RequestUsage(agent.model, route)
+        self.breaker = get_breaker(agent.model)
+        self.first = asyncio.get_running_loop().create_future()
+        self.finished = False
+        self._released = False
+        self._queue = asyncio.Queue()
+        self._start = time.perf_counter()
+        self._task = asyncio.create_task(self._pump(messages, scope, route))
+
+    async def _pump(self, messages, scope, route):
+        try:
+            async for content in stream_chat_deltas(self.agent, messages, scope, route=route, usage=self.usage):
+                if not self.first.done():
+                    metrics.observe("upstream.ttft_ms", (time.perf_counter() - self._start) * 1000, model=self.agent.model)
+                    self.first.set_result(content)
+                else:
+                    self._queue.put_nowait(content)
+            self.finished = True
+            self.breaker.record_success()
+            self._put(_END)
+        except asyncio.CancelledError:
+            raise
+        except StreamCancelled as e:
+            # 요청 취소는 업스트림 상태와 무관하므로 실패로 세지 않고 half_open 시험 자리만 반납
+            self._release()
+            self._put(e)
+        except Exception as e:
+            self.finished = True
+            self.breaker.record_failure()
+            # 예외는 결과 값으로 전달 (future 예외 미조회 경고 방지)
+            self._put(e)
+
+    def _put(self, item):
+        if not self.first.done():
+            self.first.set_result(item)
+        else:
+            self._queue.put_nowait(item)
+
+    async def rest(self):
+        """첫 토큰 이후의 토큰 (예외는 다시 발생)"""
+        while True:
+            item = await self._queue.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def stop(self):
+        if not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if not self.first.done():
+            self.first.cancel()
+        # 결과 없이 취소된 요청은 성공/실패로 세지 않고 half_open 시험 자리만 반납
+        if not self.finished:
+            self._release()
+
+    def _release(self):
+        if not self._released:
+            self._released = True
+            self.breaker.release()
+
+async def stream_hedged(primary, fallback, messages, scope=None, route=None, usage=None):
+    """기본 에이전트로 스트리밍하되 첫 토큰이 hedge_delay 안에 오지 않거나 실패하면 대체 에이전트로도 요청
+
+    먼저 첫 토큰을 보낸 쪽의 스트림을 끝까지 전달하고 나머지는 즉시 취소한다.
+    사용량은 시도별로 모으고 이긴 쪽 것만 usage(RequestUsage)에 합산한다.
+    서킷 브레이커가 열린 업스트림은 건너뛴다. (둘 다 열려 있으면 UpstreamUnavailable)
+    """
+    attempts = []
+    hedged = False
+    last_error = None
+
+    def start(agent) -> bool:
+        if agent is None or not get_breaker(agent.model).allow():
+            return False
+        attempts.append(_Attempt(agent, messages, scope, route))
+        return True
+
+    if not start(primary):
+        hedged = True
+        metrics.incr("hedge.primary_skipped", model=primary.model)
+        if not start(fallback):
+            raise UpstreamUnavailable("사용 가능한 업스트림이 없습니다. 잠시 후 다시 시도해주세요.")
+
+    winner = None
+    first_content = None
+    try:
+        pending = {attempt.first: attempt for attempt in attempts}
+        timeout = None if hedged else hedge_delay(primary.model)
+        while winner is None:
+            if not pending:
+                if last_error is not None:
+                    raise last_error
+                return
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # 첫 토큰 지연: 대체 업스트림으로 같은 요청 전송
+                timeout = None
+                hedged = True
+                if start(fallback):
+                    metrics.incr("hedge.fired", model=primary.model)
+                    pending[attempts[-1].first] = attempts[-1]
+                continue
+
+            for future in done:
+                attempt = pending.pop(future)
+                item = future.result()
+                if isinstance(item, str):
+                    winner, first_content = attempt, item
+                    break
+                if isinstance(item, StreamCancelled):
+                    # 요청 자체가 취소됨: 대체 업스트림으로 넘기지 않음
+                    raise item
+                if isinstance(item, Exception):
+                    last_error = item
+                    print(f"⚠️ 업스트림 실패 ({attempt.agent.model}): {str(item)}")
+                # 첫 토큰 전에 실패/빈 응답: 아직 헤지하지 않았다면 바로 대체 업스트림 시도
+                if not hedged:
+                    timeout = None
+                    hedged = True
+                    if start(fallback):
+                        metrics.incr("hedge.failover", model=primary.model)
+                        pending[attempts[-1].first] = attempts[-1]
+
+        # 진 쪽은 즉시 취소 (업스트림 스트림 종료)
+        for attempt in attempts:
+            if attempt is not winner:
+                await attempt.stop()
+                metrics.incr("hedge.wasted_prompt_tokens", attempt.usage.prompt_tokens or attempt.usage.estimated_prompt_tokens)
+        metrics.incr("hedge.won", model=winner.agent.model, hedged=str(hedged).lower())
+        if usage is not None:
+            usage.model = winner.agent.model
+
+        yield first_content
+        async for content in winner.rest():
+            yield content
+    finally:
+        for attempt in attempts:
+            await attempt.stop()
+        if winner is not None and usage is not None:
+            usage.merge(winner.usage)
@@ -0,0 +1,118 @@
+import bisect
+import math
+import time
+from collections import defaultdict
+from typing import Dict
+
+# 프로세스 내 카운터/게이지/히스토그램 (GET /api/metrics 로 노출)
+
+# 밀리초 기준 기본 버킷 (마이크로초 단위 라우팅부터 수십 초 스트림까지)
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, math.inf)
+
+def _key(name: str, labels: Dict[str, str]) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in sorted(labels.items())) + "}"
+
+class Histogram:
+    """고정 버킷 히스토그램 (관측 O(log B), 메모리 고정)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """q 분위수 추정 (해당 버킷 상한, 최대값으로 제한)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4),
+            "min": round(self.min, 4),
+            "max": round(self.max, 4),
+            "p50": round(self.percentile(0.5), 4),
+            "p90": round(self.percentile(0.9), 4),
+            "p99": round(self.percentile(0.99), 4),
+        }
+
+class MetricsRegistry:
+    def __init__(self):
+        self.counters = defaultdict(float)
+        self.gauges = {}
+        self.histograms = {}
+
+    def incr(self, name: str, value: float = 1, **labels):
+        self.counters[_key(name, labels)] += value
+
+    def counter(self, name: str, **labels) -> float:
+        return self.counters.get(_key(name, labels), 0)
+
+    def set_gauge(self, name: str, value: float, **labels):
+        self.gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def histogram(self, name: str, **labels):
+        return self.histograms.get(_key(name, labels))
+
+    def snapshot(self):
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "histograms": {key: h.snapshot() for key, h in self.histograms.items()},
+        }
+
+    def reset(self):
+        self.counters.clear()
+        self.gauges.clear()
+        self.histograms.clear()
+
+# 전역 레지스트리
+metrics = MetricsRegistry()
+
+class StageTimer:
+    """요청 단계별 소요 시간 기록 (stage.<이름>_ms 히스토그램, 직전 mark 이후 경과 시간)"""
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.stages = {}
+
+    def mark(self, stage: str, **labels) -> float:
+        now = time.perf_counter()
+        elapsed_ms = (now - self.last) * 1000
+        self.last = now
+        self.stages[stage] = round(elapsed_ms, 1)
+        metrics.observe(f"stage.{stage}_ms", elapsed_ms, **labels)
+        return elapsed_ms
+
+    def since_start_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
@@ -0,0 +1,52 @@
+import time
+from typing import Dict, List, Optional
+from .context_window import message_tokens
+from .metrics import metrics
+
+# 업스트림 프롬프트(prefix/KV) 캐시를 위한 프롬프트 조립
+# 정적 지시문 -> 이전 대화(세션에 저장된 그대로) -> 이번 사용자 메시지 순으로 바이트를 고정하고,
+# 현재 시간/검색 결과 같은 변동 데이터는 마지막 메시지 뒤에만 덧붙인다.
+
+def volatile_context(search_result: Optional[str] = None) -> str:
+    """요청마다 달라지는 정보 블록 (항상 프롬프트 맨 끝에 위치)"""
+    lines = []
+    if search_result is not None:
+        lines.append("검색 결과를 바탕으로 위 질문에 답변해주세요.")
+        lines.append(f"검색 결과: {search_result}")
+    lines.append(f"현재 시간: {time.strftime('%Y-%m-%d %H:%M:%S')}")
+    return "\n".join(lines)
+
+def assemble_messages(agent, session, search_result: Optional[str] = None) -> List[Dict]:
+    """시스템 프롬프트 + 예산 내 세션 히스토리 + (마지막 사용자 메시지 뒤에) 변동 정보
+
+    세션에는 원래 메시지만 남기므로 다음 턴의 프롬프트는 이번 턴의 앞부분과 바이트 단위로 같다.
+    """
+    tail = volatile_context(search_result)
+    last = session.messages[-1] if session.messages else None
+    if last is None or last.get("role") != "user":
+        messages = agent.build_window(session, reserve=message_tokens({"content": tail}))
+        messages.append({"role": "user", "content": tail})
+        return messages
+
+    final_message = {"role": "user", "content": f"{last['content']}\n\n---\n{tail}"}
+    messages = agent.build_window(session, reserve=message_tokens(final_message), end=-1)
+    messages.append(final_message)
+    return messages
+
+def record_usage(model: str, usage, route: Optional[str] = None):
+    """업스트림 usage 의 프롬프트/캐시 토큰 기록 (prompt_cache.hit_rate 게이지 = 누적 cached / prompt)"""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+
+    labels = {"model": model}
+    if route:
+        labels["route"] = route
+    metrics.incr("upstream.prompt_tokens", prompt_tokens, **labels)
+    metrics.incr("upstream.cached_tokens", cached_tokens, **labels)
+    total_prompt = metrics.counter("upstream.prompt_tokens", **labels)
+    if total_prompt:
+        total_cached = metrics.counter("upstream.cached_tokens", **labels)
+        metrics.set_gauge("prompt_cache.hit_rate", round(total_cached / total_prompt, 4), **labels)
@@ -0,0 +1,62 @@
+import asyncio
+import contextvars
+import time
+from typing import Dict, Optional
+
+# 업스트림(모델)별 요청 속도 제한 (배치 작업처럼 한꺼번에 많은 요청을 보내는 경로에서 사용)
+
+class TokenBucket:
+    """초당 rate 개, 최대 burst 개까지 모아 두는 토큰 버킷"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, count: float = 1.0) -> float:
+        """토큰을 가져오면 0, 부족하면 기다려야 하는 초를 반환 (가져가지 않음)"""
+        self._refill()
+        if self.tokens >= count:
+            self.tokens -= count
+            return 0.0
+        return (count - self.tokens) / self.rate
+
+    async def take(self, count: float = 1.0):
+        """토큰이 생길 때까지 대기 후 가져감"""
+        while True:
+            wait = self.try_take(count)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+class UpstreamLimits:
+    """모델별 TokenBucket 모음 (등록되지 않은 모델은 default_rate, None 이면 제한 없음)"""
+
+    def __init__(self, rates: Dict[str, float], default_rate: Optional[float] = None):
+        self.rates = rates
+        self.default_rate = default_rate
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    async def acquire(self, model: str):
+        bucket = self._buckets.get(model)
+        if bucket is None:
+            rate = self.rates.get(model, self.default_rate)
+            if not rate:
+                return
+            bucket = self._buckets[model] = TokenBucket(rate)
+        await bucket.take()
+
+# 현재 작업에 적용되는 업스트림 제한 (배치 작업이 설정, 일반 요청은 None)
+upstream_limits: contextvars.ContextVar[Optional[UpstreamLimits]] = contextvars.ContextVar("upstream_limits", default=None)
+
+async def acquire_upstream(model: str):
+    """업스트림 호출 직전에 호출 (현재 컨텍스트에 제한이 설정된 경우에만 대기)"""
+    limits = upstream_limits.get()
+    if limits is not None:
+        await limits.acquire(model)
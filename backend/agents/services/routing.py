@@ -0,0 +1,161 @@
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Optional, Tuple
+from .metrics import metrics
+from .prompts import record_usage
+from .rate_limit import acquire_upstream
+from ..utils.text_utils import optimize_search_query
+
+# 라우팅 설정
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.6"))
+ROUTE_CACHE_SIZE = int(os.getenv("ROUTE_CACHE_SIZE", "4096"))
+
+# 검색이 필요한 신호 (시간 민감 키워드, 실시간 정보, 명시적 검색 요청)
+_TOOL_STRONG = re.compile(
+    r"오늘|내일|어제|모레|지금|현재|최근|최신|요즘|이번\s?주|이번\s?달|올해|작년|실시간|"
+    r"날씨|기온|미세먼지|뉴스|속보|주가|주식|환율|시세|코인|비트코인|금리|"
+    r"경기\s?결과|스코어|순위|일정|개봉|출시|발표|선거|"
+    r"검색|찾아\s?(?:줘|봐|주세요)|알아\s?(?:봐|봐줘|봐주세요)|"
+    r"\b(?:weather|news|today|latest|current|price|stock|score|search)\b"
+)
+# 의문 패턴 (사실 확인형 질문) - 단독으로는 확신이 낮음
+_TOOL_WEAK = re.compile(
+    r"누구|언제|어디|얼마|몇\s?(?:시|명|개|년|월|일|위)|무엇|뭐야|뭔가요|인가요|입니까|"
+    r"(?:이|가|은|는)\s?(?:누구|어디|언제|얼마)|(?:의|에서)\s?\S+\s?(?:는|은)\?|"
+    r"\b(?:who|when|where|how much|what is)\b"
+)
+# 일반 대화 신호 (인사, 감정 표현, 에이전트 자신에 대한 질문)
+_CHAT_STRONG = re.compile(
+    r"^(?:안녕|하이|헬로|반가워|ㅎㅇ)|고마워|감사(?:합니다|해요)?|미안|사랑해|잘\s?자|"
+    r"ㅋㅋ|ㅎㅎ|ㅠㅠ|^(?:응|그래|좋아|알겠어|오케이|ok)\b|"
+    r"(?:너는|넌|너의|니가)\s?|심심|기분|위로|농담|"
+    r"^(?:hi|hello|hey|thanks|thank you)\b"
+)
+_CHAT_WEAK = re.compile(r"(?:해줘|써줘|만들어줘|설명해줘|번역|요약|코드|시\s?써|이야기)")
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCT = re.compile(r"[\s.!~。]+$")
+
+def normalize_message(message: str) -> str:
+    """캐시 키용 정규화: NFC, 소문자, 공백 압축, 끝 문장부호 제거"""
+    text = unicodedata.normalize("NFC", message).lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _TRAILING_PUNCT.sub("", text)
+
+def classify_route(message: str) -> Tuple[str, float]:
+    """규칙 기반 라우팅 분류 -> (route, confidence 0~1)"""
+    text = normalize_message(message)
+    tool_score = 2.0 * len(_TOOL_STRONG.findall(text)) + 1.0 * len(_TOOL_WEAK.findall(text))
+    chat_score = 2.0 * len(_CHAT_STRONG.findall(text)) + 1.0 * len(_CHAT_WEAK.findall(text))
+
+    if tool_score == chat_score:
+        return "chat", 0.0
+
+    route = "tool" if tool_score > chat_score else "chat"
+    confidence = abs(tool_score - chat_score) / (tool_score + chat_score + 1.0)
+    return route, confidence
+
+class RouteCache:
+    """정규화된 메시지 -> 라우팅 결과 LRU 캐시"""
+
+    def __init__(self, max_size: int = ROUTE_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        route = self._entries.get(key)
+        if route is not None:
+            self._entries.move_to_end(key)
+        return route
+
+    def put(self, key: str, route: str):
+        self._entries[key] = route
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+route_cache = RouteCache()
+
+async def llm_route(route_agent, user_message: str, usage=None) -> Tuple[str, str]:
+    """LLM 라우터 호출 -> (route, 검색어). routing 도구 호출의 agent/query 인자 사용"""
+    await acquire_upstream(route_agent.model)
+    route_response = await route_agent.async_client.chat.completions.create(
+        model=route_agent.model,
+        messages=route_agent.build_messages([{"role": "user", "content": user_message}]),
+        tools=route_agent.tools,
+        tool_choice="auto",
+        stream=False
+    )
+
+    record_usage(route_agent.model, route_response.usage, "routing")
+    if usage is not None:
+        usage.add_upstream(route_response.usage)
+
+    route = "chat"  # 기본값
+    query = ""
+
+    # 도구 호출 결과 확인
+    if route_response.choices[0].message.tool_calls:
+        tool_call = route_response.choices[0].message.tool_calls[0]
+        if tool_call.function.name == "routing":
+            try:
+                args = json.loads(tool_call.function.arguments)
+                route = args.get("agent", "chat")
+                query = (args.get("query") or "").strip()
+            except:
+                route = "chat"
+    else:
+        # 텍스트 응답에서 추출
+        content = (route_response.choices[0].message.content or "").lower()
+        if "tool" in content:
+            route = "tool"
+
+    return route, query
+
+def local_route(user_message: str) -> Optional[str]:
+    """캐시 또는 로컬 분류기로 결정 가능한 경우 라우팅 결과 반환 (네트워크 호출 없음)"""
+    start = time.perf_counter()
+    key = normalize_message(user_message)
+
+    route = route_cache.get(key)
+    if route is not None:
+        source = "cache"
+        metrics.incr("route.cache_hit")
+    else:
+        metrics.incr("route.cache_miss")
+        route, confidence = classify_route(user_message)
+        if confidence < ROUTER_CONFIDENCE_THRESHOLD:
+            # LLM 라우터로 넘어가는 경우도 로컬 판단에 쓴 시간을 기록
+            metrics.observe("route.latency_ms", (time.perf_counter() - start) * 1000, source="local_miss")
+            return None
+        source = "local"
+        route_cache.put(key, route)
+
+    metrics.incr("route.decisions", source=source, route=route)
+    metrics.observe("route.latency_ms", (time.perf_counter() - start) * 1000, source=source)
+    return route
+
+async def llm_decide_route(route_agent, user_message: str, usage=None) -> Tuple[str, str]:
+    """LLM 라우터로 결정하고 결과를 캐시에 저장 -> (route, 검색어). usage(RequestUsage)에 라우터 호출 사용량 누적"""
+    start = time.perf_counter()
+    route, query = await llm_route(route_agent, user_message, usage)
+    route_cache.put(normalize_message(user_message), route)
+
+    metrics.incr("route.decisions", source="llm", route=route)
+    metrics.observe("route.latency_ms", (time.perf_counter() - start) * 1000, source="llm")
+    return route, query
+
+def resolve_search_query(user_message: str, llm_query: Optional[str] = None) -> str:
+    """라우팅 호출이 만든 검색어를 우선 사용하고, 없으면 규칙 기반으로 생성 (추가 LLM 호출 없음)"""
+    if llm_query:
+        metrics.incr("search.query_source", source="router")
+        return optimize_search_query(llm_query)
+    metrics.incr("search.query_source", source="fallback")
+    return optimize_search_query(user_message)
@@ -0,0 +1,158 @@
+import bisect
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from .context_window import CONTEXT_TRIM_RATIO, message_tokens
+
+# 세션 저장소 설정
+SESSION_MAX_CONVERSATIONS = int(os.getenv("SESSION_MAX_CONVERSATIONS", "1000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# 메시지 하나당 dict/문자열 객체 오버헤드 근사치
+_MESSAGE_OVERHEAD_BYTES = 200
+
+def _message_size(message: Dict[str, str]) -> int:
+    # UTF-8 인코딩 없이 상한으로 근사 (문자당 최대 4바이트)
+    return len(message.get("content") or "") * 4 + _MESSAGE_OVERHEAD_BYTES
+
+class ConversationSession:
+    """대화별 히스토리 (시스템 프롬프트는 에이전트가 공유하므로 저장하지 않음)"""
+
+    def __init__(self, conversation_id: Optional[str], store: Optional["SessionStore"] = None):
+        self.conversation_id = conversation_id
+        self.messages: List[Dict[str, str]] = []
+        # 메시지별 추정 토큰 수의 누적 합 (_prefix[i] = messages[:i] 토큰 합, 추가 시 한 번만 계산)
+        self._prefix = [0]
+        # 창 시작 위치 (예산을 넘을 때만 앞으로 이동하므로 그 사이 턴들은 같은 프롬프트 앞부분을 공유)
+        self._window_start = 0
+        self.size_bytes = 0
+        self.last_access = time.monotonic()
+        self._store = store
+
+    def append(self, message: Dict[str, str]):
+        self.messages.append(message)
+        self._prefix.append(self._prefix[-1] + message_tokens(message))
+        self._resize(_message_size(message))
+
+    def replace(self, messages: List[Dict[str, str]]):
+        """클라이언트가 보낸 전체 대화로 히스토리 교체 (기존과 같은 앞부분은 토큰 수 재사용)"""
+        messages = list(messages)
+        same = 0
+        for old, new in zip(self.messages, messages):
+            if old.get("role") != new.get("role") or old.get("content") != new.get("content"):
+                break
+            same += 1
+        del self._prefix[same + 1:]
+        self._window_start = min(self._window_start, same)
+        for message in messages[same:]:
+            self._prefix.append(self._prefix[-1] + message_tokens(message))
+        self.messages = messages
+        self._resize(sum(_message_size(m) for m in self.messages) - self.size_bytes)
+
+    @property
+    def tokens(self) -> int:
+        return self._prefix[-1]
+
+    def window(self, budget: int, end: Optional[int] = None) -> List[Dict[str, str]]:
+        """messages[:end] 중 budget 토큰 안에 드는 최근 구간 (마지막 메시지는 항상 포함)
+
+        시작 위치는 예산을 넘을 때만 예산의 CONTEXT_TRIM_RATIO 까지 앞당긴다. (누적 합 이분 탐색, 턴당 분할 상환 O(1))
+        """
+        if end is None:
+            end = len(self.messages)
+        elif end < 0:
+            end += len(self.messages)
+        if end <= 0:
+            return []
+        start = min(self._window_start, end - 1)
+        if self._prefix[end] - self._prefix[start] > budget:
+            start = bisect.bisect_left(self._prefix, self._prefix[end] - int(budget * CONTEXT_TRIM_RATIO), start, end)
+            start = min(start, end - 1)
+        # 짝이 되는 tool_calls 가 창 밖으로 밀려난 tool 메시지는 제외
+        while start < end - 1 and self.messages[start].get("role") == "tool":
+            start += 1
+        self._window_start = start
+        return self.messages[start:end]
+
+    def trim(self, max_messages: int):
+        """최근 max_messages 개만 유지 (짝이 되는 tool_calls 가 잘려 나간 tool 메시지도 함께 제거)"""
+        if len(self.messages) > max_messages:
+            cut = len(self.messages) - max_messages
+            while cut < len(self.messages) and self.messages[cut].get("role") == "tool":
+                cut += 1
+            removed = self.messages[:cut]
+            del self.messages[:cut]
+            base = self._prefix[cut]
+            self._prefix = [total - base for total in self._prefix[cut:]]
+            self._window_start = max(self._window_start - cut, 0)
+            self._resize(-sum(_message_size(m) for m in removed))
+
+    def _resize(self, delta: int):
+        self.size_bytes += delta
+        self.last_access = time.monotonic()
+        if self._store is not None:
+            self._store._on_resize(self, delta)
+
+class SessionStore:
+    """conversationId 기반 세션 저장소 (LRU + TTL + 메모리 상한)"""
+
+    def __init__(self, max_conversations: int = SESSION_MAX_CONVERSATIONS, ttl_seconds: float = SESSION_TTL_SECONDS, max_bytes: int = SESSION_MAX_BYTES):
+        self.max_conversations = max_conversations
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+
+    def get(self, conversation_id: Optional[str]) -> ConversationSession:
+        """세션 조회 또는 생성 (conversationId 가 없으면 저장하지 않는 일회성 세션)"""
+        if not conversation_id:
+            return ConversationSession(None)
+
+        now = time.monotonic()
+        session = self._sessions.get(conversation_id)
+        if session is not None and now - session.last_access > self.ttl_seconds:
+            self._drop(conversation_id)
+            session = None
+
+        if session is None:
+            session = ConversationSession(conversation_id, self)
+            self._sessions[conversation_id] = session
+        else:
+            session.last_access = now
+            self._sessions.move_to_end(conversation_id)
+
+        self._evict(keep=session)
+        return session
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _on_resize(self, session: ConversationSession, delta: int):
+        if self._sessions.get(session.conversation_id) is not session:
+            return
+        self.total_bytes += delta
+        self._sessions.move_to_end(session.conversation_id)
+        self._evict(keep=session)
+
+    def _evict(self, keep: ConversationSession):
+        """만료 세션 제거 후 개수/메모리 상한을 넘으면 가장 오래된 세션부터 제거"""
+        now = time.monotonic()
+        while len(self._sessions) > 1:
+            conversation_id, session = next(iter(self._sessions.items()))
+            if session is keep:
+                break
+            expired = now - session.last_access > self.ttl_seconds
+            over_limit = len(self._sessions) > self.max_conversations or self.total_bytes > self.max_bytes
+            if not expired and not over_limit:
+                break
+            self._drop(conversation_id)
+
+    def _drop(self, conversation_id: str):
+        session = self._sessions.pop(conversation_id, None)
+        if session is not None:
+            self.total_bytes -= session.size_bytes
+            session._store = None
+            self.evictions += 1
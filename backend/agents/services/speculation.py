@@ -0,0 +1,68 @@
+import asyncio
+import os
+from .metrics import metrics
+from .streaming import stream_chat_deltas
+from .usage import RequestUsage
+
+# 라우팅과 채팅 스트림을 동시에 시작하는 추측 실행 모드
+SPECULATIVE_ROUTING = os.getenv("SPECULATIVE_ROUTING", "false").lower() in ("1", "true", "yes")
+SPECULATION_BUFFER_SIZE = int(os.getenv("SPECULATION_BUFFER_SIZE", "256"))  # 가득 차면 업스트림 읽기를 멈춤
+
+_END = object()
+
+class SpeculativeChatStream:
+    """라우팅 결과가 나오기 전에 채팅 스트림을 미리 열고 토큰을 버퍼링
+
+    추측 스트림의 사용량은 별도로 모았다가 채택(commit)된 경우에만 요청 usage 에 합산한다.
+    """
+
+    def __init__(self, agent, messages, scope=None, usage=None, buffer_size: int = SPECULATION_BUFFER_SIZE):
+        self.tokens = 0
+        self._request_usage = usage
+        self.usage = RequestUsage(agent.model, "chat")
+        self._queue = asyncio.Queue(maxsize=buffer_size)
+        self._task = asyncio.create_task(self._pump(agent, messages, scope))
+        metrics.incr("speculation.started")
+
+    async def _pump(self, agent, messages, scope):
+        try:
+            async for content in stream_chat_deltas(agent, messages, scope, route="chat", usage=self.usage):
+                self.tokens += 1
+                await self._queue.put(content)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._queue.put(e)
+        await self._queue.put(_END)
+
+    async def commit(self):
+        """라우팅 결과가 chat 인 경우: 버퍼된 토큰부터 순서대로 전달"""
+        metrics.incr("speculation.won")
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # 소비 도중 중단된 경우에도 업스트림 스트림 정리
+            await self._stop()
+            if self._request_usage is not None:
+                self._request_usage.merge(self.usage)
+
+    async def _stop(self):
+        if not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def cancel(self):
+        """라우팅 결과가 chat 이 아닌 경우: 스트림 취소 (업스트림 커넥션은 stream_chat_deltas 에서 닫힘)"""
+        await self._stop()
+        metrics.incr("speculation.lost")
+        metrics.incr("speculation.wasted_tokens", self.tokens)
+        metrics.incr("speculation.wasted_prompt_tokens", self.usage.prompt_tokens or self.usage.estimated_prompt_tokens)
@@ -0,0 +1,79 @@
+import json
+from typing import Optional
+from ..models.schemas import ChatCompletionChunk, Choice, Delta, Usage
+
+# SSE 청크 인코더: completion 단위로 고정 바이트(prefix/suffix)를 한 번만 만들고
+# 토큰마다 delta content 문자열만 JSON 이스케이프한다.
+
+DONE = b"data: [DONE]\n\n"
+
+# 템플릿 직렬화 시 content 자리에 넣는 표식 (사설 영역 문자, 이스케이프되지 않음)
+_SENTINEL = "\ue000"
+_SENTINEL_JSON = json.dumps(_SENTINEL, ensure_ascii=False)
+
+class ChunkEncoder:
+    """chat.completion.chunk SSE 프레임 인코더
+
+    compact=False: json.dumps(dict, ensure_ascii=False) 형식 (/api/v1/chat/completions)
+    compact=True: ChatCompletionChunk.model_dump_json() 형식 (/api/ask/custom)
+    """
+
+    def __init__(self, completion_id: str, created: int, model: str, compact: bool = False):
+        self.completion_id = completion_id
+        self.created = created
+        self.model = model
+        self.compact = compact
+        self._parts = {}
+        self._finish = {}
+
+    def _render(self, content: Optional[str], finish_reason: Optional[str], include_content: bool = True, usage: Optional[Usage] = None) -> str:
+        """기존 경로와 동일한 방식으로 청크 하나를 직렬화"""
+        if self.compact:
+            chunk = ChatCompletionChunk(
+                id=self.completion_id,
+                object="chat.completion.chunk",
+                created=self.created,
+                model=self.model,
+                choices=[Choice(index=0, delta=Delta(content=content), finish_reason=finish_reason)],
+                usage=usage
+            )
+            return chunk.model_dump_json()
+
+        chunk_data = {
+            "id": self.completion_id,
+            "object": "chat.completion.chunk",
+            "created": self.created,
+            "model": self.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": content} if include_content else {},
+                    "finish_reason": finish_reason
+                }
+            ]
+        }
+        if usage is not None:
+            chunk_data["usage"] = usage.model_dump(exclude_none=True)
+        return json.dumps(chunk_data, ensure_ascii=False)
+
+    def _content_parts(self, finish_reason: Optional[str]):
+        parts = self._parts.get(finish_reason)
+        if parts is None:
+            template = self._render(_SENTINEL, finish_reason)
+            prefix, suffix = template.split(_SENTINEL_JSON, 1)
+            parts = self._parts[finish_reason] = (f"data: {prefix}".encode(), f"{suffix}\n\n".encode())
+        return parts
+
+    def content(self, text: str, finish_reason: Optional[str] = None) -> bytes:
+        """delta.content 청크 (토큰마다 호출되는 경로)"""
+        prefix, suffix = self._content_parts(finish_reason)
+        return prefix + json.dumps(text, ensure_ascii=False).encode() + suffix
+
+    def finish(self, finish_reason: str = "stop", usage: Optional[Usage] = None) -> bytes:
+        """빈 delta 와 finish_reason 을 담은 종료 청크 (usage 가 있으면 함께 담음, 요청마다 달라서 캐시하지 않음)"""
+        if usage is not None:
+            return f"data: {self._render(None, finish_reason, include_content=False, usage=usage)}\n\n".encode()
+        frame = self._finish.get(finish_reason)
+        if frame is None:
+            frame = self._finish[finish_reason] = f"data: {self._render(None, finish_reason, include_content=False)}\n\n".encode()
+        return frame
@@ -1,79 +1,197 @@
-import json
-import time
-from ..models.schemas import ChatCompletionChunk, Choice, Delta
-from ..tools.search_tools import enhanced_search
+import asyncio
+from .cancellation import StreamCancelled
+from .tool_call_parser import ToolCallParser
+from .tool_executor import TOOL_MAX_ROUNDS, tool_executor, tool_messages
+from .prompts import assemble_messages, record_usage
+from .rate_limit import acquire_upstream
 
-async def stream_agent_response(agent, prompt):
-    """에이전트 응답을 실시간으로 스트리밍"""
-    # 기존 히스토리에 사용자 메시지 추가
-    agent.history.append({"role": "user", "content": prompt})
-    
-    if len(agent.history) > 10:
-        agent.history = [agent.history[0]] + agent.history[-8:]
-    
-    params = {
-        "model": agent.model,
-        "messages": agent.history,
-        "stream": True,
-    }
-    
-    if agent.tools:
-        params["tools"] = agent.tools
-        params["tool_choice"] = "auto"
+async def stream_chat_deltas(agent, messages, scope=None, route=None, usage=None):
+    """비동기 클라이언트로 업스트림 스트림을 열고 content 델타만 순서대로 전달
     
+    scope(CancelScope)가 주어지면 취소 시 업스트림 스트림을 즉시 닫고 StreamCancelled 를 발생시킨다.
+    (연결 중/스트리밍 중 취소 모두 같은 예외로 전달되므로 호출자는 부분 응답을 완료로 취급하지 않는다)
+    마지막 usage 청크의 프롬프트/캐시 토큰 수는 메트릭으로 기록하고 usage(RequestUsage)에 누적한다.
+    """
+    if usage is not None:
+        usage.add_prompt(messages)
+    await acquire_upstream(agent.model)
+    response = None
     try:
-        response = agent.client.chat.completions.create(**params)
-        
-        accumulated_response = ""
-        function_name = ""
-        function_args = ""
-        json_buffer = ""
-        has_content = False
-        
-        for chunk in response:
+        create = agent.async_client.chat.completions.create(
+            model=agent.model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        response = await (scope.guard(create) if scope else create)
+        if scope:
+            scope.add_closer(response.close)
+        async for chunk in response:
             if chunk.choices and len(chunk.choices) > 0:
                 delta = chunk.choices[0].delta
-                
                 if delta.content:
-                    accumulated_response += delta.content
-                    has_content = True
-                    yield delta.content  # 실시간으로 청크 전송
-                    
-                elif delta.tool_calls:
-                    tool_call = delta.tool_calls[0]
-                    
-                    if tool_call.function.name:
-                        function_name += tool_call.function.name
-                        yield f"\n🔧 도구 실행: {tool_call.function.name}\n"
-                        
-                    if tool_call.function.arguments:
-                        json_buffer += tool_call.function.arguments
+                    if scope:
+                        scope.add_tokens()
+                    yield delta.content
+                if chunk.choices[0].finish_reason and usage is not None:
+                    usage.finish_reason = chunk.choices[0].finish_reason
+            
+            # usage 는 finish_reason 이후 choices 가 빈 마지막 청크로 도착
+            if getattr(chunk, "usage", None) is not None:
+                record_usage(agent.model, chunk.usage, route)
+                if usage is not None:
+                    usage.add_upstream(chunk.usage)
+                break
+        # 취소 직후 스트림이 예외 없이 끝난 경우도 중단으로 전달
+        if scope and scope.cancelled:
+            raise StreamCancelled(scope.reason)
+    except StreamCancelled:
+        raise
+    except Exception:
+        # 취소로 업스트림이 닫혀 발생한 오류는 취소로 전달
+        if scope and scope.cancelled:
+            raise StreamCancelled(scope.reason)
+        raise
+    finally:
+        if response is not None:
+            if scope:
+                scope.remove_closer(response.close)
+            # 끝까지 읽지 않은 스트림도 커넥션을 풀에 즉시 반환
+            await response.close()
+
+async def complete_chat(agent, messages, route=None, usage=None) -> str:
+    """비스트리밍 업스트림 호출로 전체 응답을 한 번에 받음 (토큰 단위 인코딩 없음)"""
+    if usage is not None:
+        usage.add_prompt(messages)
+    await acquire_upstream(agent.model)
+    response = await agent.async_client.chat.completions.create(
+        model=agent.model,
+        messages=messages,
+        stream=False
+    )
+    content = (response.choices[0].message.content or "") if response.choices else ""
+    record_usage(agent.model, response.usage, route)
+    if usage is not None:
+        usage.add_upstream(response.usage)
+        if response.choices:
+            usage.finish_reason = response.choices[0].finish_reason
+        if content:
+            usage.on_token(content)
+    return content
+
+async def stream_agent_response(agent, session, prompt, scope=None, usage=None):
+    """에이전트 응답을 실시간으로 스트리밍 (히스토리는 대화별 세션에 기록)
+
+    모델이 도구를 호출하면 결과를 tool 메시지로 세션에 넣고 같은 대화로 다시 요청해 최종 답변까지 이어서 전달한다.
+    (도구 왕복은 최대 TOOL_MAX_ROUNDS 회, 마지막 요청은 도구 없이 답변만 받음)
+    """
+    # 세션 히스토리에 사용자 메시지 추가
+    session.append({"role": "user", "content": prompt})
+    
+    # 이번 응답에서 시작한 모든 도구 작업 (어떤 경로로 끝나든 남은 작업은 finally 에서 취소)
+    submitted = []
+    try:
+        has_content = False
+        for round_index in range(TOOL_MAX_ROUNDS + 1):
+            messages = assemble_messages(agent, session)
+            if usage is not None:
+                usage.add_prompt(messages)
+            params = {
+                "model": agent.model,
+                "messages": messages,
+                "stream": True,
+                "stream_options": {"include_usage": True},
+            }
+            
+            if agent.tools and round_index < TOOL_MAX_ROUNDS:
+                params["tools"] = agent.tools
+                params["tool_choice"] = "auto"
+            
+            accumulated_response = ""
+            parser = ToolCallParser()
+            tool_jobs = []
+            
+            def dispatch(call):
+                # 인자가 닫힌 호출은 스트림 종료를 기다리지 않고 바로 실행 (여러 호출은 실행기에서 동시에 처리)
+                job = tool_executor.submit(call)
+                tool_jobs.append(job)
+                submitted.append(job)
+            
+            create = agent.async_client.chat.completions.create(**params)
+            response = await (scope.guard(create) if scope else create)
+            if scope:
+                scope.add_closer(response.close)
+            try:
+                async for chunk in response:
+                    if chunk.choices and len(chunk.choices) > 0:
+                        delta = chunk.choices[0].delta
                         
-                        if json_buffer.count('{') == json_buffer.count('}') and json_buffer.count('{') > 0:
-                            function_args = json_buffer
-                            json_buffer = ""
-                
-                # 스트림 완료 확인
-                if chunk.choices[0].finish_reason == "stop":
-                    break
-        
-        # 응답을 히스토리에 추가
-        if accumulated_response:
-            agent.history.append({"role": "assistant", "content": accumulated_response})
-        elif function_name and function_args:
-            # 도구 호출 결과 처리
-            tool_result = agent.get_tool_response(function_name, function_args)
-            yield f"\n📊 검색 결과를 받았습니다.\n\n"
+                        if delta.content:
+                            accumulated_response += delta.content
+                            has_content = True
+                            if scope:
+                                scope.add_tokens()
+                            yield delta.content  # 실시간으로 청크 전송
+                            
+                        elif delta.tool_calls:
+                            for tool_call in delta.tool_calls:
+                                if tool_call.function and tool_call.function.name:
+                                    yield f"\n🔧 도구 실행: {tool_call.function.name}\n"
+                            for call in parser.feed(delta.tool_calls):
+                                dispatch(call)
+                    
+                    # usage 는 finish_reason 이후 choices 가 빈 마지막 청크로 도착
+                    if getattr(chunk, "usage", None) is not None:
+                        record_usage(agent.model, chunk.usage, "chat")
+                        if usage is not None:
+                            usage.add_upstream(chunk.usage)
+                        break
+            finally:
+                if scope:
+                    scope.remove_closer(response.close)
+                await response.close()
+            for call in parser.finish():
+                dispatch(call)
+            
+            if not tool_jobs:
+                # 최종 답변을 히스토리에 추가
+                if accumulated_response:
+                    session.append({"role": "assistant", "content": accumulated_response})
+                break
+            
+            # 도구 호출 결과 처리 (이미 실행 중인 작업 완료 대기 후 호출 순서대로 세션에 반영)
+            gathered = asyncio.gather(*tool_jobs)
+            results = await (scope.guard(gathered) if scope else gathered)
+            # assistant tool_calls 메시지(같은 턴의 텍스트 포함) + tool 메시지를 세션에 넣고 다음 요청에 그대로 전달
+            results_messages = tool_messages(results)
+            if accumulated_response:
+                results_messages[0]["content"] = accumulated_response
+            for message in results_messages:
+                session.append(message)
+            failed = sum(1 for result in results if not result.ok)
+            if failed:
+                yield f"\n📊 검색 결과를 받았습니다. ({len(results) - failed}/{len(results)}개 성공)\n\n"
+            else:
+                yield f"\n📊 검색 결과를 받았습니다.\n\n"
         
         # 스트림이 비어있는 경우 기본 응답
-        if not has_content and not function_name:
+        if not has_content:
             yield "응답을 생성할 수 없습니다."
             
+    except StreamCancelled:
+        return
     except Exception as e:
+        # 취소로 업스트림이 닫힌 경우는 오류 메시지 없이 종료
+        if scope and scope.cancelled:
+            return
         yield f"에이전트 오류: {str(e)}"
+    finally:
+        for job in submitted:
+            if not job.done():
+                job.cancel()
 
-async def process_and_stream_response(user_prompt: str, completion_id: str, created_time: int, model: str, chat_agent):
-    """실시간으로 에이전트 응답을 스트리밍"""
+async def process_and_stream_response(user_prompt: str, encoder, chat_agent, session, scope=None, usage=None):
+    """실시간으로 에이전트 응답을 스트리밍 (encoder: 완료 단위 ChunkEncoder)"""
     try:
         print(f"\n🎯 사용자 요청: {user_prompt}")
         
@@ -83,37 +201,13 @@ async def process_and_stream_response(user_prompt: str, completion_id: str, crea
         
         if route == "chat":
             # 채팅 에이전트 응답을 실시간 스트리밍
-            async for chunk_text in stream_agent_response(chat_agent, user_prompt):
+            async for chunk_text in stream_agent_response(chat_agent, session, user_prompt, scope, usage):
                 if chunk_text and chunk_text.strip():
-                    chunk = ChatCompletionChunk(
-                        id=completion_id,
-                        object="chat.completion.chunk",
-                        created=created_time,
-                        model=model,
-                        choices=[
-                            Choice(
-                                index=0,
-                                delta=Delta(content=chunk_text),
-                                finish_reason=None
-                            )
-                        ]
-                    )
-                    yield f"data: {chunk.model_dump_json()}\n\n"
+                    if usage is not None:
+                        usage.on_token(chunk_text)
+                    yield encoder.content(chunk_text)
             
     except Exception as e:
         print(f"스트림 오류: {str(e)}")
         error_text = f"오류가 발생했습니다: {str(e)}"
-        chunk = ChatCompletionChunk(
-            id=completion_id,
-            object="chat.completion.chunk",
-            created=created_time,
-            model=model,
-            choices=[
-                Choice(
-                    index=0,
-                    delta=Delta(content=error_text),
-                    finish_reason="stop"
-                )
-            ]
-        )
-        yield f"data: {chunk.model_dump_json()}\n\n" 
\ No newline at end of file
+        yield encoder.content(error_text, finish_reason="stop")
@@ -0,0 +1,102 @@
+from typing import Dict, List, NamedTuple, Optional
+
+# 스트리밍 tool_calls 델타용 증분 JSON 파서
+# 도구 호출을 index 별로 추적하고, 새로 들어온 인자 조각만 상태 기계로 훑어
+# 최상위 객체가 닫히는 순간 완성된 호출을 내보낸다. (버퍼 전체를 다시 세지 않음)
+
+class ToolCall(NamedTuple):
+    index: int
+    id: Optional[str]
+    name: str
+    arguments: str
+
+class _CallState:
+    __slots__ = ("index", "id", "name", "chunks", "depth", "in_string", "escape", "started", "done")
+
+    def __init__(self, index: int):
+        self.index = index
+        self.id = None
+        self.name = ""
+        self.chunks = []
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.done = False
+
+    def consume(self, fragment: str) -> bool:
+        """인자 조각을 이어 붙이고 최상위 JSON 값이 닫혔으면 True"""
+        self.chunks.append(fragment)
+        depth = self.depth
+        in_string = self.in_string
+        escape = self.escape
+        started = self.started
+        closed = False
+
+        for ch in fragment:
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+            elif ch == '"':
+                in_string = True
+            elif ch == "{" or ch == "[":
+                depth += 1
+                started = True
+            elif ch == "}" or ch == "]":
+                depth -= 1
+                if started and depth == 0:
+                    closed = True
+
+        self.depth = depth
+        self.in_string = in_string
+        self.escape = escape
+        self.started = started
+        return closed
+
+    def to_call(self) -> ToolCall:
+        return ToolCall(self.index, self.id, self.name, "".join(self.chunks))
+
+class ToolCallParser:
+    """delta.tool_calls 를 받아 완성된 ToolCall 을 즉시 반환"""
+
+    def __init__(self):
+        self._calls: Dict[int, _CallState] = {}
+
+    def feed(self, tool_call_deltas) -> List[ToolCall]:
+        completed = []
+        for position, delta in enumerate(tool_call_deltas or ()):
+            index = delta.index if getattr(delta, "index", None) is not None else position
+            state = self._calls.get(index)
+            if state is None:
+                state = self._calls[index] = _CallState(index)
+            if delta.id:
+                state.id = delta.id
+
+            function = delta.function
+            if function is None or state.done:
+                continue
+            if function.name:
+                state.name += function.name
+            if function.arguments and state.consume(function.arguments):
+                state.done = True
+                completed.append(state.to_call())
+        return completed
+
+    def finish(self) -> List[ToolCall]:
+        """스트림 종료 시 아직 닫히지 않은 호출을 반환 (인자가 비었으면 '{}')"""
+        pending = []
+        for state in self._calls.values():
+            if not state.done and state.name:
+                state.done = True
+                call = state.to_call()
+                pending.append(call._replace(arguments=call.arguments or "{}"))
+        return pending
+
+    @property
+    def calls(self) -> List[ToolCall]:
+        """지금까지 본 모든 호출 (index 순)"""
+        return [self._calls[index].to_call() for index in sorted(self._calls)]
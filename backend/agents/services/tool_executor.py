@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, NamedTuple, Optional
+from ..tools.search_tools import TOOL_MAPPING, cached_search
+from .metrics import metrics
+from .tool_call_parser import ToolCall
+
+# 도구 실행기 설정
+TOOL_MAX_WORKERS = int(os.getenv("TOOL_MAX_WORKERS", "4"))
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "15"))
+TOOL_MAX_ROUNDS = int(os.getenv("TOOL_MAX_ROUNDS", "3"))  # 한 응답에서 도구 호출 -> 결과 전달 왕복 최대 횟수
+TOOL_TIMEOUTS = {
+    "search": float(os.getenv("TOOL_SEARCH_TIMEOUT_SECONDS", "12")),
+}
+
+# 이벤트 루프에서 바로 실행할 수 있는 비동기 구현 (없으면 TOOL_MAPPING 함수를 스레드에서 실행)
+ASYNC_TOOL_MAPPING = {
+    "search": cached_search,
+}
+
+class ToolResult(NamedTuple):
+    call: ToolCall
+    content: str
+    ok: bool
+    elapsed_ms: float
+
+def parse_tool_arguments(raw_args: str) -> Dict:
+    """도구 인자 JSON 파싱 (깨진 JSON 은 query 만이라도 복구)"""
+    try:
+        return json.loads(raw_args)
+    except json.JSONDecodeError:
+        pass
+
+    last_brace = raw_args.rfind('}')
+    if last_brace != -1:
+        try:
+            return json.loads(raw_args[:last_brace+1])
+        except json.JSONDecodeError:
+            match = re.search(r'"query":\s*"([^"]*)"', raw_args)
+            if match:
+                return {"query": match.group(1)}
+    return {"query": raw_args}
+
+class ToolExecutor:
+    """한 턴의 도구 호출들을 동시에 실행 (동시 실행 수 제한 + 도구별 타임아웃 + 부분 결과)
+
+    실패하거나 시간이 초과된 호출은 오류 문구를 결과로 돌려주고 나머지 결과는 그대로 사용한다.
+    """
+
+    def __init__(self, max_workers: int = TOOL_MAX_WORKERS, timeouts: Optional[Dict[str, float]] = None, default_timeout: float = TOOL_TIMEOUT_SECONDS):
+        self.timeouts = TOOL_TIMEOUTS if timeouts is None else timeouts
+        self.default_timeout = default_timeout
+        self._workers = asyncio.Semaphore(max_workers)
+
+    def submit(self, call: ToolCall) -> "asyncio.Task[ToolResult]":
+        """호출 하나를 바로 실행 시작 (스트림 도중 완성된 호출을 조기 실행할 때 사용)"""
+        return asyncio.ensure_future(self._run_one(call))
+
+    async def run(self, calls: List[ToolCall]) -> List[ToolResult]:
+        """모든 호출을 동시에 실행하고 index 순서로 결과 반환"""
+        results = await asyncio.gather(*(self.submit(call) for call in calls))
+        return sorted(results, key=lambda result: result.call.index)
+
+    async def _run_one(self, call: ToolCall) -> ToolResult:
+        timeout = self.timeouts.get(call.name, self.default_timeout)
+        start = time.perf_counter()
+        try:
+            async with self._workers:
+                content = await asyncio.wait_for(self._invoke(call), timeout)
+            ok = True
+        except asyncio.TimeoutError:
+            metrics.incr("tool.timeout", tool=call.name)
+            content, ok = f"도구 실행 시간 초과: {call.name} ({timeout:g}초)", False
+        except Exception as e:
+            metrics.incr("tool.error", tool=call.name)
+            content, ok = f"도구 실행 오류: {call.name} ({str(e)})", False
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        metrics.observe("tool.latency_ms", elapsed_ms, tool=call.name)
+        return ToolResult(call, str(content), ok, elapsed_ms)
+
+    async def _invoke(self, call: ToolCall):
+        if call.name not in ASYNC_TOOL_MAPPING and call.name not in TOOL_MAPPING:
+            raise ValueError(f"알 수 없는 도구 {call.name}")
+        tool_args = parse_tool_arguments(call.arguments)
+        if call.name in ASYNC_TOOL_MAPPING:
+            return await ASYNC_TOOL_MAPPING[call.name](**tool_args)
+        return await asyncio.to_thread(TOOL_MAPPING[call.name], **tool_args)
+
+def run_tools_sync(calls: List[ToolCall], max_workers: int = TOOL_MAX_WORKERS, timeouts: Optional[Dict[str, float]] = None,
+                   default_timeout: float = TOOL_TIMEOUT_SECONDS) -> List[ToolResult]:
+    """동기 경로(CLI 에이전트)용: TOOL_MAPPING 의 동기 함수를 스레드 풀에서 동시에 실행하고 index 순서로 결과 반환
+
+    이벤트 루프를 새로 만들지 않으므로 루프에 묶인 비동기 캐시/클라이언트를 건드리지 않고, 실행 중인 루프 안에서도 호출할 수 있다.
+    """
+    timeouts = TOOL_TIMEOUTS if timeouts is None else timeouts
+
+    def invoke(call: ToolCall):
+        if call.name not in TOOL_MAPPING:
+            raise ValueError(f"알 수 없는 도구 {call.name}")
+        return TOOL_MAPPING[call.name](**parse_tool_arguments(call.arguments))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tool")
+    try:
+        start = time.perf_counter()
+        futures = [(call, pool.submit(invoke, call)) for call in calls]
+        results = []
+        for call, future in futures:
+            timeout = timeouts.get(call.name, default_timeout)
+            try:
+                content = future.result(timeout=max(0.0, timeout - (time.perf_counter() - start)))
+                ok = True
+            except FutureTimeoutError:
+                metrics.incr("tool.timeout", tool=call.name)
+                content, ok = f"도구 실행 시간 초과: {call.name} ({timeout:g}초)", False
+            except Exception as e:
+                metrics.incr("tool.error", tool=call.name)
+                content, ok = f"도구 실행 오류: {call.name} ({str(e)})", False
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            metrics.observe("tool.latency_ms", elapsed_ms, tool=call.name)
+            results.append(ToolResult(call, str(content), ok, elapsed_ms))
+    finally:
+        # 시간이 초과된 호출은 기다리지 않음
+        pool.shutdown(wait=False, cancel_futures=True)
+    return sorted(results, key=lambda result: result.call.index)
+
+def tool_messages(results: List[ToolResult]) -> List[Dict]:
+    """assistant tool_calls 메시지 + 호출 순서대로 정렬된 tool 메시지"""
+    ordered = sorted(results, key=lambda result: result.call.index)
+    call_ids = [result.call.id or f"call_{result.call.index}" for result in ordered]
+    messages = [{
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {"id": call_id, "type": "function", "function": {"name": result.call.name, "arguments": result.call.arguments}}
+            for call_id, result in zip(call_ids, ordered)
+        ],
+    }]
+    for call_id, result in zip(call_ids, ordered):
+        messages.append({"role": "tool", "tool_call_id": call_id, "content": result.content})
+    return messages
+
+# 전역 실행기 (동시 실행 제한은 프로세스 전체에 적용)
+tool_executor = ToolExecutor()
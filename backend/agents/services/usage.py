@@ -0,0 +1,94 @@
+import time
+from typing import Dict, List, Optional
+from ..models.schemas import Usage
+from .context_window import estimate_tokens, message_tokens
+from .metrics import metrics
+
+# 요청 단위 사용량/지연 집계 (최종 청크의 usage 와 모델/경로별 히스토그램)
+
+class RequestUsage:
+    """요청 하나가 호출한 모든 업스트림 usage 합계 + 첫 토큰 시간/출력 속도
+
+    업스트림이 usage 를 주지 않으면 프롬프트/출력 토큰 수를 추정치로 채운다.
+    """
+
+    def __init__(self, model: str, route: Optional[str] = None):
+        self.model = model
+        self.route = route
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.last_token_at = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.upstream_calls = 0
+        self.finish_reason = None  # 답변 업스트림의 마지막 finish_reason (정상 완료 판단용)
+        self._estimated_prompt = 0
+        self._estimated_completion = 0
+
+    def add_prompt(self, messages: List[Dict]):
+        """업스트림으로 보낸 메시지 (usage 가 없을 때의 추정용)"""
+        self._estimated_prompt += sum(message_tokens(message) for message in messages)
+
+    def add_upstream(self, usage):
+        """업스트림 응답의 usage 누적 (라우터 호출 포함)"""
+        if usage is None:
+            return
+        self.upstream_calls += 1
+        self.prompt_tokens += getattr(usage, "prompt_tokens", 0) or 0
+        self.completion_tokens += getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        if details is not None:
+            self.cached_tokens += getattr(details, "cached_tokens", 0) or 0
+
+    def merge(self, other: "RequestUsage"):
+        """다른 집계(채택된 추측 스트림 등)의 업스트림 사용량을 합산"""
+        self.upstream_calls += other.upstream_calls
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+        self._estimated_prompt += other._estimated_prompt
+        if other.finish_reason is not None:
+            self.finish_reason = other.finish_reason
+
+    @property
+    def estimated_prompt_tokens(self) -> int:
+        return self._estimated_prompt
+
+    def on_token(self, text: str):
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self.last_token_at = now
+        self._estimated_completion += estimate_tokens(text)
+
+    def finish(self) -> Usage:
+        """최종 usage 계산 후 모델/경로별 히스토그램에 기록"""
+        prompt_tokens = self.prompt_tokens or self._estimated_prompt
+        completion_tokens = self.completion_tokens or self._estimated_completion
+        latency_ms = (time.perf_counter() - self.start) * 1000
+        ttft_ms = tokens_per_second = None
+        if self.first_token_at is not None:
+            ttft_ms = (self.first_token_at - self.start) * 1000
+            generation_seconds = self.last_token_at - self.first_token_at
+            if generation_seconds > 0:
+                tokens_per_second = completion_tokens / generation_seconds
+
+        labels = {"model": self.model, "route": self.route or "unknown"}
+        metrics.observe("request.prompt_tokens", prompt_tokens, **labels)
+        metrics.observe("request.completion_tokens", completion_tokens, **labels)
+        metrics.observe("request.latency_ms", latency_ms, **labels)
+        if ttft_ms is not None:
+            metrics.observe("request.ttft_ms", ttft_ms, **labels)
+        if tokens_per_second is not None:
+            metrics.observe("request.tokens_per_second", tokens_per_second, **labels)
+
+        return Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details={"cached_tokens": self.cached_tokens} if self.upstream_calls else None,
+            time_to_first_token_ms=round(ttft_ms, 1) if ttft_ms is not None else None,
+            tokens_per_second=round(tokens_per_second, 1) if tokens_per_second is not None else None,
+            latency_ms=round(latency_ms, 1),
+        )
@@ -0,0 +1,118 @@
+import codecs
+import re
+from html.parser import HTMLParser
+from typing import Optional
+
+# 글자 수 예산 기반 스트리밍 HTML 텍스트 추출기
+# 대상 요소(#main_pack) 시작 위치를 바이트 검색으로 찾은 뒤 그 하위 트리만 점진적으로 파싱하고,
+# 예산을 채우는 즉시 중단한다. (전체 DOM 트리를 만들지 않음)
+
+_SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "head"}
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source", "track", "wbr"}
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.I)
+_FEED_SIZE = 16 * 1024
+
+class _BudgetReached(Exception):
+    pass
+
+class _SubtreeTextParser(HTMLParser):
+    """대상 요소 하위 텍스트를 공백 정규화하며 수집 (예산 초과 시 중단)"""
+
+    def __init__(self, root_tag: str, limit: int):
+        super().__init__(convert_charrefs=True)
+        self.root_tag = root_tag
+        self.limit = limit
+        self.pieces = []
+        self.length = 0
+        self._root_depth = 0
+        self._skip_tag = None
+        self._skip_depth = 0
+        self._pending_space = False
+
+    def handle_starttag(self, tag, attrs):
+        self._pending_space = True
+        if tag == self.root_tag:
+            self._root_depth += 1
+        if tag in _VOID_TAGS:
+            return
+        if self._skip_tag is not None:
+            if tag == self._skip_tag:
+                self._skip_depth += 1
+            return
+        if tag in _SKIP_TAGS or self._is_hidden(attrs):
+            self._skip_tag = tag
+            self._skip_depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._pending_space = True
+
+    def handle_endtag(self, tag):
+        self._pending_space = True
+        if self._skip_tag is not None and tag == self._skip_tag:
+            self._skip_depth -= 1
+            if self._skip_depth == 0:
+                self._skip_tag = None
+        if tag == self.root_tag:
+            self._root_depth -= 1
+            if self._root_depth <= 0:
+                raise _BudgetReached()
+
+    def handle_data(self, data):
+        if self._skip_tag is not None:
+            return
+
+        # 텍스트 노드 경계와 공백 구간을 하나의 공백으로 압축 (clean_text 와 동일한 결과)
+        words = data.split()
+        if not words:
+            if data:
+                self._pending_space = True
+            return
+        if data[0].isspace():
+            self._pending_space = True
+        for word in words:
+            if self._pending_space and self.length:
+                self.pieces.append(" ")
+                self.length += 1
+            self.pieces.append(word)
+            self.length += len(word)
+            self._pending_space = True
+            if self.length > self.limit:
+                raise _BudgetReached()
+        self._pending_space = data[-1].isspace()
+
+    @staticmethod
+    def _is_hidden(attrs) -> bool:
+        for name, value in attrs:
+            if name == "hidden":
+                return True
+            if name == "aria-hidden" and value == "true":
+                return True
+            if name == "style" and value and _HIDDEN_STYLE.search(value):
+                return True
+        return False
+
+def _find_element_start(content: bytes, element_id: str) -> Optional[re.Match]:
+    # data-id, aria-id 같은 다른 속성 이름에 걸리지 않도록 id 앞에 영숫자/'-' 가 없어야 함
+    pattern = re.compile(rb"<([a-zA-Z][a-zA-Z0-9]*)\b[^>]*?(?<![\w-])id\s*=\s*[\"']?" + re.escape(element_id.encode()) + rb"[\"'\s/>]")
+    return pattern.search(content)
+
+def extract_text_budgeted(content: bytes, element_id: str = "main_pack", budget: int = 1500, encoding: str = "utf-8") -> Optional[str]:
+    """element_id 요소의 보이는 텍스트를 최대 budget 자까지 추출 (초과 시 '...' 추가, 요소가 없으면 None)"""
+    match = _find_element_start(content, element_id)
+    if match is None:
+        return None
+
+    root_tag = match.group(1).decode("ascii").lower()
+    parser = _SubtreeTextParser(root_tag, budget)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    try:
+        for offset in range(match.start(), len(content), _FEED_SIZE):
+            parser.feed(decoder.decode(content[offset:offset + _FEED_SIZE]))
+        parser.close()
+    except _BudgetReached:
+        pass
+
+    text = "".join(parser.pieces)
+    if len(text) > budget:
+        return text[:budget] + "..."
+    return text
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional
+from ..services.metrics import metrics
+from ..utils.text_utils import optimize_search_query
+
+# 검색 결과 캐시 설정
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "2048"))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+SEARCH_CACHE_STALE_SECONDS = float(os.getenv("SEARCH_CACHE_STALE_SECONDS", "1800"))
+SEARCH_CACHE_DISK_PATH = os.getenv("SEARCH_CACHE_DISK_PATH")  # 지정 시 재시작 후에도 유지되는 디스크 계층 사용
+
+def normalize_query(query: str) -> str:
+    """캐시 키: NFC 정규화 + 공백 압축"""
+    return unicodedata.normalize("NFC", optimize_search_query(query))
+
+class _Flight:
+    """진행 중인 fetch 하나와 그 결과를 기다리는 요청 수"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class _DiskTier:
+    """sqlite 기반 디스크 계층 (key, value, fetched_at)
+
+    연결 하나를 전용 스레드 하나에서만 사용해 조회/기록이 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(self, path: str, max_age: float):
+        self.max_age = max_age
+        self._writes = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-cache-db")
+        self._db = self._executor.submit(self._open, path).result()
+
+    def _open(self, path: str):
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)")
+        db.commit()
+        return db
+
+    def _get(self, key: str):
+        row = self._db.execute("SELECT value, fetched_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        return row if row else None
+
+    def _put(self, key: str, value: str, fetched_at: float):
+        self._db.execute("INSERT OR REPLACE INTO search_cache (key, value, fetched_at) VALUES (?, ?, ?)", (key, value, fetched_at))
+        self._writes += 1
+        # 주기적으로 만료된 항목 정리
+        if self._writes % 100 == 0:
+            self._db.execute("DELETE FROM search_cache WHERE fetched_at < ?", (time.time() - self.max_age,))
+        self._db.commit()
+
+    async def get(self, key: str):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._get, key)
+
+    def put(self, key: str, value: str, fetched_at: float):
+        """기록은 응답을 기다리게 하지 않도록 전용 스레드에 넘기고 바로 반환"""
+        future = self._executor.submit(self._put, key, value, fetched_at)
+        future.add_done_callback(_log_disk_error)
+
+def _log_disk_error(future):
+    if future.exception() is not None:
+        print(f"⚠️ 검색 캐시 디스크 기록 실패: {future.exception()}")
+
+class SearchCache:
+    """검색 결과 캐시: TTL + stale-while-revalidate + single-flight (+ 선택적 디스크 계층)
+
+    - age < ttl: 캐시 적중
+    - ttl <= age < ttl + stale: 오래된 결과를 즉시 반환하고 백그라운드에서 갱신
+    - 그 외: fetch (동일 쿼리의 동시 요청은 하나의 fetch 를 공유)
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES, ttl: float = SEARCH_CACHE_TTL_SECONDS, stale: float = SEARCH_CACHE_STALE_SECONDS, disk_path: Optional[str] = SEARCH_CACHE_DISK_PATH):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale = stale
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, _Flight] = {}
+        self._disk = _DiskTier(disk_path, ttl + stale) if disk_path else None
+
+    async def get(self, query: str, fetch: Callable[[str], Awaitable[str]]) -> str:
+        key = normalize_query(query)
+        entry = self._lookup(key)
+        if entry is None and self._disk is not None:
+            entry = await self._lookup_disk(key)
+
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age < self.ttl:
+                metrics.incr("search_cache.hit")
+                return value
+            if age < self.ttl + self.stale:
+                metrics.incr("search_cache.stale")
+                self._start_flight(key, fetch)
+                return value
+
+        metrics.incr("search_cache.miss")
+        return await self._join_flight(key, fetch)
+
+    def _lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    async def _lookup_disk(self, key: str):
+        entry = await self._disk.get(key)
+        if entry is not None:
+            metrics.incr("search_cache.disk_hit")
+            self._remember(key, entry)
+        return entry
+
+    def _remember(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _start_flight(self, key: str, fetch) -> _Flight:
+        flight = self._inflight.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(self._fetch(key, fetch))
+            # 백그라운드 갱신 실패는 다음 요청에서 다시 시도 (예외 미조회 경고 방지)
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            flight = self._inflight[key] = _Flight(task)
+        else:
+            metrics.incr("search_cache.coalesced")
+        return flight
+
+    async def _join_flight(self, key: str, fetch) -> str:
+        flight = self._start_flight(key, fetch)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # 기다리는 요청이 모두 취소되면 fetch 도 중단
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def _fetch(self, key: str, fetch) -> str:
+        try:
+            value = await fetch(key)
+            entry = (value, time.time())
+            self._remember(key, entry)
+            if self._disk is not None:
+                self._disk.put(key, *entry)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+# 전역 캐시
+search_cache = SearchCache()
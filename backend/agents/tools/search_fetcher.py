@@ -0,0 +1,92 @@
+import asyncio
+import os
+import random
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+import httpx
+from ..services.metrics import metrics
+
+# 검색 페이지 fetch 설정
+SEARCH_BASE_URL = os.getenv("SEARCH_BASE_URL", "https://search.naver.com")  # 오프라인 벤치마크 시 로컬 스탠드인 주소로 교체
+SEARCH_CONNECT_TIMEOUT = float(os.getenv("SEARCH_CONNECT_TIMEOUT", "3"))
+SEARCH_READ_TIMEOUT = float(os.getenv("SEARCH_READ_TIMEOUT", "8"))
+SEARCH_PER_HOST_LIMIT = int(os.getenv("SEARCH_PER_HOST_LIMIT", "8"))
+SEARCH_MAX_RETRIES = int(os.getenv("SEARCH_MAX_RETRIES", "2"))
+SEARCH_BACKOFF_BASE = float(os.getenv("SEARCH_BACKOFF_BASE", "0.2"))
+
+_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_search_client = None
+_host_limits: Dict[str, asyncio.Semaphore] = {}
+
+class SearchError(Exception):
+    """검색 페이지 요청 실패 (재시도 후에도 실패)"""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+def get_search_client() -> httpx.AsyncClient:
+    """검색용 공유 keep-alive 클라이언트 (최초 호출 시 생성)"""
+    global _search_client
+    if _search_client is None or _search_client.is_closed:
+        _search_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=SEARCH_PER_HOST_LIMIT * 4, max_keepalive_connections=SEARCH_PER_HOST_LIMIT),
+            timeout=httpx.Timeout(SEARCH_READ_TIMEOUT, connect=SEARCH_CONNECT_TIMEOUT),
+            headers={"User-Agent": _USER_AGENT},
+            follow_redirects=True,
+        )
+    return _search_client
+
+async def close_search_client():
+    global _search_client
+    if _search_client is not None and not _search_client.is_closed:
+        await _search_client.aclose()
+    _search_client = None
+
+def _host_limit(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc
+    semaphore = _host_limits.get(host)
+    if semaphore is None:
+        semaphore = _host_limits[host] = asyncio.Semaphore(SEARCH_PER_HOST_LIMIT)
+    return semaphore
+
+def _backoff(attempt: int) -> float:
+    """지터가 적용된 지수 백오프 (full jitter)"""
+    return random.uniform(0, SEARCH_BACKOFF_BASE * (2 ** attempt))
+
+async def fetch_page(url: str, params: dict = None) -> bytes:
+    """호스트별 동시성 제한 + 재시도로 페이지 본문을 가져옴"""
+    client = get_search_client()
+    last_error = None
+    start = time.perf_counter()
+
+    for attempt in range(SEARCH_MAX_RETRIES + 1):
+        if attempt:
+            metrics.incr("search_fetch.retry")
+            await asyncio.sleep(_backoff(attempt))
+        try:
+            async with _host_limit(url):
+                response = await client.get(url, params=params)
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            last_error = SearchError(f"검색 요청 실패: {type(e).__name__}")
+            continue
+
+        if response.status_code == 200:
+            metrics.observe("search_fetch.latency_ms", (time.perf_counter() - start) * 1000)
+            return response.content
+        last_error = SearchError(f"검색 요청 실패. 상태 코드: {response.status_code}", response.status_code)
+        if response.status_code not in _RETRY_STATUS:
+            break
+
+    metrics.incr("search_fetch.failed")
+    raise last_error
+
+async def fetch_search_page(query: str) -> bytes:
+    """네이버 통합검색 결과 페이지 HTML"""
+    return await fetch_page(
+        f"{SEARCH_BASE_URL}/search.naver",
+        params={"where": "nexearch", "sm": "top_hty", "fbm": "0", "ie": "utf8", "query": query},
+    )
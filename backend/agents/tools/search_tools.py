@@ -1,33 +1,53 @@
+import asyncio
 import requests
-from bs4 import BeautifulSoup
-import re
-from ..utils.text_utils import clean_text
+from .search_cache import search_cache
+from .html_extractor import extract_text_budgeted
+from .search_fetcher import SearchError, fetch_search_page, SEARCH_CONNECT_TIMEOUT, SEARCH_READ_TIMEOUT
 
 # 전역 변수
 last_search_context = {"query": None, "topic": None}
 
+def extract_main_text(content: bytes) -> str:
+    """검색 결과 페이지 HTML 에서 #main_pack 의 보이는 텍스트만 최대 1500자까지 추출"""
+    text = extract_text_budgeted(content, element_id="main_pack", budget=1500)
+    if text is None:
+        return "검색 결과를 찾을 수 없습니다."
+    return text
+
+def fetch_search_text(query: str) -> str:
+    """동기 검색 (CLI/도구 호출 경로, 요청 실패 시 SearchError)"""
+    response = requests.get(
+        "https://search.naver.com/search.naver",
+        params={"where": "nexearch", "sm": "top_hty", "fbm": "0", "ie": "utf8", "query": query},
+        timeout=(SEARCH_CONNECT_TIMEOUT, SEARCH_READ_TIMEOUT),
+    )
+
+    if response.status_code != 200:
+        raise SearchError(f"검색 요청 실패. 상태 코드: {response.status_code}")
+
+    return extract_main_text(response.content)
+
+async def fetch_search_text_async(query: str) -> str:
+    """비동기 검색: 공유 keep-alive 클라이언트로 가져오고 파싱은 스레드에서 수행"""
+    content = await fetch_search_page(query)
+    return await asyncio.to_thread(extract_main_text, content)
+
 def enhanced_search(query: str):
     print(f"🔍 검색 쿼리: {query}")
-    response = requests.get(f"https://search.naver.com/search.naver?where=nexearch&sm=top_hty&fbm=0&ie=utf8&query={query}")
+    try:
+        return fetch_search_text(query)
+    except (SearchError, requests.RequestException) as e:
+        return str(e)
 
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.content, 'lxml')
-        main_pack = soup.find(id='main_pack')
-        
-        if main_pack:
-            text_only = main_pack.get_text(separator='\n').strip()
-            cleaned_text = clean_text(text_only)
-            
-            if len(cleaned_text) > 1500:
-                cleaned_text = cleaned_text[:1500] + "..."
-            
-            return cleaned_text
-        else:
-            return "검색 결과를 찾을 수 없습니다."
-    else:
-        return f"검색 요청 실패. 상태 코드: {response.status_code}"
+async def cached_search(query: str) -> str:
+    """캐시를 거치는 비동기 검색 (동일 쿼리 동시 요청은 한 번만 fetch)"""
+    print(f"🔍 검색 쿼리: {query}")
+    try:
+        return await search_cache.get(query, fetch_search_text_async)
+    except SearchError as e:
+        return str(e)
 
-def routing(agent: str):
+def routing(agent: str, query: str = ""):
     """라우팅 함수"""
     return agent
 
@@ -69,9 +89,13 @@ ROUTING = [{
                     "type": "string",
                     "enum": ["chat", "tool"],
                     "description": "The agent to route the user's request to.",
+                },
+                "query": {
+                    "type": "string",
+                    "description": "Optimized web search query when agent is 'tool'; empty string when agent is 'chat'.",
                 }
             },
-            "required": ["agent"],
+            "required": ["agent", "query"],
             "additionalProperties": False,
         },
         "strict": True
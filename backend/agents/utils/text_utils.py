@@ -6,6 +6,13 @@ def clean_text(text):
     cleaned_text = cleaned_text.strip()
     return cleaned_text
 
+# 검색어에 불필요한 요청 표현 (문장 끝)
+_REQUEST_SUFFIX = re.compile(
+    r"\s*(?:좀\s*)?(?:검색\s*해\s*(?:줘|주세요|줄래)|찾아\s*(?:줘|주세요|봐|줄래)|알려\s*(?:줘|주세요|줄래)|"
+    r"알아\s*봐\s*(?:줘|주세요)?|말해\s*(?:줘|주세요))\s*[?!.~]*$"
+)
+_TRAILING_PUNCT = re.compile(r"[\s?!.~]+$")
+
 def optimize_search_query(user_question: str) -> str:
     """사용자 질문을 검색에 최적화된 쿼리로 변환"""
     # 기본적인 전처리
@@ -14,4 +21,8 @@ def optimize_search_query(user_question: str) -> str:
     # 공백 정리
     query = " ".join(query.split())
     
+    # 문장 끝 요청 표현/문장부호 제거 ("서울 날씨 알려줘?" -> "서울 날씨")
+    query = _REQUEST_SUFFIX.sub("", query)
+    query = _TRAILING_PUNCT.sub("", query)
+    
     return query if query else user_question 
\ No newline at end of file
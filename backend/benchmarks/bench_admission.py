@@ -0,0 +1,74 @@
+"""
+수용 제어 벤치마크 (동시 요청 폭주 vs 제공자 동시 처리 한도)
+
+스텁 업스트림은 동시 스트림이 max_concurrent 를 넘으면 429 로 거절한다.
+같은 폭주를 수용 제어 없이 / AdmissionController 를 거쳐 보내고
+업스트림 429, 즉시 거절(Retry-After), 완료 수와 완료 요청의 지연을 비교한다.
+
+    cd backend && python -m benchmarks.bench_admission
+"""
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+
+from openai import RateLimitError
+from agents.services.admission import AdmissionController, AdmissionRejected
+from agents.services.agent import AIAgent
+from agents.services.clients import create_async_client
+from agents.services.metrics import Histogram
+from agents.services.streaming import stream_chat_deltas
+from benchmarks.stub_upstream import create_stub_app, run_in_thread
+
+PORT = 9121
+BURST = 200
+PROVIDER_LIMIT = 16
+
+async def one_request(agent, messages, controller, stats):
+    start = time.perf_counter()
+    ticket = None
+    try:
+        if controller is not None:
+            ticket = await controller.admit(agent.model)
+        async for _ in stream_chat_deltas(agent, messages):
+            pass
+        stats["ok"] += 1
+        stats["latency"].observe((time.perf_counter() - start) * 1000)
+    except AdmissionRejected:
+        stats["rejected"] += 1
+        stats["reject_ms"].observe((time.perf_counter() - start) * 1000)
+    except RateLimitError:
+        stats["upstream_429"] += 1
+    finally:
+        if ticket is not None:
+            ticket.release()
+
+async def run(name, agent, messages, controller):
+    stats = {"ok": 0, "rejected": 0, "upstream_429": 0, "latency": Histogram(), "reject_ms": Histogram()}
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(agent, messages, controller, stats) for _ in range(BURST)))
+    elapsed = time.perf_counter() - start
+    latency = stats["latency"].snapshot()
+    print(f"{name:<22} {stats['ok']:>5} {stats['upstream_429']:>6} {stats['rejected']:>9} {stats['reject_ms'].snapshot().get('p99', 0):>13.1f} {latency.get('p50', 0):>8.0f} {latency.get('p99', 0):>8.0f} {elapsed:>7.2f}")
+
+async def main():
+    server = run_in_thread(create_stub_app(first_token_ms=200, token_ms=5, tokens=20, max_concurrent=PROVIDER_LIMIT), PORT)
+    agent = AIAgent(model="stub/chat", system_prompt="You are a helpful assistant.")
+    agent.async_client = create_async_client(f"http://127.0.0.1:{PORT}/v1", "stub").with_options(max_retries=0)
+    messages = agent.build_messages([{"role": "user", "content": "안녕"}])
+    try:
+        print(f"요청 {BURST}개 동시 도착, 제공자 동시 한도 {PROVIDER_LIMIT}")
+        print(f"{'path':<22} {'ok':>5} {'429':>6} {'rejected':>9} {'reject p99 ms':>13} {'p50 ms':>8} {'p99 ms':>8} {'total s':>7}")
+        await run("no admission control", agent, messages, None)
+        await asyncio.sleep(0.5)
+        controller = AdmissionController(rates={}, rate=200, burst=200, max_concurrent=PROVIDER_LIMIT, queue_size=64, max_wait_ms=2000)
+        await run("admission control", agent, messages, controller)
+        await asyncio.sleep(0.5)
+        # 점유 시간 추정이 생긴 뒤: 기한을 넘길 요청은 대기열에 넣지 않고 바로 거절
+        await run("admission (warm)", agent, messages, controller)
+    finally:
+        server.should_exit = True
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+"""
+동시 스트림 수에 따른 time-to-first-token 벤치마크
+
+스텁 업스트림을 띄운 뒤 stream_chat_deltas 를 N개 동시에 열고 TTFT 분포를 측정한다.
+비동기 경로에서는 스트림 수가 늘어도 TTFT 가 선형으로 증가하지 않아야 한다.
+
+    cd backend && python -m benchmarks.bench_concurrent_ttft
+"""
+import asyncio
+import os
+import statistics
+import time
+
+PORT = int(os.getenv("STUB_PORT", "9100"))
+os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+
+from agents.services.agent import AIAgent
+from agents.services.streaming import stream_chat_deltas
+from benchmarks.stub_upstream import create_stub_app, run_in_thread
+
+async def one_stream(agent):
+    start = time.perf_counter()
+    ttft = None
+    async for _ in stream_chat_deltas(agent, [{"role": "user", "content": "hi"}]):
+        if ttft is None:
+            ttft = time.perf_counter() - start
+    return ttft
+
+async def run(concurrency_levels=(1, 8, 32, 64)):
+    agent = AIAgent(model="stub", endpoint=f"http://127.0.0.1:{PORT}/v1", system_prompt="")
+    print(f"{'streams':>8} {'p50 ttft(ms)':>14} {'max ttft(ms)':>14} {'wall(s)':>9}")
+    for n in concurrency_levels:
+        start = time.perf_counter()
+        ttfts = await asyncio.gather(*(one_stream(agent) for _ in range(n)))
+        wall = time.perf_counter() - start
+        print(f"{n:>8} {statistics.median(ttfts) * 1000:>14.1f} {max(ttfts) * 1000:>14.1f} {wall:>9.2f}")
+
+if __name__ == "__main__":
+    server = run_in_thread(create_stub_app(first_token_ms=300, token_ms=20, tokens=50), PORT)
+    try:
+        asyncio.run(run())
+    finally:
+        server.should_exit = True
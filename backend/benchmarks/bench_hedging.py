@@ -0,0 +1,82 @@
+"""
+헤지 스트리밍 / 서킷 브레이커 벤치마크 (로컬 스텁 업스트림 2개)
+
+기본 업스트림은 첫 토큰 시간이 긴 꼬리(일부 요청만 매우 느림)를 갖고, 대체 업스트림은 조금 느리지만 안정적이다.
+기본 업스트림만 쓰는 경우와 stream_hedged 를 비교해 첫 토큰 시간 분포를 보고,
+이어서 기본 업스트림이 모두 실패하는 구간에서 서킷 브레이커가 열려 곧바로 대체 업스트림으로 가는지 확인한다.
+
+    cd backend && python -m benchmarks.bench_hedging
+"""
+import asyncio
+import os
+import time
+
+os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+os.environ.setdefault("HEDGE_MIN_SAMPLES", "10")
+os.environ.setdefault("BREAKER_COOLDOWN_SECONDS", "60")
+
+from agents.services.agent import AIAgent
+from agents.services.circuit_breaker import get_breaker
+from agents.services.clients import create_async_client
+from agents.services.hedging import hedge_delay, stream_hedged
+from agents.services.metrics import Histogram, metrics
+from agents.services.streaming import stream_chat_deltas
+from benchmarks.stub_upstream import create_stub_app, run_in_thread
+
+PRIMARY_PORT = 9111
+FALLBACK_PORT = 9112
+REQUESTS = 60
+CONCURRENCY = 10
+
+def make_agent(model: str, port: int) -> AIAgent:
+    agent = AIAgent(model=model, system_prompt="You are a helpful assistant.")
+    agent.async_client = create_async_client(f"http://127.0.0.1:{port}/v1", "stub")
+    agent.async_client = agent.async_client.with_options(max_retries=0)
+    return agent
+
+async def one_request(deltas_factory, histogram: Histogram, errors: list):
+    start = time.perf_counter()
+    try:
+        async for _ in deltas_factory():
+            histogram.observe((time.perf_counter() - start) * 1000)
+            break
+    except Exception as e:
+        errors.append(type(e).__name__)
+
+async def run(name: str, deltas_factory, requests: int = REQUESTS):
+    histogram = Histogram()
+    errors = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def bounded():
+        async with semaphore:
+            await one_request(deltas_factory, histogram, errors)
+
+    await asyncio.gather(*(bounded() for _ in range(requests)))
+    snapshot = histogram.snapshot()
+    print(f"{name:<30} {snapshot.get('p50', 0):>8.0f} {snapshot.get('p90', 0):>8.0f} {snapshot.get('p99', 0):>8.0f} {len(errors):>7}")
+
+async def main():
+    primary_app = create_stub_app(first_token_ms=150, token_ms=1, tokens=5, tail_ms=4000, tail_ratio=0.15)
+    fallback_app = create_stub_app(first_token_ms=400, token_ms=1, tokens=5)
+    servers = [run_in_thread(primary_app, PRIMARY_PORT), run_in_thread(fallback_app, FALLBACK_PORT)]
+    primary = make_agent("stub/primary", PRIMARY_PORT)
+    fallback = make_agent("stub/fallback", FALLBACK_PORT)
+    messages = primary.build_messages([{"role": "user", "content": "안녕"}])
+
+    try:
+        print(f"{'path':<30} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        await run("primary only", lambda: stream_chat_deltas(primary, messages))
+        await run("hedged", lambda: stream_hedged(primary, fallback, messages))
+        print(f"헤지 지연: {hedge_delay(primary.model) * 1000:.0f} ms, 헤지 발생: {metrics.counter('hedge.fired', model=primary.model):.0f}회")
+
+        # 기본 업스트림 전면 장애: 처음 몇 건은 실패 후 대체로 넘어가고, 브레이커가 열린 뒤에는 바로 대체로 감
+        primary_app.state.config["error_ratio"] = 1.0
+        await run("primary down (hedged)", lambda: stream_hedged(primary, fallback, messages), requests=30)
+        print(f"브레이커 상태: {get_breaker(primary.model).state}, 기본 업스트림 건너뜀: {metrics.counter('hedge.primary_skipped', model=primary.model):.0f}회")
+    finally:
+        for server in servers:
+            server.should_exit = True
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,53 @@
+"""
+검색 페이지 텍스트 추출 벤치마크 (pages/sec, 최대 메모리)
+
+기존 경로(BeautifulSoup 전체 파싱 + get_text + clean_text 후 1500자 절단)와
+예산 기반 스트리밍 추출기(extract_text_budgeted)를 픽스처 페이지로 비교한다.
+
+    cd backend && python -m benchmarks.bench_html_extract
+"""
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+from agents.tools.html_extractor import extract_text_budgeted
+from agents.utils.text_utils import clean_text
+from benchmarks.naver_fixtures import load_pages
+
+def legacy_extract(content: bytes) -> str:
+    soup = BeautifulSoup(content, 'lxml')
+    main_pack = soup.find(id='main_pack')
+    if not main_pack:
+        return "검색 결과를 찾을 수 없습니다."
+    cleaned_text = clean_text(main_pack.get_text(separator='\n').strip())
+    if len(cleaned_text) > 1500:
+        cleaned_text = cleaned_text[:1500] + "..."
+    return cleaned_text
+
+def budgeted_extract(content: bytes) -> str:
+    return extract_text_budgeted(content, "main_pack", 1500)
+
+def measure(fn, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            fn(page)
+    pages_per_sec = rounds * len(pages) / (time.perf_counter() - start)
+
+    tracemalloc.start()
+    for page in pages:
+        fn(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pages_per_sec, peak
+
+def main(rounds=3):
+    pages = load_pages()
+    avg_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"픽스처 {len(pages)}개, 평균 {avg_kb:.0f} KB")
+    print(f"{'path':<28} {'pages/sec':>10} {'peak MB':>9}")
+    for name, fn in (("BeautifulSoup + clean_text", legacy_extract), ("budgeted streaming", budgeted_extract)):
+        pages_per_sec, peak = measure(fn, pages, rounds)
+        print(f"{name:<28} {pages_per_sec:>10.1f} {peak / 1024 / 1024:>9.2f}")
+
+if __name__ == "__main__":
+    main()
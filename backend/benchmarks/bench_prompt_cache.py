@@ -0,0 +1,83 @@
+"""
+업스트림 프롬프트 prefix 캐시 적중률 시뮬레이션
+
+같은 대화를 여러 턴 이어가며 요청 메시지를 조립하는 방식별로 스텁의 PrefixCacheSim 에 넣어
+cached_tokens / prompt_tokens 비율을 비교한다. (워커 여러 개가 번갈아 요청을 처리하는 상황 포함)
+
+- legacy: 워커별 import 시각이 박힌 시스템 프롬프트 + 최근 8개 메시지 + 검색 턴은 질문을 검색 프롬프트로 대체
+- sliding window: 매 턴 예산에 딱 맞춰 창을 다시 자름 (창이 차면 매 턴 앞부분이 바뀜)
+- prefix-stable: assemble_messages (정적 시스템 프롬프트, 창 시작 고정, 변동 정보는 끝에만)
+
+    cd backend && python -m benchmarks.bench_prompt_cache
+"""
+from agents.services import context_window, session_store
+from agents.services.context_window import message_tokens
+from agents.services.prompts import assemble_messages
+from agents.services.session_store import ConversationSession
+from benchmarks.stub_upstream import PrefixCacheSim
+
+TURNS = 40
+WORKERS = 2
+BUDGET = 3000
+SYSTEM_PROMPT = "You are a helpful assistant.\n적극적으로 대화를 진행하세요.\n" * 8
+
+def make_turn(i: int):
+    question = f"{i}번째 질문입니다. " + "서울 날씨와 주말 일정에 대해 자세히 알려줘. " * 3
+    answer = f"{i}번째 답변입니다. " + "요청하신 내용을 정리하면 다음과 같습니다. " * 12
+    search = None if i % 3 else f"검색 결과 {i}: " + "기온 18도, 맑음, 미세먼지 보통. " * 20
+    return question, answer, search
+
+class _Agent:
+    def __init__(self, system_prompt: str, budget: int):
+        self.base_history = [{"role": "system", "content": system_prompt}]
+        self.history_budget = budget - message_tokens(self.base_history[0])
+
+    def build_messages(self, history):
+        return [self.base_history[0], *history]
+
+    def build_window(self, session, reserve: int = 0, end=None):
+        return self.build_messages(session.window(self.history_budget - reserve, end))
+
+def legacy(worker: int, history, question, search):
+    system = {"role": "system", "content": SYSTEM_PROMPT + f"Current time: 2025-01-01 0{worker}:00:00"}
+    history = history[-8:]
+    if search is None:
+        return [system, *history]
+    final_prompt = f"검색 결과를 바탕으로 사용자의 질문에 답변해주세요:\n\n검색 결과: {search}\n\n사용자 질문: {question}"
+    return [system, *history[:-1], {"role": "user", "content": final_prompt}]
+
+def run(strategy: str) -> float:
+    # 잘라낼 비율 1.0 = 예산을 넘을 때마다 딱 맞게 다시 자르는 기존 슬라이딩 창
+    session_store.CONTEXT_TRIM_RATIO = 1.0 if strategy == "sliding window" else context_window.CONTEXT_TRIM_RATIO
+    cache = PrefixCacheSim()
+    session = ConversationSession(None)
+    agent = _Agent(SYSTEM_PROMPT, BUDGET)
+    history = []
+    prompt_total = cached_total = 0
+
+    for i in range(TURNS):
+        question, answer, search = make_turn(i)
+        history.append({"role": "user", "content": question})
+        session.append({"role": "user", "content": question})
+
+        if strategy == "legacy":
+            messages = legacy(i % WORKERS, history, question, search)
+        else:
+            messages = assemble_messages(agent, session, search)
+
+        prompt_tokens, cached_tokens = cache.lookup(messages)
+        prompt_total += prompt_tokens
+        cached_total += cached_tokens
+
+        history.append({"role": "assistant", "content": answer})
+        session.append({"role": "assistant", "content": answer})
+    return cached_total / prompt_total
+
+def main():
+    print(f"{TURNS}턴, 워커 {WORKERS}개, 예산 {BUDGET} 토큰")
+    print(f"{'strategy':<16} {'cache hit rate':>15}")
+    for strategy in ("legacy", "sliding window", "prefix-stable"):
+        print(f"{strategy:<16} {run(strategy):>15.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+검색 fetch 지연/동시성 벤치마크 (로컬 네이버 스탠드인 사용)
+
+기존 경로(requests.get 를 스레드에서 실행, 요청마다 새 연결)와
+비동기 keep-alive 경로(fetch_search_page)를 동시 요청 수별로 비교한다.
+
+    cd backend && python -m benchmarks.bench_search_fetch
+"""
+import asyncio
+import os
+import statistics
+import time
+
+PORT = int(os.getenv("NAVER_STUB_PORT", "9200"))
+os.environ["SEARCH_BASE_URL"] = f"http://127.0.0.1:{PORT}"
+
+import requests
+from agents.tools.search_fetcher import fetch_search_page, close_search_client
+from benchmarks.naver_stub_server import create_naver_stub
+from benchmarks.stub_upstream import run_in_thread
+
+def legacy_fetch(query):
+    return requests.get(f"http://127.0.0.1:{PORT}/search.naver?where=nexearch&sm=top_hty&fbm=0&ie=utf8&query={query}").content
+
+async def timed(coro):
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+async def run(levels=(1, 8, 32)):
+    print(f"{'path':<22} {'concurrency':>11} {'p50(ms)':>9} {'max(ms)':>9} {'wall(s)':>8}")
+    for n in levels:
+        for name, make in (
+            ("requests + thread", lambda i: asyncio.to_thread(legacy_fetch, f"q{i}")),
+            ("async keep-alive", lambda i: fetch_search_page(f"q{i}")),
+        ):
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(timed(make(i)) for i in range(n)))
+            wall = time.perf_counter() - start
+            print(f"{name:<22} {n:>11} {statistics.median(latencies) * 1000:>9.1f} {max(latencies) * 1000:>9.1f} {wall:>8.2f}")
+    await close_search_client()
+
+if __name__ == "__main__":
+    stub = create_naver_stub(latency_ms=150)
+    server = run_in_thread(stub, PORT)
+    try:
+        asyncio.run(run())
+        print(f"스탠드인 최대 동시 처리: {stub.state.stats['peak_in_flight']}")
+    finally:
+        server.should_exit = True
@@ -0,0 +1,60 @@
+"""
+SSE 청크 인코딩 마이크로 벤치마크
+
+기존 두 경로(dict + json.dumps, pydantic model_dump_json)와 ChunkEncoder 를 비교하고
+모든 샘플에 대해 출력 바이트가 동일한지 먼저 확인한다.
+
+    cd backend && python -m benchmarks.bench_sse_encoder
+"""
+import json
+import timeit
+from agents.models.schemas import ChatCompletionChunk, Choice, Delta
+from agents.services.sse import ChunkEncoder
+
+COMPLETION_ID = "chatcmpl-2f1c9b0e-7a53-4c55-9d1e-0d6f3f6b1a77"
+CREATED = 1717000000
+MODEL = "Searching"
+SAMPLES = ["안녕", "하세요", " the", "\n\n", "\"quoted\"", "back\\slash", "탭\t", "😀", "|---|---|", " ", "\x01"]
+
+def dict_path(text):
+    chunk_data = {
+        "id": COMPLETION_ID,
+        "object": "chat.completion.chunk",
+        "created": CREATED,
+        "model": MODEL,
+        "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]
+    }
+    return f"data: {json.dumps(chunk_data, ensure_ascii=False)}\n\n".encode()
+
+def pydantic_path(text):
+    chunk = ChatCompletionChunk(
+        id=COMPLETION_ID,
+        object="chat.completion.chunk",
+        created=CREATED,
+        model=MODEL,
+        choices=[Choice(index=0, delta=Delta(content=text), finish_reason=None)]
+    )
+    return f"data: {chunk.model_dump_json()}\n\n".encode()
+
+def main(number=100000):
+    plain = ChunkEncoder(COMPLETION_ID, CREATED, MODEL)
+    compact = ChunkEncoder(COMPLETION_ID, CREATED, MODEL, compact=True)
+
+    for text in SAMPLES:
+        assert plain.content(text) == dict_path(text), text
+        assert compact.content(text) == pydantic_path(text), text
+    print("출력 바이트 동일성 확인 완료")
+
+    cases = [
+        ("dict + json.dumps", lambda: dict_path("안녕하세요")),
+        ("pydantic model_dump_json", lambda: pydantic_path("안녕하세요")),
+        ("ChunkEncoder (plain)", lambda: plain.content("안녕하세요")),
+        ("ChunkEncoder (compact)", lambda: compact.content("안녕하세요")),
+    ]
+    print(f"{'path':<28} {'ns/chunk':>10}")
+    for name, fn in cases:
+        seconds = min(timeit.repeat(fn, number=number, repeat=3))
+        print(f"{name:<28} {seconds / number * 1e9:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+/ws 텔레메트리 인코딩 벤치마크 (json / delta / binary)
+
+10 Hz 로 방송되는 합성 비행 텔레메트리를 두 시나리오로 만든다.
+  cruise : attitude 매 프레임, gps/velocity 5 Hz, battery 1 Hz 로 변화
+  ground : 지상 대기 (attitude 만 1 Hz 로 미세 변화)
+구독자 한 명당 초당 전송 바이트와, 구독자 SUBSCRIBERS 명일 때 프레임당 인코딩 비용을
+기존 방식(구독자마다 send_json -> json.dumps)과 프레임 캐시 방식으로 비교한다.
+
+    cd backend && python -m benchmarks.bench_telemetry_codec
+"""
+import json
+import random
+import time
+
+from telemetry_codec import ENCODINGS, FrameEncoder, TelemetryFrame, apply_delta, unpack_binary
+
+RATE_HZ = 10
+DURATION_S = 60
+SUBSCRIBERS = 200
+
+def synthetic_flight(scenario: str, seed: int = 7):
+    rng = random.Random(seed)
+    data = {
+        "gps": {"lat": 37.5665123, "lon": 126.9780456, "alt": 52.31},
+        "battery": {"remaining": 96, "voltage": 12.61},
+        "attitude": {"roll": 0.0123456789, "pitch": -0.0345678912, "yaw": 1.5712345678},
+        "velocity": {"speed": 0.0, "heading": 92},
+    }
+    frames = []
+    for i in range(RATE_HZ * DURATION_S):
+        data = {sensor: dict(values) for sensor, values in data.items()}
+        if scenario == "cruise":
+            data["attitude"] = {axis: value + rng.uniform(-0.01, 0.01) for axis, value in data["attitude"].items()}
+            if i % 2 == 0:
+                data["gps"]["lat"] += rng.uniform(0, 2e-6)
+                data["gps"]["lon"] += rng.uniform(0, 2e-6)
+                data["gps"]["alt"] = round(data["gps"]["alt"] + rng.uniform(-0.05, 0.05), 3)
+                data["velocity"] = {"speed": round(rng.uniform(4, 6), 2), "heading": 90 + rng.randint(-3, 3)}
+            if i % RATE_HZ == 0:
+                data["battery"]["voltage"] = round(data["battery"]["voltage"] - 0.002, 3)
+                data["battery"]["remaining"] = 96 - i // 300
+        elif i % RATE_HZ == 0:
+            data["attitude"] = {axis: value + rng.uniform(-0.001, 0.001) for axis, value in data["attitude"].items()}
+        frames.append(data)
+    return frames
+
+def bytes_per_second(frames, encoding):
+    encoder = FrameEncoder(encoding)
+    previous = None
+    state = {}
+    total = 0
+    for seq, data in enumerate(frames):
+        payload = encoder.encode(TelemetryFrame(seq, data, previous))
+        previous = data
+        total += len(payload)
+        # 디코딩 결과가 원본과 같은지 확인
+        if encoding == "delta":
+            state = apply_delta(state, json.loads(payload))
+            assert state == data
+        elif encoding == "binary":
+            assert unpack_binary(payload)["seq"] == seq
+    return total / DURATION_S
+
+def encode_cost_us(frames, encoding, cached: bool):
+    """프레임 하나를 SUBSCRIBERS 명에게 인코딩하는 데 드는 시간 (us)"""
+    encoders = [FrameEncoder(encoding) for _ in range(SUBSCRIBERS)]
+    previous = None
+    start = time.perf_counter()
+    for seq, data in enumerate(frames):
+        if cached:
+            frame = TelemetryFrame(seq, data, previous)
+            for encoder in encoders:
+                encoder.encode(frame)
+        else:
+            for _ in encoders:
+                json.dumps(data)
+        previous = data
+    return (time.perf_counter() - start) / len(frames) * 1e6
+
+def main():
+    print(f"{RATE_HZ} Hz x {DURATION_S}s, encode cost with {SUBSCRIBERS} subscribers")
+    print(f"{'scenario':<8} {'encoding':<16} {'bytes/s/sub':>12} {'vs json':>8} {'us/frame':>10} {'us/frame/sub':>13}")
+    for scenario in ("cruise", "ground"):
+        frames = synthetic_flight(scenario)
+        baseline = sum(len(json.dumps(data)) for data in frames) / DURATION_S
+        legacy_us = encode_cost_us(frames, "json", cached=False)
+        print(f"{scenario:<8} {'send_json':<16} {baseline:>12.0f} {1.0:>7.2f}x {legacy_us:>10.1f} {legacy_us / SUBSCRIBERS:>13.2f}")
+        for encoding in ENCODINGS:
+            rate = bytes_per_second(frames, encoding)
+            cost = encode_cost_us(frames, encoding, cached=True)
+            print(f"{scenario:<8} {encoding:<16} {rate:>12.0f} {rate / baseline:>7.2f}x {cost:>10.1f} {cost / SUBSCRIBERS:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+텔레메트리 팬아웃 벤치마크 (순차 send_json vs 구독자별 큐)
+
+가짜 웹소켓 CLIENTS 개 중 일부는 느리고(전송마다 SLOW_SEND_MS) 일부는 응답이 없다(영원히 대기).
+RATE_HZ 로 프레임을 방송하며 정상 클라이언트가 받은 프레임 수와 전달 지연을 비교한다.
+
+    cd backend && python -m benchmarks.bench_telemetry_fanout
+"""
+import asyncio
+import json
+import time
+
+from agents.services.metrics import Histogram
+from telemetry_fanout import TelemetryFanout
+
+CLIENTS = 300
+SLOW_CLIENTS = 5
+DEAD_CLIENTS = 2
+SLOW_SEND_MS = 150
+RATE_HZ = 20
+DURATION_S = 3.0
+
+FRAME = {
+    "gps": {"lat": 37.5665, "lon": 126.978, "alt": 52.3},
+    "battery": {"remaining": 81, "voltage": 12.48},
+    "attitude": {"roll": 0.012, "pitch": -0.034, "yaw": 1.571},
+    "velocity": {"speed": 4.2, "heading": 92},
+}
+
+def read_sensor(sensor):
+    """센서 값 + 샘플링 시각 (전달 지연 측정용)"""
+    return {**FRAME[sensor], "sent_at": time.perf_counter()}
+
+class FakeWebSocket:
+    def __init__(self, kind: str, latency: Histogram):
+        self.kind = kind
+        self.latency = latency
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def _deliver(self, text):
+        if self.kind == "dead":
+            await asyncio.Event().wait()
+        if self.kind == "slow":
+            await asyncio.sleep(SLOW_SEND_MS / 1000)
+        self.received += 1
+        if self.kind == "ok":
+            self.latency.observe((time.perf_counter() - json.loads(text)["gps"]["sent_at"]) * 1000)
+
+    async def send_text(self, text):
+        await self._deliver(text)
+
+    async def send_json(self, data):
+        await self._deliver(json.dumps(data))
+
+def make_clients(latency):
+    kinds = ["dead"] * DEAD_CLIENTS + ["slow"] * SLOW_CLIENTS + ["ok"] * (CLIENTS - DEAD_CLIENTS - SLOW_CLIENTS)
+    return [FakeWebSocket(kind, latency) for kind in kinds]
+
+async def sequential(clients):
+    """기존 ConnectionManager.broadcast 방식 (소켓마다 순서대로 await)"""
+    async def broadcast(data):
+        for client in clients:
+            await client.send_json(data)
+
+    deadline = time.perf_counter() + DURATION_S
+    while time.perf_counter() < deadline:
+        try:
+            await asyncio.wait_for(broadcast({sensor: read_sensor(sensor) for sensor in FRAME}), DURATION_S)
+        except asyncio.TimeoutError:
+            break
+        await asyncio.sleep(1 / RATE_HZ)
+
+async def fanout(clients, policy):
+    manager = TelemetryFanout(read_sensor, FRAME)
+    rates = {sensor: RATE_HZ for sensor in FRAME}
+    for client in clients:
+        await manager.connect(client, policy, rates=rates)
+    await asyncio.sleep(DURATION_S)
+    stats = manager.stats()
+    manager.close()
+    return stats
+
+def report(name, clients, latency, elapsed, stats=None):
+    ok = [client.received for client in clients if client.kind == "ok"]
+    expected = int(DURATION_S * RATE_HZ)
+    snap = latency.snapshot()
+    dropped = sum(s["dropped"] for s in stats["subscribers"]) if stats else 0
+    evicted = stats["evicted"] if stats else 0
+    print(f"{name:<22} {min(ok):>7} {sum(ok) / len(ok):>8.1f} {expected:>9} {snap.get('p50', 0):>8.1f} {snap.get('p99', 0):>8.1f} {dropped:>8} {evicted:>8} {elapsed:>7.2f}")
+
+async def main():
+    print(f"clients={CLIENTS} (slow={SLOW_CLIENTS}, dead={DEAD_CLIENTS}), {RATE_HZ} Hz for {DURATION_S}s")
+    print(f"{'mode':<22} {'ok_min':>7} {'ok_mean':>8} {'expected':>9} {'p50_ms':>8} {'p99_ms':>8} {'dropped':>8} {'evicted':>8} {'wall_s':>7}")
+
+    latency = Histogram()
+    clients = make_clients(latency)
+    start = time.perf_counter()
+    await sequential(clients)
+    report("sequential send_json", clients, latency, time.perf_counter() - start)
+
+    for policy in ("drop_oldest", "latest"):
+        latency = Histogram()
+        clients = make_clients(latency)
+        start = time.perf_counter()
+        stats = await fanout(clients, policy)
+        report(f"fanout {policy}", clients, latency, time.perf_counter() - start, stats)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+텔레메트리 녹화기 벤치마크 (파일 write vs 메모리 맵 링 버퍼)
+
+실제 MAVLink 프레임(ATTITUDE/GLOBAL_POSITION_INT/VFR_HUD/SYS_STATUS 혼합)을 MESSAGES 개 기록하며
+메시지당 기록 비용과 기록 중 늘어난 파이썬 힙(tracemalloc, 최대치 포함)을 비교한다.
+링은 일부러 작게 잡아 여러 바퀴 덮어쓰기가 일어나게 한다.
+링이 버퍼드 write 보다 느린 것은 예상된 결과이며, 링은 고정 크기와 비정상 종료 후에도 읽히는 레코드를 위해 쓴다.
+
+    cd backend && python -m benchmarks.bench_telemetry_recorder
+"""
+import os
+import struct
+import tempfile
+import time
+import tracemalloc
+
+from pymavlink import mavutil
+from telemetry_recorder import TelemetryRecorder, iter_records
+
+MESSAGES = 200_000
+RING_MB = 4
+
+def make_frames():
+    mav = mavutil.mavlink.MAVLink(None)
+    messages = [
+        mavutil.mavlink.MAVLink_attitude_message(1000, 0.01, -0.02, 1.57, 0.001, 0.002, 0.003),
+        mavutil.mavlink.MAVLink_global_position_int_message(1000, 375665123, 1269780456, 52310, 12000, 120, -40, 5, 9200),
+        mavutil.mavlink.MAVLink_vfr_hud_message(5.1, 4.9, 92, 48, 52.3, 0.2),
+        mavutil.mavlink.MAVLink_sys_status_message(0, 0, 0, 500, 12480, 1200, 81, 0, 0, 0, 0, 0, 0),
+    ]
+    for message in messages:
+        message.pack(mav)
+    return messages
+
+def file_write(path, messages):
+    """단순 방식: 레코드마다 bytes 를 만들어 버퍼드 파일에 write"""
+    header = struct.Struct("<dH")
+    with open(path, "wb") as f:
+        for i in range(MESSAGES):
+            frame = messages[i & 3].get_msgbuf()
+            f.write(header.pack(time.time(), len(frame)) + bytes(frame))
+
+def ring_write(path, messages):
+    recorder = TelemetryRecorder(path, RING_MB)
+    for i in range(MESSAGES):
+        recorder.record(messages[i & 3], time.time())
+    stats = recorder.stats()
+    recorder.close()
+    return stats
+
+def measure(name, fn, path, messages):
+    """시간은 tracemalloc 없이, 힙 증가는 별도 실행에서 측정"""
+    start = time.perf_counter()
+    result = fn(path, messages)
+    elapsed = time.perf_counter() - start
+    os.remove(path)
+
+    tracemalloc.start()
+    fn(path, messages)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<14} {elapsed / MESSAGES * 1e9:>10.0f} {MESSAGES / elapsed:>12,.0f} {current / 1024:>11.1f} {peak / 1024:>9.1f}")
+    return result
+
+def main():
+    messages = make_frames()
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{MESSAGES:,} messages, ring {RING_MB} MB")
+        print(f"{'mode':<14} {'ns/msg':>10} {'msgs/s':>12} {'heap_KB':>11} {'peak_KB':>9}")
+        measure("file write", file_write, os.path.join(directory, "plain.bin"), messages)
+        ring_path = os.path.join(directory, "telemetry.ring")
+        stats = measure("mmap ring", ring_write, ring_path, messages)
+
+        # 덮어쓰기 후에도 레코드 경계가 유지되는지 확인 (가장 최근 레코드들이 순서대로 남아 있어야 함)
+        decoder = mavutil.mavlink.MAVLink(None)
+        kept = 0
+        last = 0.0
+        for timestamp, frame in iter_records(ring_path):
+            assert timestamp >= last
+            decoder.decode(bytearray(frame))
+            last = timestamp
+            kept += 1
+        print(f"ring kept {kept:,} of {stats['records']:,} records ({stats['used_bytes'] / 1024 / 1024:.2f} MB used)")
+
+if __name__ == "__main__":
+    main()
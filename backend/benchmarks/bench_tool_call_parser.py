@@ -0,0 +1,65 @@
+"""
+스트리밍 tool_calls 인자 파싱 벤치마크
+
+기존 방식(델타마다 누적 버퍼 전체에서 '{' / '}' 개수를 다시 세기)과
+증분 상태 기계(ToolCallParser)를 인자 크기별로 비교하고 결과가 같은지 확인한다.
+인자 문자열 안에 괄호가 들어 있으면 기존 방식은 잘못된 시점에 호출을 완료로 판단할 수 있다.
+
+    cd backend && python -m benchmarks.bench_tool_call_parser
+"""
+import json
+import time
+from types import SimpleNamespace
+from agents.services.tool_call_parser import ToolCallParser
+
+SIZES_KB = (1, 10, 50, 100)
+DELTA_CHARS = 8  # 업스트림이 보내는 인자 조각 길이 (토큰 2~3개 수준)
+
+def make_arguments(size_kb: int) -> str:
+    filler = "검색 결과 {여는 괄호만 와 \"따옴표\" 포함 텍스트 "
+    text = (filler * (size_kb * 1024 // len(filler.encode()) + 1))
+    return json.dumps({"query": "날씨", "context": text}, ensure_ascii=False)
+
+def make_deltas(arguments: str, name: str = "search_internet"):
+    deltas = [[SimpleNamespace(index=0, id="call_0", function=SimpleNamespace(name=name, arguments=""))]]
+    for offset in range(0, len(arguments), DELTA_CHARS):
+        piece = arguments[offset:offset + DELTA_CHARS]
+        deltas.append([SimpleNamespace(index=0, id=None, function=SimpleNamespace(name=None, arguments=piece))])
+    return deltas
+
+def legacy_parse(deltas):
+    json_buffer = ""
+    function_args = ""
+    for tool_calls in deltas:
+        tool_call = tool_calls[0]
+        if tool_call.function.arguments:
+            json_buffer += tool_call.function.arguments
+            if json_buffer.count('{') == json_buffer.count('}') and json_buffer.count('{') > 0:
+                function_args = json_buffer
+                json_buffer = ""
+    return function_args
+
+def incremental_parse(deltas):
+    parser = ToolCallParser()
+    for tool_calls in deltas:
+        for call in parser.feed(tool_calls):
+            return call.arguments
+    return ""
+
+def measure(fn, deltas, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(deltas)
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+def main(rounds=3):
+    print(f"{'args KB':>8} {'deltas':>7} {'legacy ms':>10} {'parser ms':>10} {'legacy ok':>10} {'parser ok':>10}")
+    for size_kb in SIZES_KB:
+        arguments = make_arguments(size_kb)
+        deltas = make_deltas(arguments)
+        legacy_ms, legacy_result = measure(legacy_parse, deltas, rounds)
+        parser_ms, parser_result = measure(incremental_parse, deltas, rounds)
+        print(f"{size_kb:>8} {len(deltas):>7} {legacy_ms:>10.2f} {parser_ms:>10.2f} {str(legacy_result == arguments):>10} {str(parser_result == arguments):>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+네이버 통합검색 결과 페이지 픽스처
+
+benchmarks/fixtures/naver/*.html 에 저장된 실제 페이지가 있으면 그것을 사용하고,
+없으면 실제 페이지 구조(대형 인라인 script/style, 숨김 노드, 깊게 중첩된 #main_pack, data-id 미끼)를
+흉내 낸 합성 페이지를 결정적으로 생성한다.
+"""
+import os
+import random
+from pathlib import Path
+
+FIXTURE_DIR = Path(os.getenv("NAVER_FIXTURE_DIR", Path(__file__).parent / "fixtures" / "naver"))
+
+_WORDS = ["서울", "날씨", "기온", "미세먼지", "오늘", "내일", "강수확률", "습도", "바람", "드론", "비행", "규제",
+          "뉴스", "속보", "가격", "주가", "발표", "출시", "리뷰", "블로그", "카페", "지식iN", "이미지", "동영상",
+          "the", "drone", "flight", "update", "2025", "°C", "%", "km/h"]
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words))
+
+def make_naver_page(seed: int = 0, sections: int = 40, script_kb: int = 400) -> bytes:
+    """합성 검색 결과 페이지 (기본 약 1MB)"""
+    rng = random.Random(seed)
+    script_blob = "var a=" + ",".join(str(rng.random()) for _ in range(script_kb * 50)) + ";"
+    parts = [
+        "<!doctype html><html lang='ko'><head><meta charset='utf-8'><title>검색</title>",
+        f"<style>{'.x{color:red;margin:0 auto;padding:0}' * (script_kb * 10)}</style>",
+        f"<script>{script_blob}</script></head><body>",
+        "<div id='header'><ul class='gnb'>" + "".join(f"<li><a href='#'>{_sentence(rng, 2)}</a></li>" for _ in range(30)) + "</ul></div>",
+        # id 가 아닌 data-id 로 같은 값을 쓰는 미끼 요소 (실제 #main_pack 보다 앞)
+        "<div class='lnb' data-id='main_pack'><a href='#'>통합</a><a href='#'>이미지</a></div>",
+        "<div id='container'><div id='content'><div id='main_pack' class='main_pack'>",
+    ]
+    for i in range(sections):
+        parts.append(f"<section class='sc_new sp_{i}'><div class='api_subject_bx'><h2 class='api_title'>{_sentence(rng, 3)}</h2>")
+        parts.append(f"<script>window.__data{i}={{items:[{','.join(str(rng.randint(0, 9999)) for _ in range(200))}]}}</script>")
+        parts.append("<style>.sp_%d .item{display:block}</style>" % i)
+        parts.append("<ul class='lst_total'>")
+        for _ in range(rng.randint(5, 12)):
+            parts.append(
+                "<li class='bx'><div class='total_wrap'><div class='total_area'>"
+                f"<a class='link_tit' href='#'>{_sentence(rng, 6)}</a>"
+                f"<div class='total_dsc_wrap'><div class='dsc_txt'>{_sentence(rng, 25)}</div></div>"
+                f"<span class='sub_txt' style='display:none'>{_sentence(rng, 8)}</span>"
+                f"<div hidden>{_sentence(rng, 8)}</div>"
+                "<span class='sub_time'>3시간 전</span>"
+                "</div></div></li>\n\t  "
+            )
+        parts.append("</ul></div></section>")
+    parts.append("</div><div id='sub_pack'>" + "".join(f"<p>{_sentence(rng, 20)}</p>" for _ in range(200)) + "</div>")
+    parts.append(f"</div></div><div id='footer'>{_sentence(rng, 40)}</div><script>{script_blob[:20000]}</script></body></html>")
+    return "".join(parts).encode("utf-8")
+
+def load_pages(count: int = 8):
+    """저장된 페이지 목록 (없으면 합성 페이지)"""
+    if FIXTURE_DIR.is_dir():
+        saved = sorted(FIXTURE_DIR.glob("*.html"))
+        if saved:
+            return [path.read_bytes() for path in saved]
+    return [make_naver_page(seed) for seed in range(count)]
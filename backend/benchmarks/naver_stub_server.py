@@ -0,0 +1,45 @@
+"""
+네이버 검색 로컬 스탠드인 서버
+
+/search.naver 요청에 저장된(또는 합성) 검색 결과 페이지를 지연을 흉내 내어 응답한다.
+SEARCH_BASE_URL=http://127.0.0.1:9200 으로 실행하면 백엔드가 이 서버를 사용한다.
+
+    python -m benchmarks.naver_stub_server --port 9200 --latency-ms 150
+"""
+import argparse
+import asyncio
+import zlib
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from benchmarks.naver_fixtures import load_pages
+
+def create_naver_stub(latency_ms: float = 150, fail_every: int = 0):
+    """검색어 해시로 페이지를 골라 응답하는 스탠드인 앱 (fail_every>0 이면 N번째마다 503)"""
+    app = FastAPI()
+    pages = load_pages()
+    state = {"requests": 0, "in_flight": 0, "peak_in_flight": 0}
+    app.state.stats = state
+
+    @app.get("/search.naver")
+    async def search(request: Request, query: str = ""):
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["peak_in_flight"] = max(state["peak_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(latency_ms / 1000)
+            if fail_every and state["requests"] % fail_every == 0:
+                return Response(status_code=503)
+            page = pages[zlib.crc32(query.encode()) % len(pages)]
+            return Response(content=page, media_type="text/html; charset=utf-8")
+        finally:
+            state["in_flight"] -= 1
+
+    return app
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(create_naver_stub(args.latency_ms, args.fail_every), host="127.0.0.1", port=args.port)
@@ -0,0 +1,145 @@
+"""
+OpenAI 호환 스텁 업스트림 서버 (오프라인 벤치마크용)
+
+/v1/chat/completions 요청에 대해 설정한 지연 후 SSE 토큰 스트림을 돌려준다.
+
+    python -m benchmarks.stub_upstream --port 9100 --first-token-ms 300 --token-ms 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import uuid
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse, JSONResponse
+
+class PrefixCacheSim:
+    """업스트림 프롬프트 prefix 캐시 흉내 (이전에 본 가장 긴 공통 앞부분을 cached_tokens 로 보고)
+
+    메시지 직렬화 바이트를 블록 단위 해시로 기록하고, 연속으로 일치하는 블록 수만큼 캐시 적중으로 센다.
+    """
+
+    def __init__(self, block_bytes: int = 256, bytes_per_token: int = 3):
+        self.block_bytes = block_bytes
+        self.bytes_per_token = bytes_per_token
+        self._seen = set()
+
+    def lookup(self, messages) -> tuple:
+        """(prompt_tokens, cached_tokens)"""
+        data = json.dumps(messages, ensure_ascii=False, separators=(",", ":")).encode()
+        cached_blocks = 0
+        hit = True
+        for end in range(self.block_bytes, len(data) + 1, self.block_bytes):
+            key = hash(data[:end])
+            if hit and key in self._seen:
+                cached_blocks += 1
+            else:
+                hit = False
+                self._seen.add(key)
+        prompt_tokens = max(len(data) // self.bytes_per_token, 1)
+        cached_tokens = cached_blocks * self.block_bytes // self.bytes_per_token
+        return prompt_tokens, min(cached_tokens, prompt_tokens)
+
+def create_stub_app(first_token_ms: float = 300, token_ms: float = 20, tokens: int = 50, text: str = "안녕", tail_ms: float = 0, tail_ratio: float = 0.0, error_ratio: float = 0.0, max_concurrent: int = 0):
+    """지연/토큰 수를 지정한 스텁 앱 생성
+
+    tail_ratio 비율의 요청은 첫 토큰이 tail_ms 만큼 늦고, error_ratio 비율의 요청은 503 으로 실패한다.
+    max_concurrent 를 넘는 동시 요청은 제공자처럼 429 로 거절한다. (app.state.config 값을 바꾸면 실행 중에도 반영)
+    """
+    app = FastAPI()
+    app.state.config = {"first_token_ms": first_token_ms, "tail_ms": tail_ms, "tail_ratio": tail_ratio, "error_ratio": error_ratio, "max_concurrent": max_concurrent}
+    app.state.active = 0
+    prefix_cache = PrefixCacheSim()
+
+    def first_token_delay() -> float:
+        config = app.state.config
+        delay = config["tail_ms"] if random.random() < config["tail_ratio"] else config["first_token_ms"]
+        return delay / 1000
+
+    @app.post("/v1/chat/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4()}"
+        created = int(time.time())
+        model = body.get("model", "stub")
+        if random.random() < app.state.config["error_ratio"]:
+            return JSONResponse({"error": {"message": "stub upstream unavailable"}}, status_code=503)
+        if app.state.config["max_concurrent"] and app.state.active >= app.state.config["max_concurrent"]:
+            return JSONResponse({"error": {"message": "rate limited"}}, status_code=429)
+        prompt_tokens, cached_tokens = prefix_cache.lookup(body.get("messages", []))
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": tokens,
+            "total_tokens": prompt_tokens + tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_token_delay())
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text * tokens}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+
+        async def events():
+            try:
+                async for event in token_events():
+                    yield event
+            finally:
+                app.state.active -= 1
+
+        async def token_events():
+            await asyncio.sleep(first_token_delay())
+            for i in range(tokens):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+                }
+                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                await asyncio.sleep(token_ms / 1000)
+            final = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                usage_chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(usage_chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        # 동시 스트림 수는 응답을 돌려주기 전에 세어야 연속 요청이 한도를 넘지 않음
+        app.state.active += 1
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def run_in_thread(app, port: int):
+    """스텁 서버를 백그라운드 스레드에서 실행하고 서버 객체 반환"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+    uvicorn.run(create_stub_app(args.first_token_ms, args.token_ms, args.tokens), host="127.0.0.1", port=args.port)
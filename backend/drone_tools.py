@@ -1,8 +1,12 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 from pymavlink import mavutil
-import asyncio
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional
 import json
+from mavlink_reader import SENSOR_MESSAGES, MavlinkReader, MessageIntervalController, read_sensor, telemetry_store
+from telemetry_codec import ENCODINGS, TELEMETRY_ENCODING
+from telemetry_fanout import FANOUT_POLICY, FANOUT_QUEUE_SIZE, POLICIES, TelemetryFanout, parse_subscription
+from telemetry_recorder import TELEMETRY_RECORD, TELEMETRY_RECORD_PATH, ReplaySource, TelemetryRecorder, recording_path
 
 app = FastAPI()
 
@@ -18,60 +22,23 @@ def connect_to_pixhawk():
         return None
 
 conn = connect_to_pixhawk()
+recorder = TelemetryRecorder() if conn and TELEMETRY_RECORD else None
+reader = MavlinkReader(conn, telemetry_store, recorder=recorder) if conn else None
+replay: Optional[ReplaySource] = None  # 실기체 없이 녹화본을 저장소로 재생 중인 소스
+rate_controller = MessageIntervalController(conn) if conn else None
 
-# 연결 관리 클래스
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        for connection in self.active_connections:
-            await connection.send_json(data)
-
-manager = ConnectionManager()
+def telemetry_available() -> bool:
+    """저장소를 채우는 소스(실기체 또는 재생)가 있는지"""
+    return bool(conn) or bool(replay and replay.running)
 
 # Tool Calling을 위한 함수 정의
 def get_sensor_data(sensor_type: str) -> Dict[str, Any]:
-    """사용자가 요청한 센서 데이터 반환"""
-    if not conn:
+    """사용자가 요청한 센서 데이터 반환 (리더 스레드가 채운 최신값 스냅샷, 논블로킹)"""
+    if not telemetry_available():
         return {"error": "Pixhawk not connected"}
     
     try:
-        if sensor_type == "gps":
-            msg = conn.recv_match(type='GLOBAL_POSITION_INT', blocking=True)
-            return {
-                "lat": msg.lat / 1e7,
-                "lon": msg.lon / 1e7,
-                "alt": msg.alt / 1000  # m 단위
-            }
-        elif sensor_type == "battery":
-            msg = conn.recv_match(type='SYS_STATUS', blocking=True)
-            return {
-                "remaining": msg.battery_remaining,
-                "voltage": msg.voltage_battery / 1000  # V 단위
-            }
-        elif sensor_type == "attitude":
-            msg = conn.recv_match(type='ATTITUDE', blocking=True)
-            return {
-                "roll": msg.roll,
-                "pitch": msg.pitch,
-                "yaw": msg.yaw
-            }
-        elif sensor_type == "velocity":
-            msg = conn.recv_match(type='VFR_HUD', blocking=True)
-            return {
-                "speed": msg.ground_speed,
-                "heading": msg.heading
-            }
-        else:
-            return {"error": "Invalid sensor type"}
+        return read_sensor(telemetry_store, sensor_type)
     except Exception as e:
         return {"error": str(e)}
 
@@ -122,41 +89,116 @@ def drone_control(action: str, value: float = None) -> Dict[str, Any]:
         return {"error": str(e)}
 
 # 실시간 데이터 브로드캐스팅
-async def telemetry_task():
-    while conn:
-        try:
-            data = {
-                "gps": get_sensor_data("gps"),
-                "battery": get_sensor_data("battery"),
-                "attitude": get_sensor_data("attitude"),
-                "velocity": get_sensor_data("velocity")
-            }
-            await manager.broadcast(data)
-        except Exception as e:
-            print(f"Error in telemetry: {e}")
-        await asyncio.sleep(0.1)
+# 구독별 스트림이 센서마다 요청 주기로 저장소를 샘플링하고, 구독 수요에 맞춰 기체 메시지 주기를 조정
+manager = TelemetryFanout(
+    get_sensor_data,
+    SENSOR_MESSAGES,
+    on_demand=rate_controller.apply if rate_controller else None,
+    available=telemetry_available,
+)
 
 # FastAPI Startup Event
 @app.on_event("startup")
 async def startup_event():
     if conn:
-        asyncio.create_task(telemetry_task())
+        reader.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    manager.close()
+    if replay:
+        replay.stop()
+    if reader:
+        reader.stop()
+    if recorder:
+        recorder.close()
 
 # 웹소켓을 통한 실시간 데이터 전송
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    policy: str = Query(FANOUT_POLICY),
+    queue: int = Query(FANOUT_QUEUE_SIZE, ge=1, le=1024),
+    encoding: str = Query(TELEMETRY_ENCODING),
+    sensors: str = Query(None, description="센서별 Hz (예: attitude:50,gps:5), 생략 시 전체 센서 기본 주기"),
+):
+    if policy not in POLICIES:
+        await websocket.close(code=1008, reason=f"policy must be one of {POLICIES}")
+        return
+    if encoding not in ENCODINGS:
+        await websocket.close(code=1008, reason=f"encoding must be one of {ENCODINGS}")
+        return
+    try:
+        rates = parse_subscription(sensors, SENSOR_MESSAGES)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    subscriber = await manager.connect(websocket, policy, queue, encoding, rates)
     try:
         while True:
-            await websocket.receive_text()  # Keep connection alive
+            # {"subscribe": {"attitude": 50, "gps": 5}} 로 구독 변경, 그 외 메시지는 keep-alive
+            message = await websocket.receive_text()
+            if not message.startswith("{"):
+                continue
+            try:
+                request = json.loads(message)
+                if isinstance(request, dict) and "subscribe" in request:
+                    manager.subscribe(subscriber, parse_subscription(request["subscribe"], SENSOR_MESSAGES))
+            except (ValueError, AttributeError) as e:
+                print(f"⚠️ 잘못된 구독 요청: {e}")
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        manager.disconnect(subscriber)
 
 # Tool Calling을 위한 API 엔드포인트
 @app.post("/get_sensor_data")
 async def api_get_sensor_data(sensor_type: str):
     return get_sensor_data(sensor_type)
 
+@app.get("/telemetry/stats")
+async def api_telemetry_stats():
+    """메시지 타입별 수신 수와 마지막 수신 후 경과 시간"""
+    return {"received": telemetry_store.received, "messages": telemetry_store.stats()}
+
+@app.get("/telemetry/clients")
+async def api_telemetry_clients():
+    """구독자별 큐 길이, 지연, 드롭 카운터"""
+    return manager.stats()
+
+@app.get("/telemetry/recorder")
+async def api_telemetry_recorder():
+    """녹화 링 파일 사용량과 재생 상태"""
+    return {
+        "recorder": recorder.stats() if recorder else None,
+        "replay": replay.stats() if replay else None,
+    }
+
+@app.post("/telemetry/replay")
+async def api_start_replay(name: str = os.path.basename(TELEMETRY_RECORD_PATH), speed: float = 1.0, loop: bool = False):
+    """녹화본을 저장소로 재생 (name: 녹화 디렉터리 안의 파일 이름, speed=1 실시간, >1 가속, 0 최대 속도)"""
+    global replay
+    if conn:
+        return {"error": "Pixhawk connected; replay is only available offline"}
+    try:
+        source = ReplaySource(recording_path(name), telemetry_store, speed, loop)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="name must be a recording file name")
+    except FileNotFoundError:
+        return {"error": f"Recording not found: {name}"}
+    if replay:
+        replay.stop()
+    replay = source
+    replay.start()
+    return replay.stats()
+
+@app.delete("/telemetry/replay")
+async def api_stop_replay():
+    if replay:
+        replay.stop()
+        return replay.stats()
+    return {"error": "No replay"}
+
 @app.post("/drone_control")
 async def api_drone_control(action: str, value: float = None):
     return drone_control(action, value)
\ No newline at end of file
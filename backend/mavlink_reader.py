@@ -0,0 +1,198 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+from pymavlink import mavutil
+
+# MAVLink 수신 전용 백그라운드 리더 + 메시지 타입별 최신값 저장소
+# 리더 스레드 하나가 링크를 계속 비우며 모든 메시지를 타입별로 분배하고,
+# 텔레메트리 방송/도구 호출은 저장소의 스냅샷만 읽는다. (이벤트 루프에서 블로킹 I/O 없음)
+
+MAVLINK_READ_TIMEOUT = float(os.getenv("MAVLINK_READ_TIMEOUT", "1.0"))
+TELEMETRY_STALE_SECONDS = float(os.getenv("TELEMETRY_STALE_SECONDS", "3.0"))
+MAVLINK_DISABLE_UNUSED = os.getenv("MAVLINK_DISABLE_UNUSED", "false").lower() == "true"  # 구독자가 없는 메시지는 송신 중지 요청
+
+class Sample(NamedTuple):
+    message: object      # pymavlink 메시지 객체 (필드를 속성으로 그대로 접근)
+    timestamp: float     # 수신 시각 (time.time())
+    count: int           # 해당 타입 누적 수신 수
+
+class TelemetryStore:
+    """메시지 타입별 최신 메시지와 수신 시각 (스레드 안전, 읽기는 잠금 없이 dict 조회)"""
+
+    def __init__(self):
+        self._latest: Dict[str, Sample] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, Sample], None]] = []
+        self.version = 0
+        self.received = 0
+
+    def update(self, msg_type: str, message, timestamp: float = None):
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            previous = self._latest.get(msg_type)
+            sample = Sample(message, timestamp, previous.count + 1 if previous else 1)
+            self._latest[msg_type] = sample
+            self.version += 1
+            self.received += 1
+        for listener in self._listeners:
+            listener(msg_type, sample)
+
+    def get(self, msg_type: str, max_age: float = None) -> Optional[Sample]:
+        """최신 샘플 (없거나 max_age 초보다 오래됐으면 None)"""
+        sample = self._latest.get(msg_type)
+        if sample is None:
+            return None
+        if max_age is not None and time.time() - sample.timestamp > max_age:
+            return None
+        return sample
+
+    def snapshot(self) -> Dict[str, Sample]:
+        with self._lock:
+            return dict(self._latest)
+
+    def add_listener(self, listener: Callable[[str, Sample], None]):
+        """update 마다 호출할 콜백 등록 (리더 스레드에서 호출되므로 가볍게 유지)"""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, Sample], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def stats(self) -> Dict[str, dict]:
+        now = time.time()
+        return {
+            msg_type: {"count": sample.count, "age_ms": round((now - sample.timestamp) * 1000, 1)}
+            for msg_type, sample in self.snapshot().items()
+        }
+
+class MavlinkReader:
+    """링크를 계속 읽어 TelemetryStore 로 분배하는 데몬 스레드"""
+
+    def __init__(self, conn, store: TelemetryStore, read_timeout: float = MAVLINK_READ_TIMEOUT, recorder=None):
+        self.conn = conn
+        self.store = store
+        self.recorder = recorder  # 수신 메시지를 녹화할 TelemetryRecorder (선택)
+        self.read_timeout = read_timeout
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="mavlink-reader", daemon=True)
+        self._thread.start()
+        print("📡 MAVLink 리더 시작")
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                msg = self.conn.recv_match(blocking=True, timeout=self.read_timeout)
+            except Exception as e:
+                self.errors += 1
+                print(f"❌ MAVLink 수신 오류: {e}")
+                self._stop.wait(self.read_timeout)
+                continue
+            if msg is None:
+                continue
+            msg_type = msg.get_type()
+            if msg_type == "BAD_DATA":
+                continue
+            timestamp = time.time()
+            self.store.update(msg_type, msg, timestamp)
+            if self.recorder is not None:
+                self.recorder.record(msg, timestamp)
+
+# 센서 이름 -> (메시지 타입, 변환 함수)
+SENSOR_MESSAGES = {
+    "gps": ("GLOBAL_POSITION_INT", lambda msg: {
+        "lat": msg.lat / 1e7,
+        "lon": msg.lon / 1e7,
+        "alt": msg.alt / 1000  # m 단위
+    }),
+    "battery": ("SYS_STATUS", lambda msg: {
+        "remaining": msg.battery_remaining,
+        "voltage": msg.voltage_battery / 1000  # V 단위
+    }),
+    "attitude": ("ATTITUDE", lambda msg: {
+        "roll": msg.roll,
+        "pitch": msg.pitch,
+        "yaw": msg.yaw
+    }),
+    "velocity": ("VFR_HUD", lambda msg: {
+        "speed": msg.groundspeed,
+        "heading": msg.heading
+    }),
+}
+
+def read_sensor(store: TelemetryStore, sensor_type: str, max_age: float = TELEMETRY_STALE_SECONDS) -> Dict:
+    """저장소의 최신 메시지로 센서 값 구성 (논블로킹)"""
+    entry = SENSOR_MESSAGES.get(sensor_type)
+    if entry is None:
+        return {"error": "Invalid sensor type"}
+    msg_type, convert = entry
+    sample = store.get(msg_type)
+    if sample is None:
+        return {"error": f"No {msg_type} received yet"}
+    if max_age is not None and time.time() - sample.timestamp > max_age:
+        return {"error": f"{msg_type} is stale", "age_ms": round((time.time() - sample.timestamp) * 1000)}
+    return convert(sample.message)
+
+class MessageIntervalController:
+    """구독 수요(센서별 Hz)에 맞춰 기체에 MAV_CMD_SET_MESSAGE_INTERVAL 요청"""
+
+    def __init__(self, conn, disable_unused: bool = MAVLINK_DISABLE_UNUSED):
+        self.conn = conn
+        self.disable_unused = disable_unused
+        self.requested: Dict[str, float] = {}  # 메시지 타입 -> 요청한 Hz (0 = 기체 기본값, -1 = 끔)
+
+    def apply(self, demand: Dict[str, float]):
+        """센서별 최대 요청 Hz 를 메시지 타입별 주기로 바꿔 변경된 것만 전송"""
+        rates = {}
+        for sensor, rate in demand.items():
+            msg_type = SENSOR_MESSAGES[sensor][0]
+            rates[msg_type] = max(rates.get(msg_type, 0), rate)
+
+        for msg_type, _ in SENSOR_MESSAGES.values():
+            rate = rates.get(msg_type)
+            if rate is None:
+                # 요청한 적 없는 메시지는 건드리지 않고, 요청했던 메시지만 기본값(또는 끔)으로 되돌림
+                if msg_type not in self.requested:
+                    continue
+                rate = -1 if self.disable_unused else 0
+            if self.requested.get(msg_type) != rate:
+                self.set_interval(msg_type, rate)
+
+    def set_interval(self, msg_type: str, rate: float):
+        interval_us = int(1e6 / rate) if rate > 0 else int(rate)
+        message_id = getattr(mavutil.mavlink, f"MAVLINK_MSG_ID_{msg_type}")
+        try:
+            self.conn.mav.command_long_send(
+                self.conn.target_system, self.conn.target_component,
+                mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL, 0,
+                message_id, interval_us, 0, 0, 0, 0, 0
+            )
+        except Exception as e:
+            print(f"❌ {msg_type} 전송 주기 요청 실패: {e}")
+            return
+        if rate == 0:
+            self.requested.pop(msg_type, None)
+        else:
+            self.requested[msg_type] = rate
+        print(f"📶 {msg_type} 전송 주기 요청: {'기본값' if rate == 0 else '끔' if rate < 0 else f'{rate:g} Hz'}")
+
+# 전역 저장소
+telemetry_store = TelemetryStore()
@@ -0,0 +1,172 @@
+import json
+import os
+import struct
+import time
+from typing import Any, Dict, Optional
+
+# /ws 텔레메트리 프레임 인코딩 (연결마다 ?encoding= 으로 선택)
+#   json   : 기존 형식 그대로 {"gps": {...}, "battery": {...}, ...} (매 프레임 구독한 센서 전체,
+#            오래된 값은 read_sensor 가 {"error": "... is stale", "age_ms": ...} 로 표시)
+#   delta  : 변경된 필드만 {"t": "d", "seq": n, "d": {...}} + 주기적 키프레임 {"t": "k", "seq": n, "d": 전체}
+#   binary : 고정 레이아웃 little-endian struct (BINARY_LAYOUT 참고)
+# 같은 프레임의 인코딩 결과는 프레임에 캐시되어 구독자 수와 무관하게 한 번만 직렬화된다.
+
+ENCODINGS = ("json", "delta", "binary")
+TELEMETRY_ENCODING = os.getenv("TELEMETRY_ENCODING", "json")
+DELTA_KEYFRAME_INTERVAL = int(os.getenv("DELTA_KEYFRAME_INTERVAL", "50"))  # 델타 프레임 N 개마다 키프레임
+
+_dumps = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+# 바이너리 프레임 레이아웃 (총 50 바이트)
+#   header : magic 'T', version, seq u32, timestamp f64, present 비트마스크 u8
+#   gps    : lat/lon int32 (deg * 1e7), alt f32 (m)
+#   battery: remaining i8 (%), voltage f32 (V)
+#   attitude: roll/pitch/yaw f32 (rad)
+#   velocity: speed f32 (m/s), heading i16 (deg)
+# 값이 없거나 오류인 센서는 present 비트가 꺼지고 필드는 0 으로 채운다.
+BINARY_MAGIC = ord("T")
+BINARY_VERSION = 1
+BINARY_LAYOUT = struct.Struct("<BBIdBiifbfffffh")
+_SENSOR_BITS = {"gps": 1, "battery": 2, "attitude": 4, "velocity": 8}
+
+def _valid(values) -> bool:
+    return isinstance(values, dict) and "error" not in values
+
+def diff_frames(previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> Dict[str, Any]:
+    """센서별 변경 필드 (필드 구성이 바뀐 센서는 객체 전체를 'r' 로 교체)"""
+    merge = {}
+    replace = {}
+    previous = previous or {}
+    for sensor, values in current.items():
+        before = previous.get(sensor)
+        if before == values:
+            continue
+        if not isinstance(values, dict) or not isinstance(before, dict) or before.keys() != values.keys():
+            replace[sensor] = values
+            continue
+        changed = {field: value for field, value in values.items() if before.get(field) != value}
+        if changed:
+            merge[sensor] = changed
+    delta = {}
+    if merge:
+        delta["d"] = merge
+    if replace:
+        delta["r"] = replace
+    return delta
+
+def _pack_binary(seq: int, timestamp: float, data: Dict[str, Any]) -> bytes:
+    present = 0
+    gps = data.get("gps")
+    if _valid(gps):
+        present |= _SENSOR_BITS["gps"]
+        lat, lon, alt = round(gps["lat"] * 1e7), round(gps["lon"] * 1e7), gps["alt"]
+    else:
+        lat = lon = 0
+        alt = 0.0
+    battery = data.get("battery")
+    if _valid(battery):
+        present |= _SENSOR_BITS["battery"]
+        remaining, voltage = battery["remaining"], battery["voltage"]
+    else:
+        remaining, voltage = -1, 0.0
+    attitude = data.get("attitude")
+    if _valid(attitude):
+        present |= _SENSOR_BITS["attitude"]
+        roll, pitch, yaw = attitude["roll"], attitude["pitch"], attitude["yaw"]
+    else:
+        roll = pitch = yaw = 0.0
+    velocity = data.get("velocity")
+    if _valid(velocity):
+        present |= _SENSOR_BITS["velocity"]
+        speed, heading = velocity["speed"], velocity["heading"]
+    else:
+        speed, heading = 0.0, 0
+    return BINARY_LAYOUT.pack(
+        BINARY_MAGIC, BINARY_VERSION, seq & 0xFFFFFFFF, timestamp, present,
+        lat, lon, alt, remaining, voltage, roll, pitch, yaw, speed, heading,
+    )
+
+def unpack_binary(payload: bytes) -> Dict[str, Any]:
+    """바이너리 프레임 디코딩 (클라이언트 구현 참고용/벤치마크 검증용)"""
+    (magic, version, seq, timestamp, present, lat, lon, alt, remaining, voltage,
+     roll, pitch, yaw, speed, heading) = BINARY_LAYOUT.unpack(payload)
+    if magic != BINARY_MAGIC or version != BINARY_VERSION:
+        raise ValueError("not a telemetry frame")
+    frame = {"seq": seq, "timestamp": timestamp}
+    if present & _SENSOR_BITS["gps"]:
+        frame["gps"] = {"lat": lat / 1e7, "lon": lon / 1e7, "alt": alt}
+    if present & _SENSOR_BITS["battery"]:
+        frame["battery"] = {"remaining": remaining, "voltage": voltage}
+    if present & _SENSOR_BITS["attitude"]:
+        frame["attitude"] = {"roll": roll, "pitch": pitch, "yaw": yaw}
+    if present & _SENSOR_BITS["velocity"]:
+        frame["velocity"] = {"speed": speed, "heading": heading}
+    return frame
+
+class TelemetryFrame:
+    """방송 한 번의 데이터와 인코딩별 캐시 (직전 프레임 대비 델타 포함)"""
+
+    __slots__ = ("seq", "data", "timestamp", "_previous", "_cache")
+
+    def __init__(self, seq: int, data: Dict[str, Any], previous: Optional[Dict[str, Any]] = None, timestamp: float = None):
+        self.seq = seq
+        self.data = data
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self._previous = previous
+        self._cache = {}
+
+    def _cached(self, key: str, build):
+        payload = self._cache.get(key)
+        if payload is None:
+            payload = self._cache[key] = build()
+        return payload
+
+    def json(self) -> str:
+        return self._cached("json", lambda: _dumps(self.data))
+
+    def keyframe(self) -> str:
+        return self._cached("key", lambda: _dumps({"t": "k", "seq": self.seq, "d": self.data}))
+
+    def delta(self) -> str:
+        return self._cached("delta", lambda: _dumps({"t": "d", "seq": self.seq, **diff_frames(self._previous, self.data)}))
+
+    def binary(self) -> bytes:
+        return self._cached("binary", lambda: _pack_binary(self.seq, self.timestamp, self.data))
+
+class FrameEncoder:
+    """구독자 하나의 인코딩 상태 (delta 는 마지막으로 보낸 seq 를 기준으로 키프레임 여부 결정)"""
+
+    def __init__(self, encoding: str = TELEMETRY_ENCODING, keyframe_interval: int = DELTA_KEYFRAME_INTERVAL):
+        if encoding not in ENCODINGS:
+            raise ValueError(f"unknown telemetry encoding: {encoding}")
+        self.encoding = encoding
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.last_seq = None
+        self.since_keyframe = 0
+        self.keyframes = 0
+
+    def encode(self, frame: TelemetryFrame):
+        if self.encoding == "json":
+            return frame.json()
+        if self.encoding == "binary":
+            return frame.binary()
+
+        # 직전 프레임을 받지 못했으면(드롭/최초) 델타를 적용할 기준이 없으므로 키프레임
+        contiguous = self.last_seq is not None and frame.seq == self.last_seq + 1
+        self.last_seq = frame.seq
+        if contiguous and self.since_keyframe < self.keyframe_interval:
+            self.since_keyframe += 1
+            return frame.delta()
+        self.since_keyframe = 0
+        self.keyframes += 1
+        return frame.keyframe()
+
+def apply_delta(state: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, Any]:
+    """delta 인코딩 메시지를 클라이언트 상태에 반영 (클라이언트 구현 참고용)"""
+    if message["t"] == "k":
+        return {sensor: dict(values) if isinstance(values, dict) else values for sensor, values in message["d"].items()}
+    for sensor, changed in message.get("d", {}).items():
+        state.setdefault(sensor, {}).update(changed)
+    for sensor, values in message.get("r", {}).items():
+        state[sensor] = values
+    return state
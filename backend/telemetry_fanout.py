@@ -0,0 +1,357 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from telemetry_codec import TELEMETRY_ENCODING, FrameEncoder, TelemetryFrame
+
+# 구독자별 큐 기반 텔레메트리 팬아웃
+# 같은 구독(센서별 전송 주기)을 가진 구독자들은 하나의 TelemetryStream 을 공유한다.
+# 스트림은 센서마다 요청 주기에 맞춰 저장소를 샘플링(서버측 데시메이션)해 프레임을 만들고 구독자 큐에 넣는다.
+# (인코딩 결과는 프레임에 캐시되어 스트림의 인코딩당 한 번만 직렬화)
+# 실제 전송은 구독자마다 독립된 송신 태스크가 맡으므로 느린/죽은 소켓이 다른 클라이언트를 막지 않는다.
+
+FANOUT_QUEUE_SIZE = int(os.getenv("FANOUT_QUEUE_SIZE", "32"))
+FANOUT_POLICY = os.getenv("FANOUT_POLICY", "drop_oldest")  # drop_oldest | latest
+FANOUT_SEND_TIMEOUT = float(os.getenv("FANOUT_SEND_TIMEOUT", "2.0"))
+FANOUT_MAX_DROP_STREAK = int(os.getenv("FANOUT_MAX_DROP_STREAK", "500"))  # 연속 드롭이 이만큼 쌓이면 죽은 소켓으로 간주
+TELEMETRY_DEFAULT_RATE_HZ = float(os.getenv("TELEMETRY_DEFAULT_RATE_HZ", "10"))
+TELEMETRY_MAX_RATE_HZ = float(os.getenv("TELEMETRY_MAX_RATE_HZ", "50"))
+TELEMETRY_IDLE_POLL_SECONDS = float(os.getenv("TELEMETRY_IDLE_POLL_SECONDS", "0.5"))  # 데이터 소스가 없을 때 재확인 주기
+EVICT_CLOSE_CODE = 1013  # Try Again Later: 느리거나 멈춘 구독자를 끊을 때 사용하는 close 코드
+
+POLICIES = ("drop_oldest", "latest")
+
+def parse_subscription(spec, sensors: Iterable[str]) -> Dict[str, float]:
+    """'attitude:50,gps:5' 또는 {"attitude": 50, "gps": 5} 를 센서별 Hz 로 변환 (비어 있으면 전체 센서 기본 주기)"""
+    sensors = tuple(sensors)
+    if not spec:
+        return {sensor: TELEMETRY_DEFAULT_RATE_HZ for sensor in sensors}
+    if isinstance(spec, str):
+        items = []
+        for part in spec.split(","):
+            name, _, rate = part.strip().partition(":")
+            items.append((name, rate or TELEMETRY_DEFAULT_RATE_HZ))
+    else:
+        items = spec.items()
+
+    rates = {}
+    for name, rate in items:
+        if name not in sensors:
+            raise ValueError(f"unknown sensor: {name}")
+        rate = float(rate)
+        if not 0 < rate <= TELEMETRY_MAX_RATE_HZ:
+            raise ValueError(f"rate for {name} must be in (0, {TELEMETRY_MAX_RATE_HZ:g}] Hz")
+        rates[name] = rate
+    return rates
+
+class Subscriber:
+    """웹소켓 하나의 전송 큐와 송신 태스크, 지연/드롭 카운터"""
+
+    def __init__(self, websocket, client_id: int, policy: str = FANOUT_POLICY, queue_size: int = FANOUT_QUEUE_SIZE,
+                 encoding: str = TELEMETRY_ENCODING):
+        if policy not in POLICIES:
+            raise ValueError(f"unknown fan-out policy: {policy}")
+        self.websocket = websocket
+        self.encoder = FrameEncoder(encoding)
+        self.stream: Optional["TelemetryStream"] = None
+        self.client_id = client_id
+        self.policy = policy
+        self.queue_size = 1 if policy == "latest" else max(1, queue_size)
+        self._queue = deque()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.connected_at = time.time()
+        self.sent = 0
+        self.dropped = 0
+        self.drop_streak = 0
+        self.bytes_sent = 0
+        self.last_lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self.closed = False
+        self.close_reason = None
+
+    def offer(self, frame: TelemetryFrame) -> bool:
+        """프레임을 큐에 넣음 (가득 차면 가장 오래된 프레임을 버림, 버렸으면 False)"""
+        if self.closed:
+            return False
+        dropped = False
+        if len(self._queue) >= self.queue_size:
+            self._queue.popleft()
+            self.dropped += 1
+            self.drop_streak += 1
+            dropped = True
+        self._queue.append((time.perf_counter(), frame))
+        self._ready.set()
+        return not dropped
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def lag_ms(self) -> float:
+        """큐에서 가장 오래 기다린 프레임의 대기 시간"""
+        if not self._queue:
+            return 0.0
+        return (time.perf_counter() - self._queue[0][0]) * 1000
+
+    async def _send(self, frame: TelemetryFrame):
+        payload = self.encoder.encode(frame)
+        if isinstance(payload, bytes):
+            await self.websocket.send_bytes(payload)
+        else:
+            await self.websocket.send_text(payload)
+        self.bytes_sent += len(payload)
+
+    async def run(self, on_close):
+        try:
+            while not self.closed:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                enqueued, frame = self._queue.popleft()
+                await asyncio.wait_for(self._send(frame), FANOUT_SEND_TIMEOUT)
+                self.sent += 1
+                self.drop_streak = 0
+                self.last_lag_ms = (time.perf_counter() - enqueued) * 1000
+                if self.last_lag_ms > self.max_lag_ms:
+                    self.max_lag_ms = self.last_lag_ms
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self.close_reason = "send timeout"
+        except Exception as e:
+            self.close_reason = f"send error: {type(e).__name__}"
+        finally:
+            self.closed = True
+            on_close(self)
+
+    def start(self, on_close):
+        self._task = asyncio.create_task(self.run(on_close))
+
+    def cancel(self):
+        self.closed = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.client_id,
+            "policy": self.policy,
+            "encoding": self.encoder.encoding,
+            "rates": dict(self.stream.rates) if self.stream else {},
+            "queue": self.depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "keyframes": self.encoder.keyframes,
+            "bytes_sent": self.bytes_sent,
+            "lag_ms": round(self.lag_ms(), 1),
+            "last_lag_ms": round(self.last_lag_ms, 1),
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "connected_s": round(time.time() - self.connected_at, 1),
+        }
+
+def subscription_key(rates: Dict[str, float]) -> Tuple:
+    return tuple(sorted(rates.items()))
+
+class TelemetryStream:
+    """같은 구독을 공유하는 구독자 묶음 (센서별 주기로 샘플링해 프레임 생성)"""
+
+    def __init__(self, rates: Dict[str, float], read: Callable[[str], Dict[str, Any]], publish: Callable,
+                 available: Optional[Callable[[], bool]] = None):
+        self.rates = rates
+        self.key = subscription_key(rates)
+        self.subscribers: Dict[int, Subscriber] = {}
+        self._read = read
+        self._publish = publish
+        self._available = available
+        self._intervals = {sensor: 1 / rate for sensor, rate in rates.items()}
+        self._next_due: Dict[str, float] = {}
+        self._state: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.frames = 0
+
+    def tick(self, now: float) -> Optional[TelemetryFrame]:
+        """주기가 돌아온 센서만 다시 읽고 나머지는 직전 값을 유지해 구독한 센서 전체로 프레임 생성 (다시 읽은 센서가 없으면 None)"""
+        due = []
+        for sensor, interval in self._intervals.items():
+            next_due = self._next_due.get(sensor, now)
+            if next_due > now:
+                continue
+            # 밀렸으면 따라잡기용 연속 프레임을 만들지 않고 지금부터 다시 계산
+            self._next_due[sensor] = next_due + interval if next_due + interval > now else now + interval
+            due.append(sensor)
+        if not due:
+            return None
+
+        previous = self._state
+        state = dict(previous)
+        for sensor in due:
+            state[sensor] = self._read(sensor)
+        self._state = state
+        frame = TelemetryFrame(self.frames, state, previous or None)
+        self.frames += 1
+        return frame
+
+    def next_wakeup(self) -> float:
+        return min(self._next_due.values()) if self._next_due else time.monotonic()
+
+    async def run(self):
+        try:
+            while True:
+                if self._available is not None and not self._available():
+                    # 데이터 소스(기체/재생)가 없으면 오류 프레임을 반복 전송하지 않고 대기
+                    self._next_due.clear()
+                    await asyncio.sleep(TELEMETRY_IDLE_POLL_SECONDS)
+                    continue
+                frame = self.tick(time.monotonic())
+                if frame is not None:
+                    self._publish(self, frame)
+                await asyncio.sleep(max(0.0, self.next_wakeup() - time.monotonic()))
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ 텔레메트리 스트림 오류 ({self.key}): {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+class TelemetryFanout:
+    """구독 스트림/구독자 관리 (ConnectionManager 대체)
+
+    read(sensor) 로 센서 값을 읽고, 구독 변경 시 on_demand({센서: 최대 Hz}) 를 호출한다.
+    available() 이 False 인 동안(기체 미연결 등)에는 프레임을 보내지 않는다.
+    """
+
+    def __init__(self, read: Callable[[str], Dict[str, Any]], sensors: Iterable[str],
+                 on_demand: Optional[Callable[[Dict[str, float]], None]] = None,
+                 available: Optional[Callable[[], bool]] = None):
+        self.read = read
+        self.sensors = tuple(sensors)
+        self.on_demand = on_demand
+        self.available = available
+        self.subscribers: Dict[int, Subscriber] = {}
+        self.streams: Dict[Tuple, TelemetryStream] = {}
+        self._next_id = 0
+        self.evicted = 0
+        self.frames = 0
+        self.demand: Dict[str, float] = {}
+        self._closing = set()
+
+    async def connect(self, websocket, policy: str = FANOUT_POLICY, queue_size: int = FANOUT_QUEUE_SIZE,
+                      encoding: str = TELEMETRY_ENCODING, rates: Optional[Dict[str, float]] = None) -> Subscriber:
+        subscriber = Subscriber(websocket, self._next_id, policy, queue_size, encoding)
+        await websocket.accept()
+        self._next_id += 1
+        self.subscribers[subscriber.client_id] = subscriber
+        subscriber.start(self._on_close)
+        self.subscribe(subscriber, rates or parse_subscription(None, self.sensors))
+        return subscriber
+
+    def subscribe(self, subscriber: Subscriber, rates: Dict[str, float]):
+        """구독 변경 (같은 구독의 스트림으로 옮기고 다음 프레임은 키프레임)"""
+        # 이미 끊기거나 제거된 구독자는 스트림에 다시 넣지 않음 (스트림 태스크/수요 누수 방지)
+        if subscriber.closed or self.subscribers.get(subscriber.client_id) is not subscriber:
+            return
+        key = subscription_key(rates)
+        if subscriber.stream is not None and subscriber.stream.key == key:
+            return
+        self._leave_stream(subscriber)
+        stream = self.streams.get(key)
+        if stream is None:
+            stream = self.streams[key] = TelemetryStream(rates, self.read, self._publish, self.available)
+            stream.start()
+        stream.subscribers[subscriber.client_id] = subscriber
+        subscriber.stream = stream
+        subscriber.encoder.last_seq = None
+        self._update_demand()
+
+    def _leave_stream(self, subscriber: Subscriber):
+        stream = subscriber.stream
+        if stream is None:
+            return
+        subscriber.stream = None
+        stream.subscribers.pop(subscriber.client_id, None)
+        if not stream.subscribers:
+            stream.stop()
+            self.streams.pop(stream.key, None)
+
+    def _update_demand(self):
+        demand = {}
+        for stream in self.streams.values():
+            for sensor, rate in stream.rates.items():
+                if rate > demand.get(sensor, 0):
+                    demand[sensor] = rate
+        if demand != self.demand:
+            self.demand = demand
+            if self.on_demand is not None:
+                self.on_demand(demand)
+
+    def _remove(self, subscriber: Subscriber) -> bool:
+        if self.subscribers.pop(subscriber.client_id, None) is None:
+            return False
+        self._leave_stream(subscriber)
+        self._update_demand()
+        return True
+
+    def disconnect(self, subscriber: Subscriber):
+        subscriber.cancel()
+        if not self._remove(subscriber) and subscriber.stream is not None:
+            # 먼저 제거됐어도 스트림에 남아 있으면 정리
+            self._leave_stream(subscriber)
+            self._update_demand()
+
+    def _evict(self, subscriber: Subscriber, reason: str):
+        if not self._remove(subscriber):
+            return
+        subscriber.close_reason = subscriber.close_reason or reason
+        subscriber.cancel()
+        self.evicted += 1
+        print(f"⚠️ 텔레메트리 구독자 {subscriber.client_id} 제거: {subscriber.close_reason}")
+        # 소켓도 닫아 클라이언트가 끊긴 것을 알고 재연결하도록 함 (수신 루프도 함께 종료)
+        task = asyncio.create_task(self._close_socket(subscriber))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close_socket(self, subscriber: Subscriber):
+        try:
+            await asyncio.wait_for(subscriber.websocket.close(code=EVICT_CLOSE_CODE), FANOUT_SEND_TIMEOUT)
+        except Exception:
+            # 이미 끊겼거나 응답 없는 소켓
+            pass
+
+    def _on_close(self, subscriber: Subscriber):
+        """송신 태스크 종료 시 호출 (전송 실패/타임아웃이면 제거)"""
+        if subscriber.close_reason:
+            self._evict(subscriber, subscriber.close_reason)
+        else:
+            self._remove(subscriber)
+
+    def _publish(self, stream: TelemetryStream, frame: TelemetryFrame):
+        """스트림 프레임을 그 스트림 구독자 큐에 넣음"""
+        self.frames += 1
+        for subscriber in list(stream.subscribers.values()):
+            subscriber.offer(frame)
+            if subscriber.drop_streak >= FANOUT_MAX_DROP_STREAK:
+                self._evict(subscriber, "stalled")
+
+    def close(self):
+        for subscriber in list(self.subscribers.values()):
+            self.disconnect(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self.subscribers),
+            "streams": len(self.streams),
+            "frames": self.frames,
+            "evicted": self.evicted,
+            "demand_hz": self.demand,
+            "subscribers": [subscriber.stats() for subscriber in self.subscribers.values()],
+        }
@@ -0,0 +1,267 @@
+import asyncio
+import mmap
+import os
+import struct
+import time
+from typing import Iterator, Optional, Tuple
+from pymavlink import mavutil
+
+# 텔레메트리 녹화기 (메모리 맵 고정 크기 링 파일) + 재생 소스
+# 리더 스레드가 디코딩한 MAVLink 메시지의 원본 프레임(msg.get_msgbuf())을 수신 시각과 함께 링 파일에 이어 쓴다.
+# 링을 쓰는 이유는 속도가 아니라 (버퍼드 파일 write 보다 느림, benchmarks/bench_telemetry_recorder.py)
+#   - 디스크 사용량이 TELEMETRY_RECORD_SIZE_MB 로 고정되고 가장 오래된 레코드부터 덮어씀
+#   - 레코드마다 헤더 커서를 갱신하므로 프로세스가 죽어도 마지막으로 기록한 레코드까지 읽을 수 있음
+# 기본값은 꺼짐 (TELEMETRY_RECORD=true 로 켬)
+# 재생은 녹화본을 같은 TelemetryStore 에 다시 넣으므로 /ws 팬아웃과 도구 호출이 실기체 없이 동작한다.
+#
+# 파일 레이아웃
+#   header (64 바이트): magic, version, 예약, capacity, start, end, records, dropped
+#     start/end 는 누적 절대 오프셋 (링 위치 = 오프셋 % capacity), start 가 가장 오래된 유효 레코드
+#   data (capacity 바이트): [timestamp f64][length u16][MAVLink 프레임] 레코드 연속
+#     레코드는 링 끝에서 쪼개지지 않는다. 남은 공간이 부족하면 PAD 레코드(또는 헤더보다 작은 빈 공간)를 두고 처음으로 돌아간다.
+
+TELEMETRY_RECORD = os.getenv("TELEMETRY_RECORD", "false").lower() == "true"
+TELEMETRY_RECORD_PATH = os.getenv("TELEMETRY_RECORD_PATH", "recordings/telemetry.ring")
+TELEMETRY_RECORD_SIZE_MB = float(os.getenv("TELEMETRY_RECORD_SIZE_MB", "64"))
+TELEMETRY_RECORDINGS_DIR = os.getenv("TELEMETRY_RECORDINGS_DIR", os.path.dirname(TELEMETRY_RECORD_PATH) or ".")  # 재생 가능한 녹화본 위치
+
+RING_MAGIC = b"MAVRING1"
+RING_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQQQQ")
+_HEADER_SIZE = 64
+_CURSOR = struct.Struct("<QQQ")  # header 안의 start, end, records (매 레코드 갱신)
+_CURSOR_OFFSET = 24
+_RECORD = struct.Struct("<dH")
+_RECORD_SIZE = _RECORD.size
+_LENGTH = struct.Struct("<H")
+_PAD = 0xFFFF
+_RELEASE_FRACTION = 64  # 덮어쓸 공간은 링의 1/64 씩 미리 확보 (레코드마다 start 를 옮기지 않음)
+_pack_record = _RECORD.pack_into
+_pack_cursor = _CURSOR.pack_into
+
+class TelemetryRecorder:
+    """수신 MAVLink 프레임을 메모리 맵 링 파일에 append (가득 차면 가장 오래된 레코드부터 덮어씀)"""
+
+    def __init__(self, path: str = TELEMETRY_RECORD_PATH, size_mb: float = TELEMETRY_RECORD_SIZE_MB):
+        self.path = path
+        self.capacity = int(size_mb * 1024 * 1024)
+        self._release_ahead = self.capacity // _RELEASE_FRACTION
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size != _HEADER_SIZE + self.capacity:
+                os.ftruncate(fd, _HEADER_SIZE + self.capacity)
+            self._map = mmap.mmap(fd, _HEADER_SIZE + self.capacity)
+        finally:
+            os.close(fd)
+
+        magic, version, _, capacity, start, end, records, dropped = _HEADER.unpack_from(self._map, 0)
+        if magic == RING_MAGIC and version == RING_VERSION and capacity == self.capacity:
+            # 같은 형식의 기존 녹화에 이어서 기록
+            self.start, self.end, self.records, self.dropped = start, end, records, dropped
+        else:
+            self.start = self.end = self.records = self.dropped = 0
+        self._write_header()
+
+    def _write_header(self):
+        _HEADER.pack_into(self._map, 0, RING_MAGIC, RING_VERSION, 0, self.capacity, self.start, self.end, self.records, self.dropped)
+
+    def _release(self, limit: int):
+        """절대 오프셋 limit 이전의 레코드를 덮어쓸 수 있도록 start 를 전진 (end 를 넘지 않음)"""
+        capacity = self.capacity
+        data = self._map
+        start = self.start
+        limit = min(limit, self.end)
+        while start < limit:
+            position = start % capacity
+            remaining = capacity - position
+            if remaining < _RECORD_SIZE:
+                start += remaining
+                continue
+            length = _LENGTH.unpack_from(data, _HEADER_SIZE + position + 8)[0]
+            start += remaining if length == _PAD else _RECORD_SIZE + length
+        self.start = start
+
+    def append(self, timestamp: float, frame) -> bool:
+        """레코드 하나 기록 (링 끝 넘김/덮어쓰기 공간 확보가 필요 없으면 바로 기록)"""
+        length = len(frame)
+        end = self.end
+        capacity = self.capacity
+        position = end % capacity
+        stop = position + _RECORD_SIZE + length
+        if stop > capacity or end + stop - position - capacity > self.start or length >= _PAD:
+            return self._append_slow(timestamp, frame)
+
+        data = self._map
+        offset = _HEADER_SIZE + position
+        _pack_record(data, offset, timestamp, length)
+        data[offset + _RECORD_SIZE:_HEADER_SIZE + stop] = frame
+        self.end = end = end + stop - position
+        self.records += 1
+        _pack_cursor(data, _CURSOR_OFFSET, self.start, end, self.records)
+        return True
+
+    def _append_slow(self, timestamp: float, frame) -> bool:
+        length = len(frame)
+        size = _RECORD_SIZE + length
+        capacity = self.capacity
+        # 링 절반보다 큰 레코드는 끝에서 PAD 로 건너뛴 뒤 들어갈 자리를 확보할 수 없으므로 커서를 옮기기 전에 버림
+        if size > capacity // 2 or length >= _PAD:
+            self.dropped += 1
+            self._write_header()
+            return False
+
+        end = self.end
+        position = end % capacity
+        pad_at = None
+        if capacity - position < size:
+            # 링 끝에 남은 공간으로는 부족하므로 PAD 를 남기고 다음 바퀴 처음부터 기록
+            pad_at = position
+            end += capacity - position
+            position = 0
+        if end + size - capacity > self.start:
+            self._release(end + size - capacity + self._release_ahead)
+
+        data = self._map
+        if pad_at is not None and capacity - pad_at >= _RECORD_SIZE:
+            _pack_record(data, _HEADER_SIZE + pad_at, 0.0, _PAD)
+        offset = _HEADER_SIZE + position
+        _pack_record(data, offset, timestamp, length)
+        data[offset + _RECORD_SIZE:offset + size] = frame
+
+        self.end = end + size
+        self.records += 1
+        _pack_cursor(data, _CURSOR_OFFSET, self.start, self.end, self.records)
+        return True
+
+    def record(self, msg, timestamp: float):
+        """MavlinkReader 콜백 (원본 프레임 버퍼를 그대로 기록)"""
+        self.append(timestamp, msg.get_msgbuf())
+
+    def flush(self):
+        self._map.flush()
+
+    def close(self):
+        if not self._map.closed:
+            self._map.flush()
+            self._map.close()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "capacity_bytes": self.capacity,
+            "used_bytes": self.end - self.start,
+            "records": self.records,
+            "dropped": self.dropped,
+        }
+
+def iter_records(path: str) -> Iterator[Tuple[float, bytes]]:
+    """녹화 파일의 레코드를 오래된 순으로 (수신 시각, MAVLink 프레임)"""
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        magic, version, _, capacity, start, end, _, _ = _HEADER.unpack_from(data, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            raise ValueError(f"not a telemetry recording: {path}")
+        offset = start
+        while offset < end:
+            position = offset % capacity
+            remaining = capacity - position
+            if remaining < _RECORD_SIZE:
+                offset += remaining
+                continue
+            timestamp, length = _RECORD.unpack_from(data, _HEADER_SIZE + position)
+            if length == _PAD:
+                offset += remaining
+                continue
+            begin = _HEADER_SIZE + position + _RECORD_SIZE
+            yield timestamp, data[begin:begin + length]
+            offset += _RECORD_SIZE + length
+    finally:
+        data.close()
+
+def recording_path(name: str, directory: str = TELEMETRY_RECORDINGS_DIR) -> str:
+    """녹화 디렉터리 안의 파일 이름만 경로로 변환 (하위 경로/상위 경로/절대 경로/디렉터리 밖 심볼릭 링크는 ValueError)"""
+    if not name or name in (".", "..") or os.path.basename(name) != name or os.path.isabs(name) or "\\" in name:
+        raise ValueError(f"invalid recording name: {name!r}")
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.dirname(path) != root:
+        raise ValueError(f"invalid recording name: {name!r}")
+    return path
+
+class ReplaySource:
+    """녹화본을 TelemetryStore 로 재생 (speed=1 실시간, >1 가속, 0 이면 대기 없이 최대 속도)"""
+
+    def __init__(self, path: str, store, speed: float = 1.0, loop: bool = False):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self.store = store
+        self.speed = speed
+        self.loop = loop
+        self.replayed = 0
+        self.errors = 0
+        self.position: Optional[float] = None  # 마지막으로 재생한 레코드의 원래 수신 시각
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _play_once(self):
+        parser = mavutil.mavlink.MAVLink(None)
+        first = None
+        started = time.monotonic()
+        for timestamp, frame in iter_records(self.path):
+            if first is None:
+                first = timestamp
+            if self.speed > 0:
+                delay = (timestamp - first) / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            try:
+                msg = parser.decode(bytearray(frame))
+            except Exception:
+                self.errors += 1
+                continue
+            self.store.update(msg.get_type(), msg)
+            self.replayed += 1
+            self.position = timestamp
+            if self.speed <= 0 and self.replayed % 1000 == 0:
+                await asyncio.sleep(0)
+
+    async def run(self):
+        print(f"⏯️ 텔레메트리 재생 시작: {self.path} (x{self.speed:g})")
+        try:
+            while True:
+                await self._play_once()
+                if not self.loop:
+                    break
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"❌ 텔레메트리 재생 오류: {e}")
+        print(f"⏹️ 텔레메트리 재생 종료: {self.replayed} 개 메시지")
+
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self.running:
+            self._task.cancel()
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "speed": self.speed,
+            "loop": self.loop,
+            "running": self.running,
+            "replayed": self.replayed,
+            "errors": self.errors,
+            "position": self.position,
+        }
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# backend 디렉터리 기준으로 agents/benchmarks 패키지를 import (실제 업스트림 키 없이 스텁으로만 실행)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("OPENROUTER_API_KEY", "stub")
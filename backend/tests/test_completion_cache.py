@@ -0,0 +1,75 @@
+"""
+응답 캐시: 정상 종료된 답변만 저장하고 중단된 스트림은 캐시/히스토리에 남기지 않는지 확인
+
+스텁 업스트림(benchmarks.stub_upstream)으로 실제 라우터 경로를 그대로 실행한다.
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from agents.app import app
+from agents.routers import chat_router
+from agents.services.clients import create_async_client
+from agents.services.completion_cache import completion_cache
+from benchmarks.stub_upstream import create_stub_app, run_in_thread
+
+STUB_PORT = 9131
+
+@pytest.fixture(scope="module")
+def stub_upstream():
+    server = run_in_thread(create_stub_app(first_token_ms=20, token_ms=20, tokens=100), STUB_PORT)
+    agents = [chat_router.route_agent, chat_router.chat_agent, chat_router.fallback_agent]
+    clients = [agent.async_client for agent in agents]
+    for agent in agents:
+        agent.async_client = create_async_client(f"http://127.0.0.1:{STUB_PORT}/v1", "stub")
+    yield
+    for agent, client in zip(agents, clients):
+        agent.async_client = client
+    server.should_exit = True
+
+@pytest.fixture
+def cache(stub_upstream):
+    enabled = completion_cache.enabled
+    completion_cache.enabled = True
+    completion_cache._entries.clear()
+    completion_cache.total_bytes = 0
+    yield completion_cache
+    completion_cache.enabled = enabled
+    completion_cache._entries.clear()
+    completion_cache.total_bytes = 0
+
+def request_body(conversation_id: str):
+    return {"model": "m", "messages": [{"role": "user", "content": "안녕"}], "temperature": 0, "conversationId": conversation_id}
+
+async def stream_lines(client, body):
+    """스트리밍 응답의 data 줄 수"""
+    lines = 0
+    async with client.stream("POST", "/api/v1/chat/completions", json=body) as response:
+        async for line in response.aiter_lines():
+            if line:
+                lines += 1
+    return lines
+
+async def stream_and_abort(client, body, abort_after: float):
+    """스트림 도중 abort_after 초 뒤 abort 엔드포인트로 중단 (ASGITransport 는 응답이 끝난 뒤 본문을 넘겨주므로 시간 기준)"""
+    reader = asyncio.create_task(stream_lines(client, body))
+    await asyncio.sleep(abort_after)
+    response = await client.post("/api/ask/custom/abort", json={"conversationId": body["conversationId"]})
+    assert response.json()["cancelled"] == 1
+    return await reader
+
+async def run(coro_factory):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await coro_factory(client)
+
+def test_completed_stream_is_cached(cache):
+    asyncio.run(run(lambda client: stream_lines(client, request_body("cache-complete"))))
+    assert len(cache) == 1
+
+def test_aborted_stream_is_not_cached(cache):
+    lines = asyncio.run(run(lambda client: stream_and_abort(client, request_body("cache-abort"), abort_after=0.5)))
+    assert lines < 100
+    assert len(cache) == 0
+    session = chat_router.session_store.get("cache-abort")
+    assert all(message["role"] != "assistant" for message in session.messages)
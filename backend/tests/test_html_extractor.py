@@ -0,0 +1,17 @@
+"""
+예산 기반 HTML 추출기: 대상 요소 시작 위치 탐색이 data-id 같은 다른 속성에 걸리지 않는지 확인
+"""
+from agents.tools.html_extractor import extract_text_budgeted
+from benchmarks.naver_fixtures import make_naver_page
+
+def test_data_id_decoy_before_main_pack_is_skipped():
+    content = (
+        "<html><body><div data-id='main_pack'>미끼</div>"
+        "<div id='main_pack'><p>실제 결과</p></div></body></html>"
+    ).encode("utf-8")
+    assert extract_text_budgeted(content) == "실제 결과"
+
+def test_synthetic_page_extracts_real_main_pack():
+    text = extract_text_budgeted(make_naver_page(sections=2, script_kb=1))
+    assert text
+    assert "통합" not in text
@@ -0,0 +1,104 @@
+"""
+텔레메트리 녹화 링 파일: 덮어쓰기/레코드 크기 제한/기존 파일 이어쓰기에서 커서 불변식과 레코드 경계가 유지되는지 확인
+
+링은 일부러 아주 작게(수백 바이트~수 KB) 잡아 여러 바퀴 덮어쓰기가 일어나게 한다.
+"""
+import random
+
+import pytest
+
+from telemetry_recorder import _RECORD_SIZE, TelemetryRecorder, iter_records
+
+def open_ring(path, capacity: int) -> TelemetryRecorder:
+    return TelemetryRecorder(str(path), capacity / 1024 / 1024)
+
+def assert_invariants(recorder: TelemetryRecorder):
+    assert recorder.start <= recorder.end
+    assert recorder.end - recorder.start <= recorder.capacity
+
+def read_back(path):
+    return [(timestamp, bytes(frame)) for timestamp, frame in iter_records(str(path))]
+
+def assert_newest(path, written):
+    """링에 남은 레코드는 기록한 레코드의 마지막 부분과 순서/내용이 같아야 함"""
+    kept = read_back(path)
+    assert kept
+    assert kept == written[len(written) - len(kept):]
+    return kept
+
+def test_wraparound_keeps_newest_records(tmp_path):
+    path = tmp_path / "wrap.ring"
+    recorder = open_ring(path, 1024)
+    written = []
+    for i in range(500):
+        record = (float(i), bytes([i % 256]) * (17 + i % 40))
+        assert recorder.append(*record)
+        written.append(record)
+        assert_invariants(recorder)
+    # 여러 바퀴 덮어썼는지 확인
+    assert recorder.end > 3 * recorder.capacity
+    recorder.close()
+    assert_newest(path, written)
+
+def test_record_larger_than_half_ring_is_dropped_before_cursors_move(tmp_path):
+    path = tmp_path / "large.ring"
+    recorder = open_ring(path, 512)
+    written = [(0.0, b"a" * 100), (1.0, b"b" * 150)]
+    for record in written:
+        assert recorder.append(*record)
+
+    cursors = (recorder.start, recorder.end, recorder.records)
+    assert not recorder.append(2.0, b"c" * (recorder.capacity // 2 - _RECORD_SIZE + 1))
+    assert (recorder.start, recorder.end, recorder.records) == cursors
+    assert recorder.dropped == 1
+
+    # 정확히 절반 크기까지는 기록 (링 끝을 넘기면 PAD 후 처음부터)
+    record = (3.0, b"d" * (recorder.capacity // 2 - _RECORD_SIZE))
+    assert recorder.append(*record)
+    written.append(record)
+    assert_invariants(recorder)
+    recorder.close()
+    assert_newest(path, written)
+
+def test_reopen_continues_existing_recording(tmp_path):
+    path = tmp_path / "reopen.ring"
+    recorder = open_ring(path, 2048)
+    written = []
+    for i in range(100):
+        record = (float(i), bytes([i % 256]) * 30)
+        recorder.append(*record)
+        written.append(record)
+    cursors = (recorder.start, recorder.end, recorder.records)
+    recorder.close()
+
+    recorder = open_ring(path, 2048)
+    assert (recorder.start, recorder.end, recorder.records) == cursors
+    for i in range(100, 150):
+        record = (float(i), bytes([i % 256]) * 30)
+        recorder.append(*record)
+        written.append(record)
+        assert_invariants(recorder)
+    recorder.close()
+    assert_newest(path, written)
+
+    # 크기가 다르면 기존 녹화를 이어쓰지 않고 새로 시작
+    recorder = open_ring(path, 4096)
+    assert (recorder.start, recorder.end, recorder.records) == (0, 0, 0)
+    recorder.close()
+
+@pytest.mark.parametrize("seed", range(5))
+def test_randomized_appends_keep_ring_invariants(tmp_path, seed):
+    rng = random.Random(seed)
+    for trial in range(40):
+        path = tmp_path / f"fuzz-{trial}.ring"
+        recorder = open_ring(path, rng.choice([256, 512, 1024, 2048]))
+        max_length = rng.choice([20, 100, 300, int(recorder.capacity * 0.9)])
+        written = []
+        for i in range(rng.randint(1, 400)):
+            record = (float(i), bytes([i % 256]) * rng.randint(0, max_length))
+            if recorder.append(*record):
+                written.append(record)
+            assert_invariants(recorder)
+        recorder.close()
+        if written:
+            assert_newest(path, written)